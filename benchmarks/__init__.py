@@ -0,0 +1,6 @@
+"""Benchmarks for the Geneweaver API.
+
+Benchmarks need a configured environment (see `GeneweaverAPIConfig`) and, unless
+stated otherwise, a reachable copy of the Geneweaver database. They are not part
+of the unit test suite.
+"""
@@ -0,0 +1,168 @@
+r"""Load test one or more running API servers and compare their throughput.
+
+Start the API once per configuration to compare, e.g. with 1, 2 and 4 workers and
+the same `DB_CONNECTION_BUDGET`:
+
+    WEB_CONCURRENCY=1 uvicorn geneweaver.api.main:app --port 8001
+    WEB_CONCURRENCY=2 uvicorn geneweaver.api.main:app --port 8002
+    WEB_CONCURRENCY=4 uvicorn geneweaver.api.main:app --port 8004
+
+then run:
+
+    python -m benchmarks.load_test --path /api/genesets/1234 --concurrency 64 \
+        http://localhost:8001 http://localhost:8002 http://localhost:8004
+
+Throughput is reported per server, along with its scaling relative to the first.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+# Endpoints exercised when no `--path` is given, `{geneset_id}` is filled in from
+# `--geneset-id`.
+SCENARIO = [
+    "/api/monitors/servers/live",
+    "/api/genesets?limit=50",
+    "/api/genesets/{geneset_id}",
+    "/api/genesets/{geneset_id}/values",
+    "/api/genesets/{geneset_id}/file",
+    "/api/species",
+]
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    """Issue requests in a loop until the deadline."""
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[path] += 1
+        except httpx.HTTPError:
+            errors[path] += 1
+        latencies[path].append((time.perf_counter() - start) * 1000)
+        i += 1
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Summarize the latencies (ms) of a set of requests."""
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100)
+    else:
+        # Too few requests for percentiles.
+        quantiles = (latencies or [0.0]) * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "p99_ms": quantiles[98],
+    }
+
+
+async def run(
+    base_url: str,
+    paths: List[str],
+    concurrency: int,
+    duration: float,
+    token: Optional[str] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Load test a single server.
+
+    :return: throughput and latency percentiles, in total and per endpoint.
+    """
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=30
+    ) as client:
+        # Warm up the server's pools and caches.
+        await asyncio.gather(*(client.get(path) for path in paths))
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                worker(client, paths, deadline, latencies, errors)
+                for _ in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    results = {
+        path: summarize(latencies[path], errors[path], elapsed) for path in paths
+    }
+    results["total"] = summarize(
+        [ms for path in paths for ms in latencies[path]],
+        sum(errors.values()),
+        elapsed,
+    )
+    return results
+
+
+def print_row(name: str, result: Dict[str, float], scale: float) -> None:
+    """Print one line of the report."""
+    print(
+        f"{name:<45} {result['rps']:>9.1f} {scale:>6.2f} "
+        f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+        f"{result['p99_ms']:>8.1f} {result['errors']:>7d}"
+    )
+
+
+def main() -> None:
+    """Parse arguments, run the load test against each server and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_urls", nargs="+")
+    parser.add_argument("--path", dest="paths", action="append")
+    parser.add_argument("--geneset-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--token", help="Bearer token for authenticated endpoints")
+    parser.add_argument("--per-endpoint", action="store_true")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    paths = [path.format(geneset_id=args.geneset_id) for path in args.paths or SCENARIO]
+
+    header = (
+        f"{'server / endpoint':<45} {'rps':>9} {'scale':>6} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    baseline = None
+    report = {}
+    for base_url in args.base_urls:
+        results = asyncio.run(
+            run(base_url, paths, args.concurrency, args.duration, args.token)
+        )
+        report[base_url] = results
+        baseline = baseline or results["total"]["rps"]
+        print_row(base_url, results["total"], results["total"]["rps"] / baseline)
+        if args.per_endpoint:
+            for path in paths:
+                print_row(f"  {path}", results[path], 1.0)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
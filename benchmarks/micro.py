@@ -0,0 +1,185 @@
+"""Micro-benchmarks for hot, DB-independent code paths.
+
+Requires `pytest-benchmark` (a dev dependency), run with:
+
+    pytest benchmarks/micro.py --benchmark-columns=median,ops,rounds
+
+Compare against a saved baseline with `--benchmark-autosave` and
+`--benchmark-compare`.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import List
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials, SecurityScopes  # noqa: E402
+from geneweaver.api.core import compression  # noqa: E402
+from geneweaver.api.core.security import Auth0  # noqa: E402
+from geneweaver.api.services import geneset as geneset_service  # noqa: E402
+from geneweaver.core.enum import GeneIdentifier  # noqa: E402
+from jax.apiutils import CollectionResponse, Response  # noqa: E402
+from jose import jwk, jwt  # noqa: E402
+from pytest_benchmark.fixture import BenchmarkFixture  # noqa: E402
+
+GENES = 5000
+GENESETS = 1000
+DOMAIN = "bench.auth0.example"
+AUDIENCE = "https://bench.example"
+
+
+def geneset_values(genes: int = GENES) -> List[dict]:
+    """Build geneset values shaped like `geneset_value.by_geneset_id` rows."""
+    return [
+        {
+            "ode_gene_id": i,
+            "ode_ref_id": f"Gene{i}",
+            "gdb_id": GeneIdentifier.ENSEMBLE_GENE.value,
+            "value": i / genes,
+            "in_threshold": True,
+        }
+        for i in range(genes)
+    ]
+
+
+def genesets(count: int = GENESETS) -> List[dict]:
+    """Build geneset rows shaped like `geneset.get` results."""
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "file_id": i,
+            "curation_id": 3,
+            "species_id": 1,
+            "name": f"Geneset {i}",
+            "abbreviation": f"GS{i}",
+            "publication_id": None,
+            "description": "A synthetic geneset for benchmarking.",
+            "count": 100,
+            "score_type": 3,
+            "threshold": "0.5",
+            "status": "normal",
+            "gene_id_type": 7,
+            "attribution": None,
+            "created": datetime(2024, 1, 1),
+            "updated": datetime(2024, 1, 2),
+        }
+        for i in range(count)
+    ]
+
+
+class HomologCursor:
+    """A stand-in cursor returning a homolog for every other gene."""
+
+    def __init__(self: "HomologCursor", genes: int) -> None:
+        """Initialize the cursor with homologs for `genes` genes."""
+        self.rows = [
+            {"ode_gene_id": i, "ode_ref_id": f"Homolog{i}"} for i in range(0, genes, 2)
+        ]
+
+    def execute(self: "HomologCursor", *args: object, **kwargs: object) -> None:
+        """Accept any query."""
+
+    def fetchall(self: "HomologCursor") -> List[dict]:
+        """Return the homolog rows."""
+        return self.rows
+
+
+def test_serialize_geneset_values(benchmark: BenchmarkFixture) -> None:
+    """Serialize a large geneset's values the way a JSON response does."""
+    response = Response({"geneset": genesets(1)[0], "geneset_values": geneset_values()})
+    benchmark(lambda: json.dumps(jsonable_encoder(response)))
+
+
+def test_serialize_geneset_collection(benchmark: BenchmarkFixture) -> None:
+    """Serialize a page of genesets the way a JSON response does."""
+    response = CollectionResponse(genesets())
+    benchmark(lambda: json.dumps(jsonable_encoder(response)))
+
+
+@pytest.mark.parametrize(
+    ("encoding", "level"),
+    [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 4), ("br", 11), ("zstd", 3)],
+)
+def test_compress_geneset_values(
+    benchmark: BenchmarkFixture, encoding: str, level: int
+) -> None:
+    """Compress a large geneset's JSON response, reporting the ratio achieved."""
+    available = compression.encoders(
+        gzip_level=level, brotli_quality=level, zstd_level=level
+    )
+    if encoding not in available:
+        pytest.skip(f"{encoding} is not installed")
+    response = Response({"geneset": genesets(1)[0], "geneset_values": geneset_values()})
+    body = json.dumps(jsonable_encoder(response)).encode()
+
+    def compress() -> bytes:
+        compressor = available[encoding]()
+        return compressor.compress(body) + compressor.flush()
+
+    compressed = benchmark(compress)
+    benchmark.extra_info["ratio"] = len(body) / len(compressed)
+
+
+def test_map_geneset_homology(benchmark: BenchmarkFixture) -> None:
+    """Map a large geneset to homologous gene identifiers."""
+    cursor = HomologCursor(GENES)
+    values = geneset_values()
+    benchmark(
+        geneset_service.map_geneset_homology,
+        cursor,
+        values,
+        GeneIdentifier.ENSEMBLE_GENE,
+    )
+
+
+@pytest.fixture(scope="module")
+def signed_token() -> tuple:
+    """Build an Auth0 scheme and a token signed with a freshly generated key."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+
+    auth = Auth0(domain=DOMAIN, api_audience=AUDIENCE)
+    auth.jwks = {"keys": [{**public_jwk, "kid": "bench", "use": "sig"}]}
+    token = jwt.encode(
+        {
+            f"{AUDIENCE}/email": "bench@example.org",
+            "iss": f"https://{DOMAIN}/",
+            "aud": AUDIENCE,
+            "exp": int(time.time()) + 3600,
+            "name": "Bench User",
+            "sub": "auth0|bench",
+            "scope": "openid profile email",
+        },
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+    return auth, HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_jwt_decode(benchmark: BenchmarkFixture, signed_token: tuple) -> None:
+    """Verify a bearer token and build the request user."""
+    auth, creds = signed_token
+    loop = asyncio.new_event_loop()
+    user = benchmark(
+        lambda: loop.run_until_complete(auth.get_user(SecurityScopes([]), creds))
+    )
+    loop.close()
+    assert user.sso_id == "auth0|bench"
@@ -0,0 +1,116 @@
+"""Benchmark the planning time saved by the prepared statement registry.
+
+For every registered query shape this reports:
+
+- the planning time PostgreSQL reports for the query (`EXPLAIN ANALYZE`), which is
+  the per-execution cost a prepared statement avoids, and
+- the mean wall-clock time of executing the query unprepared vs prepared.
+
+Usage:
+
+    python -m benchmarks.prepared_statements --geneset-id 1234 --user-id 0
+"""
+
+import argparse
+import statistics
+import time
+from functools import partial
+from typing import Callable, Dict
+
+import psycopg
+from geneweaver.api.core.config import settings
+from geneweaver.api.core.prepared import capture_statements
+from geneweaver.core.enum import GeneIdentifier, Species
+from psycopg.rows import dict_row
+from psycopg.sql import SQL, Composable
+
+
+def planning_time(cursor: psycopg.Cursor, query: Composable, params: dict) -> float:
+    """Get the planning time (ms) PostgreSQL reports for a query."""
+    if isinstance(query, str):
+        query = SQL(query)
+    cursor.execute(
+        SQL("EXPLAIN (ANALYZE, FORMAT JSON) {query}").format(query=query), params
+    )
+    return cursor.fetchone()["QUERY PLAN"][0]["Planning Time"]
+
+
+def execute(
+    cursor: psycopg.Cursor, query: Composable, params: dict, prepare: bool
+) -> None:
+    """Execute a query and fetch all of its results."""
+    cursor.execute(query, params, prepare=prepare)
+    cursor.fetchall()
+
+
+def mean_ms(func: Callable[[], None], iterations: int) -> float:
+    """Get the mean run time (ms) of a function."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def run(args: argparse.Namespace) -> Dict[str, dict]:
+    """Run the benchmark for every registered statement."""
+    statements = capture_statements(
+        geneset_id=args.geneset_id,
+        user_id=args.user_id,
+        gene_id_type=GeneIdentifier(args.gene_id_type),
+        species=Species(args.species),
+        gene_ids=args.gene_ids,
+    )
+    results = {}
+    with psycopg.connect(settings.DB.URI, row_factory=dict_row) as conn:
+        conn.execute(
+            'SET search_path = "$user", '
+            "public, production, extsrc, odestatic, curation;"
+        )
+        for name, (query, params) in statements.items():
+            with conn.cursor() as cur:
+                plan_ms = planning_time(cur, query, params)
+                unprepared_ms = mean_ms(
+                    partial(execute, cur, query, params, False), args.iterations
+                )
+                execute(cur, query, params, True)
+                prepared_ms = mean_ms(
+                    partial(execute, cur, query, params, True), args.iterations
+                )
+
+            results[name] = {
+                "planning_ms": plan_ms,
+                "unprepared_ms": unprepared_ms,
+                "prepared_ms": prepared_ms,
+                "saved_ms": unprepared_ms - prepared_ms,
+            }
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--geneset-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, default=0)
+    parser.add_argument("--gene-id-type", default=GeneIdentifier.GENE_SYMBOL.value)
+    parser.add_argument("--species", default=Species.MUS_MUSCULUS.value)
+    parser.add_argument("--gene-ids", nargs="*", default=["Pax6"])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results = run(args)
+    header = f"{'statement':<50} {'plan ms':>9} {'unprep ms':>10} {'prep ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(
+            f"{name:<50} {result['planning_ms']:>9.3f} "
+            f"{result['unprepared_ms']:>10.3f} {result['prepared_ms']:>9.3f}"
+        )
+    total = sum(r["saved_ms"] for r in results.values())
+    print(f"\nTotal saved per request touching every statement: {total:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
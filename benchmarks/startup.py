@@ -0,0 +1,99 @@
+"""Benchmark API startup: module import time and time to first request.
+
+Import time is measured with `python -X importtime` in a fresh interpreter, and the
+slowest modules (cumulative) are listed. Time to first request starts a uvicorn
+server and polls the liveness endpoint until it answers, so it includes the
+application lifespan (DB pool, JWKS fetch) and needs a configured environment.
+
+Usage:
+
+    python -m benchmarks.startup --budget-ms 1000
+    python -m benchmarks.startup --first-request --port 8011
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+import httpx
+
+MODULE = "geneweaver.api.main"
+
+
+def import_times(module: str = MODULE) -> List[Tuple[int, int, str]]:
+    """Import a module in a fresh interpreter and parse `-X importtime` output.
+
+    :return: (self us, cumulative us, module name) for every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times.append((int(own), int(cumulative), name.strip()))
+    return times
+
+
+def time_to_first_request(port: int, timeout: float) -> float:
+    """Start the API with uvicorn and time until the liveness check answers.
+
+    :return: seconds from process start to the first successful response.
+    """
+    url = f"http://127.0.0.1:{port}/api/monitors/servers/live"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{MODULE}:app", "--port", str(port)],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("The API server exited during startup.")
+            time.sleep(0.05)
+        raise TimeoutError(f"No response from the API within {timeout} seconds.")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, help="Fail if import exceeds this")
+    parser.add_argument("--first-request", action="store_true")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    times = import_times()
+    total_ms = next(c for _, c, name in times if name == MODULE) / 1000
+    print(f"{'module':<60} {'self ms':>8} {'cumul ms':>9}")
+    for own, cumulative, name in sorted(times, key=lambda t: -t[1])[: args.top]:
+        print(f"{name:<60} {own / 1000:>8.1f} {cumulative / 1000:>9.1f}")
+    print(f"\nImport {MODULE}: {total_ms:.1f} ms")
+
+    if args.first_request:
+        seconds = time_to_first_request(args.port, args.timeout)
+        print(f"Time to first request: {seconds * 1000:.1f} ms")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        sys.exit(f"Import time {total_ms:.1f} ms exceeds budget {args.budget_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
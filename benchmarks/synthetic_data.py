@@ -0,0 +1,478 @@
+"""Load a synthetic, realistically sized dataset into a local Geneweaver database.
+
+The generator targets an existing Geneweaver schema (e.g. a schema-only dump
+restored into a local PostgreSQL) and bulk loads users, groups, publications,
+genes, homologs, genesets, geneset files and geneset values with `COPY`. New rows
+are numbered after the largest existing identifier of each table, so the data can
+be loaded next to existing reference data (species, gene databases).
+
+Geneset sizes follow a log-normal distribution, a configurable share of genesets
+is private (tier 5, readable only by their owner's groups) and a share of genes
+have homologs in every generated species. The output is deterministic for a given
+`--seed`.
+
+Usage:
+
+    python -m benchmarks.synthetic_data --genesets 100000 --median-size 50
+    python -m benchmarks.synthetic_data --genesets 1000 --dry-run
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import psycopg
+from geneweaver.core.enum import (
+    AdminLevelInt,
+    GeneIdentifier,
+    GenesetTier,
+    ScoreType,
+    Species,
+)
+from psycopg.sql import SQL, Identifier
+
+# Table (schema, name) and the columns populated, in row order.
+TABLES = {
+    "usr": (
+        ("production", "usr"),
+        ("usr_id", "usr_email", "usr_first_name", "usr_last_name", "usr_admin")
+        + ("usr_created", "usr_sso_id"),
+    ),
+    "grp": (("production", "grp"), ("grp_id", "grp_name", "grp_private")),
+    "usr2grp": (
+        ("production", "usr2grp"),
+        ("usr_id", "grp_id", "u2g_privileges"),
+    ),
+    "publication": (
+        ("production", "publication"),
+        ("pub_id", "pub_authors", "pub_title", "pub_abstract", "pub_journal")
+        + ("pub_volume", "pub_pages", "pub_month", "pub_year", "pub_pubmed"),
+    ),
+    "gene": (
+        ("extsrc", "gene"),
+        ("ode_gene_id", "ode_ref_id", "gdb_id", "sp_id", "ode_pref", "ode_date"),
+    ),
+    "gene_info": (
+        ("extsrc", "gene_info"),
+        ("ode_gene_id", "gi_symbol", "gi_name", "gi_type", "sp_id", "gene_rank"),
+    ),
+    "homology": (
+        ("extsrc", "homology"),
+        ("hom_id", "ode_gene_id", "sp_id", "hom_source_name", "hom_date"),
+    ),
+    "file": (
+        ("production", "file"),
+        ("file_id", "file_size", "file_contents", "file_comments", "file_created"),
+    ),
+    "geneset": (
+        ("production", "geneset"),
+        ("gs_id", "usr_id", "file_id", "gs_name", "gs_abbreviation", "pub_id")
+        + ("cur_id", "gs_description", "sp_id", "gs_count", "gs_threshold_type")
+        + ("gs_threshold", "gs_groups", "gs_gene_id_type", "gs_created")
+        + ("gs_updated", "gs_status", "gs_attribution"),
+    ),
+    "geneset_value": (
+        ("extsrc", "geneset_value"),
+        ("gs_id", "ode_gene_id", "gsv_value", "gsv_source_list", "gsv_value_list")
+        + ("gsv_in_threshold", "gsv_hits", "gsv_date"),
+    ),
+}
+
+# Identifier column of each table, used to number new rows after existing ones.
+ID_COLUMNS = {
+    "usr": "usr_id",
+    "grp": "grp_id",
+    "publication": "pub_id",
+    "gene": "ode_gene_id",
+    "homology": "hom_id",
+    "file": "file_id",
+    "geneset": "gs_id",
+}
+
+EPOCH = datetime(2010, 1, 1)
+SYMBOL = GeneIdentifier.GENE_SYMBOL
+ENSEMBL = GeneIdentifier.ENSEMBLE_GENE
+
+
+class Plan(NamedTuple):
+    """The size and shape of the generated dataset."""
+
+    seed: int
+    users: int
+    groups: int
+    publications: int
+    genesets: int
+    species: Tuple[Species, ...]
+    genes_per_species: int
+    homolog_fraction: float
+    median_size: int
+    private_fraction: float
+    deleted_fraction: float
+
+
+class Offsets(NamedTuple):
+    """The largest existing identifier of each table."""
+
+    usr: int = 0
+    grp: int = 0
+    publication: int = 0
+    gene: int = 0
+    homology: int = 0
+    file: int = 0
+    geneset: int = 0
+
+
+def date_for(rng: random.Random) -> datetime:
+    """Pick a creation date between 2010 and 2024."""
+    return EPOCH + timedelta(days=rng.randrange(15 * 365))
+
+
+def users(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate users, the first one is a curator."""
+    rng = random.Random(plan.seed)
+    for i in range(1, plan.users + 1):
+        usr_id = offsets.usr + i
+        yield (
+            usr_id,
+            f"synthetic-{usr_id}@example.org",
+            "Synthetic",
+            f"User {usr_id}",
+            int(AdminLevelInt.CURATOR if i == 1 else AdminLevelInt.NORMAL_USER),
+            date_for(rng),
+            f"synthetic|{usr_id}",
+        )
+
+
+def groups(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate private groups."""
+    for i in range(1, plan.groups + 1):
+        yield offsets.grp + i, f"Synthetic group {offsets.grp + i}", True
+
+
+def memberships(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Put every user in one to three groups."""
+    rng = random.Random(plan.seed + 1)
+    for i in range(1, plan.users + 1):
+        joined = rng.randint(1, min(plan.groups, 3))
+        for grp in rng.sample(range(1, plan.groups + 1), joined):
+            yield offsets.usr + i, offsets.grp + grp, 0
+
+
+def publications(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate publications with unique PubMed identifiers."""
+    rng = random.Random(plan.seed + 2)
+    for i in range(1, plan.publications + 1):
+        pub_id = offsets.publication + i
+        yield (
+            pub_id,
+            f"Author {rng.randrange(1000)} et al.",
+            f"Synthetic study {pub_id}",
+            "Synthetic abstract. " * rng.randrange(5, 40),
+            f"Journal {rng.randrange(200)}",
+            str(rng.randrange(1, 60)),
+            f"{rng.randrange(1, 900)}-{rng.randrange(900, 1800)}",
+            rng.choice(("Jan", "Apr", "Jul", "Oct")),
+            str(rng.randrange(1990, 2025)),
+            str(90_000_000 + pub_id),
+        )
+
+
+def gene_id(plan: Plan, offsets: Offsets, species: int, gene: int) -> int:
+    """Get the `ode_gene_id` of the n-th gene of the n-th species."""
+    return offsets.gene + species * plan.genes_per_species + gene + 1
+
+
+def genes(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate a preferred symbol and an Ensembl identifier for every gene."""
+    for s, species in enumerate(plan.species):
+        for g in range(plan.genes_per_species):
+            ode_gene_id = gene_id(plan, offsets, s, g)
+            yield ode_gene_id, f"Gene{s}x{g}", int(SYMBOL), int(species), True, EPOCH
+            yield (
+                ode_gene_id,
+                f"ENSSYN{s:02d}{g:09d}",
+                int(ENSEMBL),
+                int(species),
+                False,
+                EPOCH,
+            )
+
+
+def gene_info(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate gene info rows, with gene ranks used to prioritize genes."""
+    rng = random.Random(plan.seed + 3)
+    for s, species in enumerate(plan.species):
+        for g in range(plan.genes_per_species):
+            yield (
+                gene_id(plan, offsets, s, g),
+                f"Gene{s}x{g}",
+                f"Synthetic gene {g}",
+                "protein-coding",
+                int(species),
+                rng.random(),
+            )
+
+
+def homology(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Make the n-th gene of every species homologous, for a share of genes."""
+    homologs = int(plan.genes_per_species * plan.homolog_fraction)
+    for g in range(homologs):
+        for s, species in enumerate(plan.species):
+            yield (
+                offsets.homology + g + 1,
+                gene_id(plan, offsets, s, g),
+                int(species),
+                "Homologene",
+                EPOCH,
+            )
+
+
+class Geneset(NamedTuple):
+    """A generated geneset and its values."""
+
+    row: tuple
+    genes: List[Tuple[int, str, float, bool]]
+
+
+def geneset(plan: Plan, offsets: Offsets, n: int) -> Geneset:
+    """Generate the n-th geneset.
+
+    Each geneset has its own random generator, so genesets, files and values can
+    be generated in separate passes (one `COPY` per table) and still agree.
+    """
+    rng = random.Random(plan.seed * 1_000_003 + n)
+    gs_id = offsets.geneset + n
+    species_index = rng.randrange(len(plan.species))
+    size = min(
+        plan.genes_per_species,
+        max(1, int(rng.lognormvariate(math.log(plan.median_size), 1.0))),
+    )
+    genes_picked = rng.sample(range(plan.genes_per_species), size)
+    binary = rng.random() < 0.5
+    values = []
+    for g in genes_picked:
+        value = 1.0 if binary else rng.uniform(0, 0.1)
+        values.append(
+            (
+                gene_id(plan, offsets, species_index, g),
+                f"Gene{species_index}x{g}",
+                value,
+                binary or value <= 0.05,
+            )
+        )
+
+    private = rng.random() < plan.private_fraction
+    created = date_for(rng)
+    row = (
+        gs_id,
+        offsets.usr + rng.randrange(1, plan.users + 1),
+        offsets.file + n,
+        f"Synthetic geneset {gs_id}",
+        f"SYN{gs_id}",
+        (
+            offsets.publication + rng.randrange(1, plan.publications + 1)
+            if plan.publications and rng.random() < 0.6
+            else None
+        ),
+        int(GenesetTier.TIER5) if private else rng.randrange(1, 5),
+        "A synthetic geneset for performance testing.",
+        int(plan.species[species_index]),
+        size,
+        int(ScoreType.BINARY if binary else ScoreType.P_VALUE),
+        "1" if binary else "0.05",
+        str(offsets.grp + rng.randrange(1, plan.groups + 1)) if private else "0",
+        int(SYMBOL),
+        created,
+        created + timedelta(days=rng.randrange(365)),
+        "deleted" if rng.random() < plan.deleted_fraction else "normal",
+        None,
+    )
+    return Geneset(row, values)
+
+
+def all_genesets(plan: Plan, offsets: Offsets) -> Iterator[Geneset]:
+    """Generate every geneset."""
+    for n in range(1, plan.genesets + 1):
+        yield geneset(plan, offsets, n)
+
+
+def geneset_rows(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate geneset rows."""
+    for gs in all_genesets(plan, offsets):
+        yield gs.row
+
+
+def files(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate the uploaded file of every geneset."""
+    for gs in all_genesets(plan, offsets):
+        contents = "\n".join(f"{symbol}\t{value}" for _, symbol, value, _ in gs.genes)
+        yield gs.row[2], len(contents), contents, "", gs.row[14]
+
+
+def geneset_values(plan: Plan, offsets: Offsets) -> Iterator[tuple]:
+    """Generate the values of every geneset."""
+    for gs in all_genesets(plan, offsets):
+        gs_id, created = gs.row[0], gs.row[14]
+        for ode_gene_id, symbol, value, in_threshold in gs.genes:
+            yield (
+                gs_id,
+                ode_gene_id,
+                value,
+                [symbol],
+                [value],
+                in_threshold,
+                0,
+                created,
+            )
+
+
+GENERATORS = {
+    "usr": users,
+    "grp": groups,
+    "usr2grp": memberships,
+    "publication": publications,
+    "gene": genes,
+    "gene_info": gene_info,
+    "homology": homology,
+    "file": files,
+    "geneset": geneset_rows,
+    "geneset_value": geneset_values,
+}
+
+
+def estimate(plan: Plan) -> Dict[str, int]:
+    """Estimate the number of rows generated per table, without generating them."""
+    genes_total = plan.genes_per_species * len(plan.species)
+    # Mean of the log-normal size distribution (sigma = 1), before capping.
+    mean_size = min(plan.median_size * math.exp(0.5), plan.genes_per_species)
+    return {
+        "usr": plan.users,
+        "grp": plan.groups,
+        "usr2grp": plan.users * (1 + min(plan.groups, 3)) // 2,
+        "publication": plan.publications,
+        "gene": genes_total * 2,
+        "gene_info": genes_total,
+        "homology": int(plan.genes_per_species * plan.homolog_fraction)
+        * len(plan.species),
+        "file": plan.genesets,
+        "geneset": plan.genesets,
+        "geneset_value": int(plan.genesets * mean_size),
+    }
+
+
+def copy_rows(cursor: psycopg.Cursor, table: str, rows: Iterable[tuple]) -> int:
+    """Bulk load rows into a table with `COPY`.
+
+    :return: the number of rows loaded.
+    """
+    (schema, name), columns = TABLES[table]
+    query = SQL("COPY {table} ({columns}) FROM STDIN").format(
+        table=Identifier(schema, name),
+        columns=SQL(", ").join(Identifier(c) for c in columns),
+    )
+    count = 0
+    with cursor.copy(query) as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def load(plan: Plan, dsn: str) -> None:
+    """Generate the dataset and load it into the database."""
+    with psycopg.connect(dsn) as conn, conn.cursor() as cursor:
+        existing = {}
+        for table, column in ID_COLUMNS.items():
+            (schema, name), _ = TABLES[table]
+            cursor.execute(
+                SQL("SELECT COALESCE(MAX({column}), 0) FROM {table}").format(
+                    column=Identifier(column), table=Identifier(schema, name)
+                )
+            )
+            existing[table] = cursor.fetchone()[0]
+        offsets = Offsets(**existing)
+
+        for table, generator in GENERATORS.items():
+            start = time.perf_counter()
+            count = copy_rows(cursor, table, generator(plan, offsets))
+            print(
+                f"{table:<15} {count:>12,d} rows {time.perf_counter() - start:>8.1f} s"
+            )
+
+        for table, column in ID_COLUMNS.items():
+            (schema, name), _ = TABLES[table]
+            cursor.execute(
+                "SELECT pg_get_serial_sequence(%s, %s)", (f"{schema}.{name}", column)
+            )
+            sequence = cursor.fetchone()[0]
+            if sequence is not None:
+                cursor.execute(
+                    SQL(
+                        "SELECT setval(%s, (SELECT MAX({column}) FROM {table}))"
+                    ).format(column=Identifier(column), table=Identifier(schema, name)),
+                    (sequence,),
+                )
+        conn.commit()
+
+        conn.autocommit = True
+        for (schema, name), _ in TABLES.values():
+            conn.execute(SQL("ANALYZE {table}").format(table=Identifier(schema, name)))
+
+
+def main() -> None:
+    """Parse arguments and generate the dataset."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", help="Database URI, defaults to the API settings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--publications", type=int, default=20000)
+    parser.add_argument("--genesets", type=int, default=100000)
+    parser.add_argument(
+        "--species",
+        nargs="+",
+        type=int,
+        default=[int(Species.MUS_MUSCULUS), int(Species.HOMO_SAPIENS)],
+        help="Species identifiers",
+    )
+    parser.add_argument("--genes-per-species", type=int, default=20000)
+    parser.add_argument("--homolog-fraction", type=float, default=0.7)
+    parser.add_argument("--median-size", type=int, default=50)
+    parser.add_argument("--private-fraction", type=float, default=0.2)
+    parser.add_argument("--deleted-fraction", type=float, default=0.01)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    plan = Plan(
+        seed=args.seed,
+        users=args.users,
+        groups=max(1, args.groups),
+        publications=args.publications,
+        genesets=args.genesets,
+        species=tuple(Species(s) for s in args.species),
+        genes_per_species=args.genes_per_species,
+        homolog_fraction=args.homolog_fraction,
+        median_size=args.median_size,
+        private_fraction=args.private_fraction,
+        deleted_fraction=args.deleted_fraction,
+    )
+
+    if args.dry_run:
+        for table, rows in estimate(plan).items():
+            print(f"{table:<15} ~{rows:>12,d} rows")
+        return
+
+    if args.dsn:
+        dsn = args.dsn
+    else:
+        from geneweaver.api.core.config import settings
+
+        dsn = settings.DB.URI
+    load(plan, dsn)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from fastapi import APIRouter, FastAPI, Security
 from geneweaver.api import __version__
 from geneweaver.api import dependencies as deps
 from geneweaver.api.controller import (
+    exports,
     genes,
     genesets,
     monitors,
@@ -15,7 +16,10 @@ from geneweaver.api.controller import (
     search,
     species,
 )
+from geneweaver.api.core.compression import CompressionMiddleware
 from geneweaver.api.core.config import settings
+from geneweaver.api.core.metrics import MetricsMiddleware
+from geneweaver.api.core.tracing import TracingMiddleware
 
 app = FastAPI(
     title="GeneWeaver API",
@@ -30,6 +34,20 @@ app = FastAPI(
     },
     lifespan=deps.lifespan,
 )
+app.add_middleware(
+    TracingMiddleware,
+    slow_request_ms=settings.SLOW_REQUEST_DB_MS,
+    server_timing_header=settings.SERVER_TIMING_HEADER,
+)
+app.add_middleware(MetricsMiddleware)
+if settings.COMPRESSION_MINIMUM_SIZE is not None:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
 
 api_router = APIRouter(
     dependencies=[
@@ -42,5 +60,6 @@ api_router.include_router(publications.router)
 api_router.include_router(species.router)
 api_router.include_router(search.router)
 api_router.include_router(monitors.router)
+api_router.include_router(exports.router)
 
 app.include_router(api_router, prefix=settings.API_PREFIX)
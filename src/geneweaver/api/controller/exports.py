@@ -0,0 +1,57 @@
+"""Endpoints related to bulk geneset exports."""
+
+from fastapi import APIRouter, Path, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from geneweaver.api import dependencies as deps
+from geneweaver.api.schemas.apimodels import GenesetExportReq
+from geneweaver.api.services import export as export_service
+from jax.apiutils import Response
+from typing_extensions import Annotated
+
+from . import message as api_message
+from .utilities import raise_http_error
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+JobId = Annotated[
+    str, Path(pattern="^[0-9a-f]{32}$", description=api_message.EXPORT_JOB_ID)
+]
+
+
+@router.post("", status_code=202)
+def create_export(
+    request: Request,
+    export: GenesetExportReq,
+    user: deps.OptionalFullUserDep,
+) -> Response:
+    """Start a bulk export of the visible genesets matching filters."""
+    response = export_service.create_export_job(request.app.pool, user, export)
+
+    raise_http_error(response)
+
+    return Response(response.get("data"))
+
+
+@router.get("/{job_id}")
+def get_export(job_id: JobId, user: deps.OptionalFullUserDep) -> Response:
+    """Get the status of a bulk export."""
+    response = export_service.get_export_job(job_id, user)
+
+    raise_http_error(response)
+
+    return Response(response.get("data"))
+
+
+@router.get("/{job_id}/file", response_class=FileResponse)
+def get_export_file(job_id: JobId, user: deps.OptionalFullUserDep) -> StreamingResponse:
+    """Download the file of a complete bulk export."""
+    response = export_service.get_export_file(job_id, user)
+
+    raise_http_error(response)
+
+    filename = f"geneset_export_{job_id}.{response['format'].value}"
+    return FileResponse(
+        response["file"],
+        media_type=export_service.MEDIA_TYPES[response["format"]],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
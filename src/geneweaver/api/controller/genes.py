@@ -1,22 +1,26 @@
 """Endpoints related to genes."""
 
-from typing import Optional
+from typing import List, Optional, Set
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request
 from geneweaver.api import dependencies as deps
 from geneweaver.api.schemas.apimodels import (
+    CountMode,
+    GeneGenesetsReq,
     GeneIdHomologReq,
     GeneIdMappingAonReq,
     GeneIdMappingReq,
     GeneIdMappingResp,
+    GeneMatch,
 )
 from geneweaver.api.services import genes as genes_service
-from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.gene import Gene
 from jax.apiutils import CollectionResponse, Response
 from typing_extensions import Annotated
 
 from . import message as api_message
+from .utilities import paging
 
 router = APIRouter(prefix="/genes", tags=["genes"])
 
@@ -61,6 +65,94 @@ def get_genes(
     return CollectionResponse[Gene](**response)
 
 
+@router.get("/genesets")
+def get_genesets_by_genes(
+    request: Request,
+    cursor: deps.CursorDep,
+    user: deps.OptionalFullUserDep,
+    gene: Annotated[
+        List[str],
+        Query(min_length=1, max_length=10000, description=api_message.GENE_LIST),
+    ],
+    species: Optional[Species] = None,
+    match: Annotated[GeneMatch, Query(description=api_message.GENE_MATCH)] = (
+        GeneMatch.ANY
+    ),
+    in_threshold: Annotated[bool, Query(description=api_message.IN_THRESHOLD)] = True,
+    curation_tier: Annotated[Optional[Set[GenesetTier]], Query()] = None,
+    limit: Annotated[
+        int,
+        Query(
+            format="int64",
+            ge=0,
+            le=1000,
+            description=api_message.LIMIT,
+        ),
+    ] = 10,
+    offset: Annotated[
+        int,
+        Query(
+            format="int64",
+            ge=0,
+            description=api_message.OFFSET,
+        ),
+    ] = 0,
+    count: Annotated[
+        Optional[CountMode], Query(description=api_message.COUNT_MODE)
+    ] = None,
+    count_only: Annotated[bool, Query(description=api_message.COUNT_ONLY)] = False,
+) -> CollectionResponse:
+    """Get the visible genesets containing any or all of the given genes."""
+    gene_genesets = GeneGenesetsReq(
+        genes=gene,
+        species=species,
+        match=match,
+        in_threshold=in_threshold,
+        curation_tier=curation_tier,
+        limit=limit,
+        offset=offset,
+        count=count,
+        count_only=count_only,
+    )
+    return post_genesets_by_genes(request, gene_genesets, cursor, user)
+
+
+@router.post("/genesets")
+def post_genesets_by_genes(
+    request: Request,
+    gene_genesets: GeneGenesetsReq,
+    cursor: deps.CursorDep,
+    user: deps.OptionalFullUserDep,
+) -> CollectionResponse:
+    """Get the visible genesets containing any or all of a (long) list of genes."""
+    response = genes_service.get_genesets_by_genes(
+        cursor,
+        gene_genesets.genes,
+        user=user,
+        species=gene_genesets.species,
+        match=gene_genesets.match,
+        in_threshold=gene_genesets.in_threshold,
+        curation_tier=gene_genesets.curation_tier,
+        limit=gene_genesets.limit,
+        offset=gene_genesets.offset,
+        count_mode=gene_genesets.count,
+        count_only=gene_genesets.count_only,
+    )
+
+    if gene_genesets.count is None and not gene_genesets.count_only:
+        return CollectionResponse(**response)
+
+    return CollectionResponse(
+        response.get("data"),
+        paging=paging(
+            request.url,
+            response.get("total"),
+            0 if gene_genesets.count_only else gene_genesets.limit,
+            gene_genesets.offset,
+        ),
+    )
+
+
 @router.get("/{gene_id}/preferred")
 def get_gene_preferred(
     gene_id: Annotated[
@@ -8,10 +8,21 @@ from typing import Optional, Set
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Security
 from fastapi.responses import FileResponse, StreamingResponse
 from geneweaver.api import dependencies as deps
+from geneweaver.api.core.compression import negotiate
+from geneweaver.api.schemas.apimodels import (
+    CountMode,
+    GenesetCompareReq,
+    GenesetEnrichmentReq,
+    GenesetFileFormat,
+    GenesetSimilarReq,
+    ValueOrder,
+)
 from geneweaver.api.schemas.auth import UserInternal
 from geneweaver.api.schemas.search import GenesetSearch
+from geneweaver.api.services import compare as compare_service
+from geneweaver.api.services import enrichment as enrichment_service
+from geneweaver.api.services import export as export_service
 from geneweaver.api.services import geneset as geneset_service
-from geneweaver.api.services import publications as publication_service
 from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.geneset import GeneValue
 from geneweaver.core.schema.publication import Publication
@@ -21,13 +32,14 @@ from jax.apiutils import CollectionResponse, Response
 from typing_extensions import Annotated
 
 from . import message as api_message
-from .utilities import raise_http_error
+from .utilities import paging, raise_http_error
 
 router = APIRouter(prefix="/genesets", tags=["genesets"])
 
 
 @router.get("")
 def get_visible_genesets(
+    request: Request,
     cursor: deps.CursorDep,
     user: deps.OptionalFullUserDep,
     gs_id: Annotated[
@@ -115,6 +127,9 @@ def get_visible_genesets(
             description=api_message.OFFSET,
         ),
     ] = None,
+    count: Annotated[
+        Optional[CountMode], Query(description=api_message.COUNT_MODE)
+    ] = None,
 ) -> CollectionResponse:
     """Get all visible genesets."""
     response = geneset_service.get_visible_genesets(
@@ -141,11 +156,18 @@ def get_visible_genesets(
         updated_before=updated_before,
         limit=limit,
         offset=offset,
+        count_mode=count,
     )
 
     raise_http_error(response)
 
-    return CollectionResponse(**response)
+    if count is None:
+        return CollectionResponse(**response)
+
+    return CollectionResponse(
+        response.get("data"),
+        paging=paging(request.url, response.get("total"), limit, offset),
+    )
 
 
 @router.get("/search")
@@ -167,6 +189,66 @@ def search(
     )
 
 
+@router.post("/compare")
+def compare_genesets(
+    geneset_compare: GenesetCompareReq,
+    user: deps.OptionalFullUserDep,
+    cursor: Optional[deps.Cursor] = Depends(deps.cursor),
+) -> Response:
+    """Compare the genes of genesets, pairwise intersection, union and Jaccard index."""
+    response = compare_service.compare_genesets(
+        cursor=cursor,
+        geneset_ids=geneset_compare.geneset_ids,
+        user=user,
+        in_threshold=geneset_compare.in_threshold,
+    )
+
+    raise_http_error(response)
+
+    return Response(response.get("data"))
+
+
+@router.post("/similar")
+def find_similar_genesets(
+    geneset_similar: GenesetSimilarReq,
+    user: deps.OptionalFullUserDep,
+    cursor: Optional[deps.Cursor] = Depends(deps.cursor),
+) -> Response:
+    """Find the visible genesets most similar to a gene list or geneset."""
+    response = compare_service.find_similar_genesets(
+        cursor=cursor, user=user, **geneset_similar.model_dump()
+    )
+
+    raise_http_error(response)
+
+    return Response(response.get("data"))
+
+
+@router.post("/enrichment")
+def get_enrichment(
+    geneset_enrichment: GenesetEnrichmentReq,
+    user: deps.OptionalFullUserDep,
+    cursor: Optional[deps.Cursor] = Depends(deps.cursor),
+) -> Response:
+    """Test a gene list for over-representation in the visible genesets."""
+    response = enrichment_service.get_enrichment(
+        cursor=cursor,
+        genes=geneset_enrichment.genes,
+        species=geneset_enrichment.species,
+        user=user,
+        curation_tier=geneset_enrichment.curation_tier,
+        only_my_genesets=geneset_enrichment.only_my_genesets,
+        score_type=geneset_enrichment.score_type,
+        lte_count=geneset_enrichment.size_less_than,
+        gte_count=geneset_enrichment.size_greater_than,
+        background_size=geneset_enrichment.background_size,
+        max_q_value=geneset_enrichment.max_q_value,
+        limit=geneset_enrichment.limit,
+    )
+
+    return Response(response.get("data"))
+
+
 @router.get("/{geneset_id}")
 def get_geneset(
     geneset_id: Annotated[
@@ -201,6 +283,16 @@ def get_geneset_values(
     cursor: Optional[deps.Cursor] = Depends(deps.cursor),
     gene_id_type: Optional[GeneIdentifier] = None,
     in_threshold: Optional[bool] = None,
+    min_value: Annotated[
+        Optional[float], Query(description=api_message.MIN_VALUE)
+    ] = None,
+    max_value: Annotated[
+        Optional[float], Query(description=api_message.MAX_VALUE)
+    ] = None,
+    top_n: Annotated[Optional[int], Query(ge=1, description=api_message.TOP_N)] = None,
+    order_by: Annotated[
+        Optional[ValueOrder], Query(description=api_message.VALUE_ORDER)
+    ] = None,
 ) -> CollectionResponse[GeneValue]:
     """Get geneset gene values by geneset ID."""
     response = geneset_service.get_geneset_gene_values(
@@ -209,6 +301,10 @@ def get_geneset_values(
         user=user,
         gene_id_type=gene_id_type,
         in_threshold=in_threshold,
+        min_value=min_value,
+        max_value=max_value,
+        top_n=top_n,
+        order_by=order_by,
     )
 
     raise_http_error(response)
@@ -223,6 +319,7 @@ def get_geneset_values(
 
 @router.get("/{geneset_id}/file", response_class=FileResponse)
 def get_export_geneset_by_id_type(
+    request: Request,
     geneset_id: Annotated[
         int, Path(format="int64", minimum=0, maxiumum=9223372036854775807)
     ],
@@ -230,27 +327,55 @@ def get_export_geneset_by_id_type(
     cursor: Optional[deps.Cursor] = Depends(deps.cursor),
     temp_dir: TemporaryDirectory = Depends(deps.get_temp_dir),
     gene_id_type: Optional[GeneIdentifier] = None,
+    file_format: Annotated[
+        GenesetFileFormat, Query(alias="format", description=api_message.EXPORT_FORMAT)
+    ] = GenesetFileFormat.JSON,
 ) -> StreamingResponse:
-    """Export geneset into JSON file. Search by ID and optional gene identifier type."""
+    """Export geneset into JSON or Parquet file, with optional gene identifier type."""
     current_datetime = datetime.now()
     timestr = current_datetime.strftime("%Y%m%d-%H%M%S")
 
-    # Validate gene identifier type
-    if gene_id_type:
-        response = geneset_service.get_geneset_w_gene_id_type(
-            cursor, geneset_id, user, gene_id_type
-        )
-    else:
-        response = geneset_service.get_geneset(cursor, geneset_id, user)
+    response = export_service.get_geneset_export(
+        cursor, geneset_id, user, gene_id_type, file_format
+    )
 
     if "error" in response:
         raise_http_error(response)
 
     id_type = response.get("gene_identifier_type")
     if id_type:
-        geneset_filename = f"geneset_{geneset_id}_{id_type}_{timestr}.json"
+        geneset_filename = f"geneset_{geneset_id}_{id_type}_{timestr}"
     else:
-        geneset_filename = f"geneset_{geneset_id}_{timestr}.json"
+        geneset_filename = f"geneset_{geneset_id}_{timestr}"
+    geneset_filename = f"{geneset_filename}.{file_format.value}"
+    headers = {"Content-Disposition": f"attachment; filename={geneset_filename}"}
+
+    if file_format == GenesetFileFormat.PARQUET:
+        if "file" in response:
+            return FileResponse(
+                response["file"],
+                media_type=export_service.PARQUET_MEDIA_TYPE,
+                headers=headers,
+            )
+        return StreamingResponse(
+            iter([export_service.geneset_parquet(response)]),
+            media_type=export_service.PARQUET_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    # Precompressed artifact, sent as it is to clients accepting gzip
+    if "file" in response:
+        headers["Vary"] = "Accept-Encoding"
+        if negotiate(request.headers.get("accept-encoding", ""), ["gzip"]):
+            headers["Content-Encoding"] = "gzip"
+            return FileResponse(
+                response["file"], media_type="application/octet-stream", headers=headers
+            )
+        return StreamingResponse(
+            export_service.read_artifact(response["file"]),
+            media_type="application/octet-stream",
+            headers=headers,
+        )
 
     # Write the data to temp file
     from io import StringIO
@@ -265,7 +390,7 @@ def get_export_geneset_by_id_type(
     return StreamingResponse(
         buffer,
         media_type="application/octet-stream",
-        headers={"Content-Disposition": f"attachment; filename={geneset_filename}"},
+        headers=headers,
     )
 
 
@@ -297,26 +422,11 @@ def get_publication_for_geneset(
     cursor: Optional[deps.Cursor] = Depends(deps.cursor),
 ) -> Response[Publication]:
     """Get the publication associated with the geneset."""
-    geneset_resp = geneset_service.get_geneset_metadata(cursor, geneset_id, user, True)
+    response = geneset_service.get_geneset_publication(cursor, geneset_id, user)
 
-    if "error" in geneset_resp:
-        raise_http_error(geneset_resp)
-
-    geneset = geneset_resp.get("object")
-
-    if geneset is None:
-        raise HTTPException(status_code=404, detail=api_message.RECORD_NOT_FOUND_ERROR)
-
-    pub_id = geneset.get("publication_id")
-    if pub_id is None:
-        raise HTTPException(status_code=404, detail=api_message.RECORD_NOT_FOUND_ERROR)
-
-    pub_resp = publication_service.get_publication(cursor, pub_id)
-
-    if pub_resp is None:
-        raise HTTPException(status_code=404, detail=api_message.RECORD_NOT_FOUND_ERROR)
+    raise_http_error(response)
 
-    return Response[Publication](pub_resp)
+    return Response[Publication](response.get("object"))
 
 
 @router.put("/{geneset_id}/threshold", status_code=204)
@@ -9,6 +9,9 @@ RECORD_NOT_FOUND_ERROR = "Record not found"
 INVALID_PUBMED_ID_ERROR = "Invalid pubmed id"
 RECORD_EXISTS = "Record already in the system"
 PUBMED_RETRIEVING_ERROR = "Error retrieving publication info from PubMed API"
+EXPORTS_UNAVAILABLE = "Bulk exports are not enabled on this server"
+EXPORT_NOT_READY = "The export is not complete"
+EXPORT_FORMAT_UNAVAILABLE = "This export format is not available on this server"
 
 ##FORM field descriptions
 GENE_REFERENCE = "The reference id to search for"
@@ -32,3 +35,20 @@ ONTOLOGY_ID = "Ontology term reference ID"
 CREATE_DATE = "Create date limit (before or after). E.g. 2024-08-01"
 UPDATE_DATE = "Update date limit (before or after). E.g. 2023-07-01"
 GENESET_SIZE = "Geneset size (Genes count)"
+GENE_LIST = "Gene reference ids (e.g. symbols), repeat the parameter for each gene"
+GENE_MATCH = "Return genesets containing 'any' or 'all' of the genes"
+IN_THRESHOLD = "Only match genes within the geneset's threshold"
+MIN_VALUE = "Only return values greater than or equal to this"
+MAX_VALUE = "Only return values less than or equal to this"
+TOP_N = (
+    "Only return this many values, the most significant for the geneset's score "
+    "type unless `order_by` is set"
+)
+VALUE_ORDER = "Order by value, 'value' for ascending and '-value' for descending"
+EXPORT_FORMAT = "Export file format"
+EXPORT_JOB_ID = "Export job ID, as returned when the export was requested"
+COUNT_ONLY = "Only return the total number of results, not the results"
+COUNT_MODE = (
+    "Return the total number of results: 'exact', 'estimated' (from planner "
+    "statistics) or 'cached' (exact, cached for a short time)"
+)
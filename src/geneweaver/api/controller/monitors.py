@@ -3,8 +3,14 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from geneweaver.api import dependencies as deps
+from geneweaver.api.core import metrics
+from geneweaver.api.core.cache import caches
+from geneweaver.api.core.config import settings
+from geneweaver.api.schemas.apimodels import HealthStatus
 from geneweaver.api.services import monitors as monitors_service
 from jax.apiutils import Response
 from typing_extensions import Annotated
@@ -33,3 +39,44 @@ def get_health_check(
         response["DB_status"] = db_health_response
 
     return Response(response)
+
+
+@router.get("/servers/live")
+def get_liveness_check() -> Response:
+    """Return 200 API response if the process is serving requests.
+
+    The liveness check never touches the DB or its connection pool.
+    """
+    return Response({"status": HealthStatus.UP, "datetime": datetime.utcnow()})
+
+
+@router.get("/servers/ready")
+def get_readiness_check(request: Request) -> Response:
+    """Check DB latency, pool availability, cache and auth key freshness.
+
+    Returns 503 if the API can not serve requests, and a DEGRADED status if it can
+    but a latency or freshness budget is exceeded.
+    """
+    response = monitors_service.check_readiness(
+        pool=getattr(request.app, "pool", None),
+        caches=caches,
+        jwks=deps.auth.jwks if deps.auth.jwks_fetched_at is not None else None,
+        jwks_fetched_at=deps.auth.jwks_fetched_at,
+        db_latency_budget_ms=settings.HEALTH_DB_LATENCY_BUDGET_MS,
+        pool_timeout=settings.HEALTH_POOL_TIMEOUT,
+        cache_max_age=settings.HEALTH_CACHE_MAX_AGE,
+        jwks_max_age=settings.HEALTH_JWKS_MAX_AGE,
+    )
+    response["datetime"] = datetime.utcnow()
+
+    if response["status"] == HealthStatus.DOWN:
+        raise HTTPException(status_code=503, detail=jsonable_encoder(response))
+
+    return Response(response)
+
+
+@router.get("/metrics", response_class=StreamingResponse)
+def get_metrics(request: Request) -> StreamingResponse:
+    """Return DB pool, cache and request metrics in the Prometheus text format."""
+    content = monitors_service.get_metrics(getattr(request.app, "pool", None), caches)
+    return StreamingResponse(iter((content,)), media_type=metrics.CONTENT_TYPE)
@@ -1,37 +1,77 @@
-"""Endpoints related to species."""
+"""Endpoints related to species.
+
+Species are served from the in-process reference snapshot, with an ETag so clients
+can revalidate their cached copy without downloading it again.
+"""
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Query, Request
+from fastapi import Response as HTTPResponse
 from geneweaver.api import dependencies as deps
+from geneweaver.api.core.config import settings
 from geneweaver.api.services import species as species_service
 from geneweaver.core.enum import GeneIdentifier, Species
 from geneweaver.core.schema.species import Species as SpeciesSchema
 from jax.apiutils import CollectionResponse, Response
 from typing_extensions import Annotated
 
+from .utilities import not_modified, raise_http_error
+
 router = APIRouter(prefix="/species", tags=["species"])
 
 
+def cache_headers(etag: str) -> dict:
+    """Get the caching headers of a species response."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE}",
+    }
+
+
 @router.get("")
 def get_species(
-    cursor: Optional[deps.Cursor] = Depends(deps.cursor),
+    request: Request,
+    http_response: HTTPResponse,
     taxonomy_id: Annotated[
         Optional[int], Query(format="int64", minimum=0, maxiumum=9223372036854775807)
     ] = None,
     reference_gene_id_type: Optional[GeneIdentifier] = None,
 ) -> CollectionResponse[SpeciesSchema]:
     """Get species."""
-    response = species_service.get_species(cursor, taxonomy_id, reference_gene_id_type)
+    data = species_service.reference.get(request.app.pool)
+    if not_modified(request, data.etag):
+        return HTTPResponse(status_code=304, headers=cache_headers(data.etag))
+
+    response = species_service.get_species(data, taxonomy_id, reference_gene_id_type)
 
+    http_response.headers.update(cache_headers(data.etag))
     return CollectionResponse(**response)
 
 
 @router.get("/{species_id}")
 def get_species_by_id(
-    species_id: Species, cursor: Optional[deps.Cursor] = Depends(deps.cursor)
+    species_id: Species, request: Request, http_response: HTTPResponse
 ) -> Response[SpeciesSchema]:
     """Get species."""
-    response = species_service.get_species_by_id(cursor, species_id)
+    data = species_service.reference.get(request.app.pool)
+    if not_modified(request, data.etag):
+        return HTTPResponse(status_code=304, headers=cache_headers(data.etag))
+
+    response = species_service.get_species_by_id(data, species_id)
 
+    http_response.headers.update(cache_headers(data.etag))
     return Response(response)
+
+
+@router.post("/refresh")
+def refresh_species(cursor: deps.CursorDep, user: deps.FullUserDep) -> Response:
+    """Reload the species and gene databases now (admins only).
+
+    Other workers pick up any change to the tables on their next fingerprint check.
+    """
+    response = species_service.refresh_reference(cursor, user)
+
+    raise_http_error(response)
+
+    return Response(response.get("data"))
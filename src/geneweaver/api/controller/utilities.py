@@ -1,6 +1,11 @@
 """Utilities for FastAPI Controller."""
 
-from fastapi import HTTPException
+from math import ceil
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from jax.apiutils import Paging, PagingLinks
+from starlette.datastructures import URL
 
 from . import message as api_message
 
@@ -17,6 +22,15 @@ EXCEPTION_MAP = {
     api_message.RECORD_EXISTS: HTTPException(
         status_code=412, detail=api_message.RECORD_EXISTS
     ),
+    api_message.EXPORT_NOT_READY: HTTPException(
+        status_code=409, detail=api_message.EXPORT_NOT_READY
+    ),
+    api_message.EXPORT_FORMAT_UNAVAILABLE: HTTPException(
+        status_code=501, detail=api_message.EXPORT_FORMAT_UNAVAILABLE
+    ),
+    api_message.EXPORTS_UNAVAILABLE: HTTPException(
+        status_code=503, detail=api_message.EXPORTS_UNAVAILABLE
+    ),
 }
 
 
@@ -34,3 +48,73 @@ def raise_http_error(response: dict) -> None:
             raise HTTPException(
                 status_code=500, detail=api_message.UNEXPECTED_ERROR
             ) from None
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether a request's `If-None-Match` header matches an ETag.
+
+    ETags are compared weakly, as for any conditional GET.
+
+    :param request: the request
+    :param etag: the current ETag of the requested resource.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+def _offset_url(url: URL, offset: int) -> str:
+    if offset <= 0:
+        return str(url.remove_query_params("offset"))
+    return str(url.include_query_params(offset=offset))
+
+
+def paging(
+    url: URL, total: Optional[int], limit: Optional[int], offset: Optional[int]
+) -> Paging:
+    """Build the paging information of a page of results.
+
+    Pages are numbered from 1, and a partial last page counts as a page. Without a
+    limit (e.g. when only counting), only the total is reported.
+
+    :param url: the request URL, the links keep its other query parameters.
+    :param total: the total number of results, if counted.
+    :param limit: the maximum number of results in a page.
+    :param offset: the number of results before this page.
+    """
+    if not limit:
+        return Paging(
+            page=None, items=0, total_pages=None, total_items=total, links=None
+        )
+
+    offset = offset or 0
+    total_pages = ceil(total / limit) if total is not None else None
+    links = PagingLinks(
+        url,
+        total,
+        first=_offset_url(url, 0),
+        previous=_offset_url(url, offset - limit) if offset > 0 else None,
+        next=(
+            _offset_url(url, offset + limit)
+            if total is None or offset + limit < total
+            else None
+        ),
+        last=(
+            _offset_url(url, (total_pages - 1) * limit)
+            if total_pages is not None
+            else None
+        ),
+    )
+    return Paging(
+        page=offset // limit + 1,
+        items=limit,
+        total_pages=total_pages,
+        total_items=total,
+        links=links,
+    )
@@ -0,0 +1,179 @@
+"""In-process caching utilities for the Geneweaver API.
+
+Caches are created with caching disabled, and are configured from the API settings
+when the application starts (see `geneweaver.api.dependencies.lifespan`). This keeps
+service modules importable (and testable) without a configured environment.
+"""
+
+# ruff: noqa: ANN401
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+# Named caches, by name, reported by the readiness check.
+caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """A thread-safe, versioned LRU cache with per-entry time-to-live.
+
+    A `ttl` of `None` means entries never expire, and a `ttl` of `0` disables the
+    cache entirely (every lookup is a miss and nothing is stored).
+
+    Every invalidation bumps the cache `version`. Values computed while an
+    invalidation happens are not stored, so a slow loader can never write stale data
+    back into the cache.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 0,
+        max_size: int = 1024,
+        name: Optional[str] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        :param ttl: Seconds an entry stays valid (`None` for no expiry, `0` to disable).
+        :param max_size: Maximum number of entries before least recently used entries
+        are evicted.
+        :param name: Registers the cache in `caches` under this name.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        if name is not None:
+            caches[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.ttl is None or self.ttl > 0
+
+    def configure(
+        self, ttl: Optional[float] = _MISSING, max_size: Optional[int] = None
+    ) -> None:
+        """Reconfigure the cache, dropping every existing entry.
+
+        :param ttl: Seconds an entry stays valid (`None` for no expiry, `0` to disable).
+        :param max_size: Maximum number of entries.
+        """
+        if ttl is not _MISSING:
+            self.ttl = ttl
+        if max_size is not None:
+            self.max_size = max_size
+        self.invalidate()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value from the cache.
+
+        :param key: The cache key.
+        :param default: Returned when the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or self._expired(entry[0]):
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """Store a value in the cache.
+
+        :param key: The cache key.
+        :param value: The value to store.
+        :param version: The cache version the value was computed at. If the cache has
+        been invalidated since, the value is discarded.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get a value from the cache, loading and storing it on a miss.
+
+        :param key: The cache key.
+        :param loader: Called without arguments to compute a missing value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = loader()
+            self.set(key, value, version=version)
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a single entry from the cache.
+
+        :param key: The cache key.
+        """
+        with self._lock:
+            self.version += 1
+            self._data.pop(key, None)
+
+    def invalidate(
+        self, predicate: Optional[Callable[[Any, Any], bool]] = None
+    ) -> None:
+        """Remove entries from the cache.
+
+        :param predicate: Called with `(key, value)` for every entry, matching entries
+        are removed. When omitted, the whole cache is cleared.
+        """
+        with self._lock:
+            self.version += 1
+            if predicate is None:
+                self._data.clear()
+                return
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def __len__(self) -> int:
+        """Return the number of entries currently stored."""
+        return len(self._data)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the oldest live entry was stored, None if there is none.
+
+        Expired entries are purged first, so entries nobody asked for again since they
+        expired do not make the cache look stale.
+        """
+        with self._lock:
+            for key in [k for k, (at, _) in self._data.items() if self._expired(at)]:
+                del self._data[key]
+            if not self._data:
+                return None
+            oldest = min(stored_at for stored_at, _ in self._data.values())
+        return time.monotonic() - oldest
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache size and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,228 @@
+"""Response compression negotiated from the request's `Accept-Encoding`.
+
+gzip is always available; brotli (`br`) and zstd (`zstd`) are offered when the
+`brotli` and `zstandard` packages are installed. Responses are compressed when
+their content type is compressible and they are at least `minimum_size` bytes.
+Streamed responses (e.g. exports) are compressed chunk by chunk as they are sent,
+so they are never buffered whole.
+"""
+
+import re
+import zlib
+from typing import Callable, Dict, List, Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|.*\+json|xml|.*\+xml|javascript|octet-stream))"
+)
+
+
+class Compressor(Protocol):
+    """An incremental compressor."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk, returning whatever output is ready."""
+
+    def flush(self) -> bytes:
+        """Finish the stream, returning the remaining output."""
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def encoders(
+    gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3
+) -> Dict[str, Callable[[], Compressor]]:
+    """Get the available encodings, in order of preference.
+
+    :param gzip_level: gzip compression level (1-9).
+    :param brotli_quality: brotli quality (0-11).
+    :param zstd_level: zstd compression level (1-22).
+    :return: a compressor factory per `Content-Encoding`.
+    """
+    available = {}
+    if zstandard is not None:
+        available["zstd"] = lambda: zstandard.ZstdCompressor(
+            level=zstd_level
+        ).compressobj()
+    if brotli is not None:
+        available["br"] = lambda: _BrotliCompressor(brotli_quality)
+    available["gzip"] = lambda: zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return available
+
+
+def negotiate(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """Pick the encoding of a response.
+
+    :param accept_encoding: The request's `Accept-Encoding` header.
+    :param available: The server's encodings, in order of preference.
+    :return: the encoding with the highest q-value, the server's preference
+    breaking ties, or None if the client accepts none of them.
+    """
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        match = re.search(r"q=([^;]*)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip()] = quality
+
+    default = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = weights.get(coding, default)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with gzip, brotli or zstd."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        """Initialize the middleware.
+
+        :param app: The wrapped ASGI application.
+        :param minimum_size: Do not compress responses smaller than this (bytes).
+        :param gzip_level: gzip compression level (1-9).
+        :param brotli_quality: brotli quality (0-11).
+        :param zstd_level: zstd compression level (1-22).
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = encoders(gzip_level, brotli_quality, zstd_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.encoders)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _Responder(
+            send, encoding, self.encoders[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+def is_compressible(headers: Headers) -> bool:
+    """Whether a response should be compressed, from its headers."""
+    return "content-encoding" not in headers and bool(
+        COMPRESSIBLE_TYPES.match(headers.get("content-type", ""))
+    )
+
+
+class _Responder:
+    """Compresses the messages of one response."""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        compressor: Callable[[], Compressor],
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self._compressor_factory = compressor
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = not is_compressible(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self._send(message)
+            else:
+                # Sent with the first body chunk, once the size is known.
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            await self.start(body, more_body)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        elif not data:
+            return
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+
+    async def start(self, body: bytes, more_body: bool) -> None:
+        """Send the response start with the first body chunk.
+
+        A response sent in a single chunk is only compressed over the size
+        threshold, and keeps a `Content-Length`; a streamed response is always
+        compressed, and sent without one.
+        """
+        message, self.start_message = self.start_message, None
+        if not more_body and len(body) < self.minimum_size:
+            self.passthrough = True
+            await self._send(message)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        headers = MutableHeaders(scope=message)
+        headers["Content-Encoding"] = self.encoding
+        self.compressor = self._compressor_factory()
+        data = self.compressor.compress(body)
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            data += self.compressor.flush()
+            headers["Content-Length"] = str(len(data))
+        await self._send(message)
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
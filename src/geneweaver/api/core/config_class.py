@@ -40,9 +40,107 @@ class GeneweaverAPIConfig(BaseSettings):
     DB_POOL_MAX_LIFETIME: int = 300
     DB_POOL_MAX_IDLE: int = 60
 
+    # Worker processes serving the API (uvicorn reads the same variable for its
+    # `--workers` default), each worker opens its own connection pool.
+    WEB_CONCURRENCY: int = 1
+    # Total DB connections the API may open across all workers. When set, each
+    # worker's pool is capped at an equal share of the budget.
+    DB_CONNECTION_BUDGET: Optional[int] = None
+
+    @model_validator(mode="after")
+    def size_db_pool(self) -> Self:
+        """Derive the per-worker pool size from the global connection budget."""
+        if self.DB_CONNECTION_BUDGET is not None:
+            workers = max(1, self.WEB_CONCURRENCY)
+            self.DB_POOL_MAX_SIZE = max(1, self.DB_CONNECTION_BUDGET // workers)
+            self.DB_POOL_MIN_SIZE = min(self.DB_POOL_MIN_SIZE, self.DB_POOL_MAX_SIZE)
+        return self
+
+    # Executions of a query on a connection before psycopg prepares it server-side
+    # (None disables prepared statements, including the registered hot queries).
+    DB_PREPARE_THRESHOLD: Optional[int] = 5
+    # Maximum number of prepared statements kept per connection.
+    DB_PREPARED_MAX: int = 100
+
+    # Seconds to cache which private genesets each user can read (0 disables). Sharing
+    # and group changes are made outside the API, so newly granted access can be
+    # denied for up to this long; it is capped at 300 seconds.
+    GENESET_VISIBILITY_CACHE_TTL: int = 60
+    GENESET_VISIBILITY_CACHE_MAX_USERS: int = 4096
+
+    @model_validator(mode="after")
+    def cap_visibility_cache_ttl(self) -> Self:
+        """Keep the window in which newly granted access is denied short."""
+        self.GENESET_VISIBILITY_CACHE_TTL = min(self.GENESET_VISIBILITY_CACHE_TTL, 300)
+        return self
+
+    # Seconds to cache collection counts requested with `count=cached`.
+    COUNT_CACHE_TTL: int = 300
+    COUNT_CACHE_MAX_SIZE: int = 1024
+
+    # Seconds to cache the gene ids of genesets used by comparisons (0 disables).
+    GENESET_GENES_CACHE_TTL: int = 300
+    GENESET_GENES_CACHE_MAX_SIZE: int = 1024
+
+    # Seconds to cache single publications, by id and PubMed id (0 disables).
+    PUBLICATION_CACHE_TTL: int = 600
+    PUBLICATION_CACHE_MAX_SIZE: int = 4096
+
+    # Directory of the compact value snapshots of public genesets, shared by every
+    # worker (None disables the store), how many each worker keeps mapped, and their
+    # maximum total size in bytes.
+    GENESET_VALUE_STORE_DIR: Optional[str] = None
+    GENESET_VALUE_STORE_MAX_OPEN: int = 256
+    GENESET_VALUE_STORE_MAX_BYTES: int = 1024**3
+
+    # Directory of the gzipped export files of public genesets, shared by every
+    # worker (None disables the cache), and its maximum total size in bytes.
+    EXPORT_CACHE_DIR: Optional[str] = None
+    EXPORT_CACHE_MAX_BYTES: int = 1024**3
+
+    # Directory of bulk export job status and files, shared by every worker (None
+    # disables bulk exports), the maximum total size in bytes of the export files
+    # (status files are never evicted), and how many jobs each worker runs at once.
+    EXPORT_JOBS_DIR: Optional[str] = None
+    EXPORT_JOBS_MAX_BYTES: int = 10 * 1024**3
+    EXPORT_JOB_WORKERS: int = 2
+
+    # Seconds before the species and gene database snapshot is reloaded (None only
+    # reloads it on demand), seconds between the checks every worker makes for
+    # changes to the tables (None disables them), and the `max-age` clients may
+    # cache species for.
+    REFERENCE_REFRESH_INTERVAL: Optional[int] = 86400
+    REFERENCE_CHECK_INTERVAL: Optional[int] = 60
+    REFERENCE_CACHE_MAX_AGE: int = 3600
+
+    # Log requests spending longer than this (ms) executing DB statements (None
+    # disables the slow request log).
+    SLOW_REQUEST_DB_MS: Optional[float] = 500
+    # Report per-request DB and handler time in a `Server-Timing` response header.
+    SERVER_TIMING_HEADER: bool = True
+
+    # Compress responses of at least this many bytes (None disables compression),
+    # with the level of each encoding (brotli and zstd need their packages).
+    COMPRESSION_MINIMUM_SIZE: Optional[int] = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Readiness check budgets, exceeding one reports a DEGRADED status.
+    HEALTH_DB_LATENCY_BUDGET_MS: float = 100
+    HEALTH_CACHE_MAX_AGE: int = 3600
+    HEALTH_JWKS_MAX_AGE: int = 86400
+    # Seconds the readiness check waits for a pool connection before reporting DOWN.
+    HEALTH_POOL_TIMEOUT: float = 1.0
+
     AUTH_DOMAIN: str = "thejacksonlaboratory.auth0.com"
     AUTH_AUDIENCE: str = "https://cube.jax.org"
     AUTH_ALGORITHMS: List[str] = ["RS256"]
+    # Seconds before the auth provider's signing keys are fetched again, keep it
+    # below HEALTH_JWKS_MAX_AGE.
+    AUTH_JWKS_REFRESH_INTERVAL: Optional[int] = 43200
+    # Seconds to wait for the auth provider when fetching its signing keys.
+    AUTH_JWKS_TIMEOUT: float = 5.0
     AUTH_EMAIL_CLAIM: str = "email"
     AUTH_SCOPES: dict = {
         "openid profile email": "read",
@@ -0,0 +1,137 @@
+"""A size-limited cache of files in a local directory, shared by every worker.
+
+Files are written atomically and evicted least recently used first once the
+directory grows over `max_bytes`; a file's modification time records its last use.
+"""
+
+import os
+import tempfile
+from typing import Optional
+
+
+class DiskCache:
+    """A directory of cached files, evicted by total size."""
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: int = 1024**3
+    ) -> None:
+        """Initialize the cache.
+
+        :param directory: Where files are written, the cache is disabled when
+        omitted.
+        :param max_bytes: Maximum total size of the cached files.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache has a directory to write files to."""
+        return self.directory is not None
+
+    def configure(self, directory: Optional[str], max_bytes: int = 1024**3) -> None:
+        """Reconfigure the cache.
+
+        :param directory: Where files are written (None disables the cache).
+        :param max_bytes: Maximum total size of the cached files.
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, name: str) -> str:
+        """Get the path of a cached file."""
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """Get the path of a cached file, marking it as recently used.
+
+        :param name: file name
+        :return: the path, or None if the file is not cached.
+        """
+        path = self.path(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, name: str, data: bytes) -> str:
+        """Write a file to the cache, evicting the least recently used files.
+
+        :param name: file name
+        :param data: file contents
+        :return: the path of the file.
+        """
+        tmp_path = self.temp_path()
+        try:
+            with open(tmp_path, "wb") as cached:
+                cached.write(data)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return self.put_file(name, tmp_path)
+
+    def temp_path(self) -> str:
+        """Create a temporary file in the cache directory, to write a file into.
+
+        Temporary files are not cached files until they are moved with `put_file`.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def put_file(self, name: str, tmp_path: str) -> str:
+        """Move a written temporary file into the cache.
+
+        :param name: file name
+        :param tmp_path: path from `temp_path`
+        :return: the path of the file.
+        """
+        try:
+            os.replace(tmp_path, self.path(name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict(keep=name)
+        return self.path(name)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove the least recently used files until under the size limit.
+
+        :param keep: Never remove this file (the one just written).
+        """
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self.remove(name)
+            total -= size
+
+    def remove(self, name: str) -> None:
+        """Remove a cached file, if it exists."""
+        try:
+            os.unlink(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Remove every cached file whose name starts with a prefix.
+
+        :param prefix: file name prefix (every file when empty)
+        """
+        if not self.enabled:
+            return
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and not name.endswith(".tmp"):
+                self.remove(name)
@@ -0,0 +1,18 @@
+"""Deferred imports for modules that are slow to import but rarely needed."""
+
+# ruff: noqa: ANN401
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """A stand-in for a module that is only imported on first attribute access.
+
+    Attributes set on the stand-in (e.g. by `unittest.mock.patch`) shadow those of
+    the real module.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        """Import the real module and get an attribute from it."""
+        return getattr(importlib.import_module(self.__name__), attr)
@@ -0,0 +1,259 @@
+"""Request and database pool metrics in the Prometheus text exposition format.
+
+Metrics are held in process memory. When serving with several worker processes,
+each worker reports its own metrics (Prometheus should scrape each pod/worker, or
+aggregate with `sum by`).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+POOL_STATS_HELP = {
+    "pool_min": ("gauge", "Minimum number of connections in the pool."),
+    "pool_max": ("gauge", "Maximum number of connections in the pool."),
+    "pool_size": ("gauge", "Connections currently managed by the pool."),
+    "pool_available": ("gauge", "Connections currently idle in the pool."),
+    "connections_in_use": ("gauge", "Connections currently checked out."),
+    "requests_waiting": ("gauge", "Requests currently waiting for a connection."),
+    "requests_num": ("counter", "Connection requests made to the pool."),
+    "requests_queued": ("counter", "Connection requests that had to wait."),
+    "requests_wait_ms": ("counter", "Total time spent waiting for a connection."),
+    "requests_errors": ("counter", "Connection requests that failed or timed out."),
+    "usage_ms": ("counter", "Total time connections were checked out."),
+    "returns_bad": ("counter", "Connections returned to the pool in a bad state."),
+    "connections_num": ("counter", "Connection attempts made to the server."),
+    "connections_ms": ("counter", "Total time spent establishing connections."),
+    "connections_errors": ("counter", "Failed connection attempts."),
+    "connections_lost": ("counter", "Connections lost, found by pool checks."),
+}
+
+CACHE_STATS_HELP = {
+    "size": ("gauge", "Entries currently stored in the cache."),
+    "hits": ("counter", "Cache lookups that found an entry."),
+    "misses": ("counter", "Cache lookups that found no valid entry."),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """A Prometheus histogram with a fixed set of label names."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labels: Sequence[str] = (),
+    ) -> None:
+        """Initialize the histogram.
+
+        :param name: The metric name.
+        :param documentation: The metric help text.
+        :param buckets: The (sorted) bucket upper bounds, `+Inf` is implied.
+        :param labels: The label names.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record a single observation.
+
+        :param value: The observed value.
+        :param label_values: The value of each label, in order.
+        """
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0]
+            if idx < len(self.buckets):
+                series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """Render the histogram in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labels + ("le",), label_values + (f"{bound:g}",)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels + ("le",), label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "geneweaver_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    LATENCY_BUCKETS,
+    labels=("method", "route", "status"),
+)
+
+REQUEST_QUERIES = Histogram(
+    "geneweaver_http_request_db_queries",
+    "Database queries executed per HTTP request by route.",
+    QUERY_COUNT_BUCKETS,
+    labels=("method", "route"),
+)
+
+
+class RequestStats:
+    """Database activity of a single request."""
+
+    __slots__ = ("queries",)
+
+    def __init__(self) -> None:
+        """Initialize the request stats."""
+        self.queries = 0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+def record_query() -> None:
+    """Count a database query against the current request, if any."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def route_name(scope: Scope) -> str:
+    """Get the route template a request was matched to.
+
+    Templates are used instead of raw paths to keep label cardinality bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and query counts per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        :param app: The wrapped ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            route = route_name(scope)
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, scope["method"], route, status
+            )
+            REQUEST_QUERIES.observe(stats.queries, scope["method"], route)
+
+
+def render_pool_stats(stats: Dict[str, int]) -> List[str]:
+    """Render `ConnectionPool.get_stats()` in the Prometheus text format.
+
+    :param stats: The pool statistics.
+    """
+    stats = dict(stats)
+    if "pool_size" in stats and "pool_available" in stats:
+        stats["connections_in_use"] = stats["pool_size"] - stats["pool_available"]
+    lines = []
+    for key, (metric_type, documentation) in POOL_STATS_HELP.items():
+        name = f"geneweaver_db_{key}"
+        if metric_type == "counter":
+            name = f"{name}_total"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {stats.get(key, 0)}")
+    return lines
+
+
+def render_cache_stats(stats: Dict[str, dict]) -> List[str]:
+    """Render `TTLCache.stats()` of named caches in the Prometheus text format.
+
+    :param stats: The statistics of each cache, by cache name.
+    """
+    lines = []
+    for key, (metric_type, documentation) in CACHE_STATS_HELP.items():
+        name = f"geneweaver_cache_{key}"
+        if metric_type == "counter":
+            name = f"{name}_total"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for cache_name, cache_stats in sorted(stats.items()):
+            labels = _format_labels(("cache",), (cache_name,))
+            lines.append(f"{name}{labels} {cache_stats.get(key, 0)}")
+    return lines
+
+
+def render(
+    pool_stats: Optional[Dict[str, int]] = None,
+    cache_stats: Optional[Dict[str, dict]] = None,
+) -> str:
+    """Render every metric in the Prometheus text format.
+
+    :param pool_stats: The DB connection pool statistics, if a pool is open.
+    :param cache_stats: The statistics of the in-process caches, by name.
+    """
+    lines = []
+    if pool_stats is not None:
+        lines.extend(render_pool_stats(pool_stats))
+    if cache_stats:
+        lines.extend(render_cache_stats(cache_stats))
+    lines.extend(REQUEST_LATENCY.render())
+    lines.extend(REQUEST_QUERIES.render())
+    return "\n".join(lines) + "\n"
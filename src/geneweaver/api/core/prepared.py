@@ -0,0 +1,148 @@
+"""Registry of server-side prepared statements for the hottest query shapes.
+
+psycopg prepares a query automatically once it has been executed
+`prepare_threshold` times on the same connection. The query shapes registered
+here are executed on almost every request, so they are prepared on their first
+execution instead, and PostgreSQL skips parsing and planning them from then on.
+
+Statements are captured by calling the `geneweaver.db` functions that issue them
+against a recording cursor, so the registry always matches the SQL the database
+layer actually sends.
+"""
+
+# ruff: noqa: ANN401
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import psycopg
+from geneweaver.api.core import metrics
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db import gene as db_gene
+from geneweaver.db import geneset as db_geneset
+from geneweaver.db import geneset_value as db_geneset_value
+from psycopg.rows import DictRow
+
+Statement = Tuple[Any, Optional[dict]]
+
+
+class _StatementRecorder:
+    """A stand-in cursor which records the statements executed on it."""
+
+    row_factory = None
+
+    def __init__(self) -> None:
+        self.statements = []
+
+    def execute(self, query: Any, params: Optional[dict] = None, **_: Any) -> None:
+        self.statements.append((query, params))
+
+    def fetchall(self) -> list:
+        return []
+
+    def fetchone(self) -> None:
+        return None
+
+
+def capture(func: Callable, *args: Any, **kwargs: Any) -> Statement:
+    """Capture the statement a database function executes.
+
+    :param func: A `geneweaver.db` function taking a cursor as first argument.
+    :return: The (query, params) executed by the function.
+    """
+    recorder = _StatementRecorder()
+    try:
+        func(recorder, *args, **kwargs)
+    except (IndexError, KeyError, TypeError):
+        # Functions post-processing empty results may fail, the statement has
+        # been recorded by then.
+        pass
+    return recorder.statements[0]
+
+
+def capture_statements(
+    geneset_id: int = 1,
+    user_id: int = 0,
+    gene_id_type: GeneIdentifier = GeneIdentifier.GENE_SYMBOL,
+    species: Species = Species.MUS_MUSCULUS,
+    gene_ids: Iterable = ("",),
+) -> Dict[str, Statement]:
+    """Capture the hot query shapes, with example parameters.
+
+    :param geneset_id: Example geneset identifier.
+    :param user_id: Example user identifier.
+    :param gene_id_type: Example gene identifier type.
+    :param species: Example species.
+    :param gene_ids: Example gene identifiers (reference ids).
+    :return: dictionary of statement name to (query, params).
+    """
+    gene_ids = list(gene_ids)
+    statements = {
+        "geneset_by_id": capture(
+            db_geneset.get,
+            is_readable_by=user_id,
+            gs_id=geneset_id,
+            with_publication_info=False,
+        ),
+        "geneset_by_id_with_publication": capture(
+            db_geneset.get,
+            is_readable_by=user_id,
+            gs_id=geneset_id,
+            with_publication_info=True,
+        ),
+        "gene_database_by_id": capture(db_gene.gene_database_by_id, gene_id_type),
+        "homolog_ids_by_ode_id": capture(
+            db_gene.get_homolog_ids_by_ode_id, [], gene_id_type
+        ),
+        "gene_mapping": capture(db_gene.mapping, gene_ids, species, gene_id_type),
+    }
+    for in_threshold in (False, True):
+        suffix = "_in_threshold" if in_threshold else ""
+        statements[f"values_by_geneset_id{suffix}"] = capture(
+            db_geneset_value.by_geneset_id,
+            geneset_id,
+            gsv_in_threshold=in_threshold,
+        )
+        statements[f"values_by_geneset_id_and_identifier{suffix}"] = capture(
+            db_geneset_value.by_geneset_id,
+            geneset_id,
+            gene_id_type,
+            gsv_in_threshold=in_threshold,
+        )
+    return statements
+
+
+REGISTRY: Dict[str, Any] = {
+    name: query for name, (query, _) in capture_statements().items()
+}
+
+
+def registered_name(query: Any) -> Optional[str]:
+    """Get the registry name of a query, if it is one of the hot query shapes.
+
+    :param query: The query (str, SQL or Composed) about to be executed.
+    :return: The statement name, or None if the query is not registered.
+    """
+    for name, registered in REGISTRY.items():
+        if query == registered:
+            return name
+    return None
+
+
+class PreparingCursor(psycopg.Cursor[DictRow]):
+    """A cursor preparing registered statements on their first execution.
+
+    Every execution is also counted against the current request's metrics.
+    """
+
+    def execute(
+        self,
+        query: Any,
+        params: Any = None,
+        *,
+        prepare: Optional[bool] = None,
+        binary: Optional[bool] = None,
+    ) -> "PreparingCursor":
+        """Execute a query, preparing it server-side if it is registered."""
+        if prepare is None and registered_name(query) is not None:
+            prepare = True
+        metrics.record_query()
+        return super().execute(query, params, prepare=prepare, binary=binary)
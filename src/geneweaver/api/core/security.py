@@ -1,11 +1,12 @@
 """Code to authenticate a user to the API."""
 
 # ruff: noqa: B008
+import time
 import urllib.parse
 from typing import Dict, Optional, Type, Union
 
-import requests
 from fastapi import Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.logger import logger
 from fastapi.openapi.models import OAuthFlows
 from fastapi.security import (
@@ -18,10 +19,14 @@ from geneweaver.api.core.exceptions import (
     Auth0UnauthenticatedException,
     Auth0UnauthorizedException,
 )
+from geneweaver.api.core.lazy import LazyModule
 from geneweaver.api.schemas.auth import UserInternal
-from jose import jwt  # type: ignore
 from pydantic import ValidationError
 
+# Only needed once the API is serving requests, and slow to import.
+jwt = LazyModule("jose.jwt")
+requests = LazyModule("requests")
+
 
 class Auth0HTTPBearer(HTTPBearer):
     """Auth0 Specific HTTP Bearer Authentication."""
@@ -71,8 +76,16 @@ class Auth0:
         email_auto_error: bool = False,
         email_claim: str = "email",
         auth0user_model: Type[UserInternal] = UserInternal,
+        jwks_refresh_interval: Optional[float] = None,
+        jwks_timeout: float = 5.0,
     ) -> None:
-        """Initialize the Auth0 class."""
+        """Initialize the Auth0 class.
+
+        :param jwks_refresh_interval: Seconds before the JSON web key set is fetched
+        again (None to only fetch it once).
+        :param jwks_timeout: Seconds to wait for the auth provider when fetching the
+        JSON web key set.
+        """
         scopes = {} if scopes is None else scopes
 
         self.domain = domain
@@ -86,7 +99,10 @@ class Auth0:
         self.auth0_user_model = auth0user_model
 
         self.algorithms = ["RS256"]
-        self.jwks: Dict = requests.get(f"https://{domain}/.well-known/jwks.json").json()
+        self._jwks: Optional[Dict] = None
+        self.jwks_fetched_at: Optional[float] = None
+        self.jwks_refresh_interval = jwks_refresh_interval
+        self.jwks_timeout = jwks_timeout
 
         authorization_url_qs = urllib.parse.urlencode({"audience": api_audience})
         authorization_url = f"https://{domain}/authorize?{authorization_url_qs}"
@@ -96,6 +112,47 @@ class Auth0:
             scheme_name="Auth0ImplicitBearer",
         )
 
+    def jwks_stale(self) -> bool:
+        """Whether the key set is missing or older than the refresh interval."""
+        return self._jwks is None or (
+            self.jwks_refresh_interval is not None
+            and time.time() - self.jwks_fetched_at > self.jwks_refresh_interval
+        )
+
+    @property
+    def jwks(self) -> Dict:
+        """The JSON web key set used to verify tokens, fetched on first use.
+
+        The key set is fetched again once older than the refresh interval. If that
+        fails, the current keys keep being used and the fetch is retried on next use.
+        """
+        if self.jwks_stale():
+            try:
+                self.load_jwks()
+            except Exception as err:
+                if self._jwks is None:
+                    raise err
+                logger.error(f'Handled exception refreshing the key set: "{err}"')
+        return self._jwks
+
+    @jwks.setter
+    def jwks(self, jwks: Dict) -> None:
+        self._jwks = jwks
+        self.jwks_fetched_at = time.time()
+
+    def load_jwks(self) -> Dict:
+        """Fetch the JSON web key set from the auth provider."""
+        self.jwks = requests.get(
+            f"https://{self.domain}/.well-known/jwks.json", timeout=self.jwks_timeout
+        ).json()
+        return self._jwks
+
+    async def get_jwks(self) -> Dict:
+        """Get the JSON web key set without blocking the event loop to fetch it."""
+        if self.jwks_stale():
+            return await run_in_threadpool(lambda: self.jwks)
+        return self._jwks
+
     async def public(
         self,
         security_scopes: SecurityScopes,
@@ -183,8 +240,9 @@ class Auth0:
         payload: Dict = {}
         try:
             unverified_header = jwt.get_unverified_header(token)
+            jwks = await self.get_jwks()
             rsa_key = {}
-            for key in self.jwks["keys"]:
+            for key in jwks["keys"]:
                 if key["kid"] == unverified_header["kid"]:
                     rsa_key = {
                         "kty": key["kty"],
@@ -0,0 +1,175 @@
+"""Per-request tracing of the database statements a request executes.
+
+`TracingMiddleware` starts a trace for every HTTP request, and `TracingCursor`
+(the cursor class of the DB connection pool) records the duration, row count and
+calling service function of every statement executed while handling it. The trace
+is reported in a `Server-Timing` response header, and requests whose total DB time
+exceeds a threshold are logged with a per-statement breakdown.
+"""
+
+# ruff: noqa: ANN401
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi.logger import logger
+from geneweaver.api.core.prepared import PreparingCursor, registered_name
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CALLER_MODULE_PREFIX = "geneweaver.api.services."
+INTERNAL_MODULE_PREFIXES = ("geneweaver.api.core.", "geneweaver.db.", "psycopg")
+
+
+class TracedStatement(NamedTuple):
+    """A single statement executed while handling a request."""
+
+    caller: str
+    statement: Optional[str]
+    duration_ms: float
+    rows: int
+
+
+class RequestTrace:
+    """The statements executed while handling a single request."""
+
+    __slots__ = ("statements",)
+
+    def __init__(self) -> None:
+        """Initialize the trace."""
+        self.statements: List[TracedStatement] = []
+
+    @property
+    def db_ms(self) -> float:
+        """Total time spent executing statements."""
+        return sum(s.duration_ms for s in self.statements)
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+def find_caller() -> str:
+    """Name the function that issued the statement being executed.
+
+    The nearest service function is preferred, otherwise the nearest function
+    outside of the DB layer is used.
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(CALLER_MODULE_PREFIX):
+            return f"{module[len(CALLER_MODULE_PREFIX):]}.{frame.f_code.co_name}"
+        if fallback is None and not module.startswith(INTERNAL_MODULE_PREFIXES):
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class TracingCursor(PreparingCursor):
+    """A cursor recording the statements it executes in the current trace."""
+
+    def execute(
+        self,
+        query: Any,
+        params: Any = None,
+        *,
+        prepare: Optional[bool] = None,
+        binary: Optional[bool] = None,
+    ) -> "TracingCursor":
+        """Execute a query, recording it in the current request's trace."""
+        trace = current_trace.get()
+        if trace is None:
+            return super().execute(query, params, prepare=prepare, binary=binary)
+
+        start = time.perf_counter()
+        try:
+            return super().execute(query, params, prepare=prepare, binary=binary)
+        finally:
+            trace.statements.append(
+                TracedStatement(
+                    caller=find_caller(),
+                    statement=registered_name(query),
+                    duration_ms=(time.perf_counter() - start) * 1000,
+                    rows=self.rowcount,
+                )
+            )
+
+
+def server_timing(trace: RequestTrace, app_ms: float) -> str:
+    """Build a `Server-Timing` header value for a request.
+
+    :param trace: The request's trace.
+    :param app_ms: The time spent handling the request.
+    """
+    return (
+        f'db;dur={trace.db_ms:.1f};desc="{len(trace.statements)} queries", '
+        f"app;dur={app_ms:.1f}"
+    )
+
+
+def format_trace(trace: RequestTrace) -> str:
+    """Format the statements of a trace, one per line.
+
+    :param trace: The request's trace.
+    """
+    return "\n".join(
+        f"  {s.duration_ms:8.1f} ms {s.rows:6d} rows  {s.caller}"
+        + (f" [{s.statement}]" if s.statement else "")
+        for s in trace.statements
+    )
+
+
+class TracingMiddleware:
+    """ASGI middleware tracing the DB statements of every request."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        slow_request_ms: Optional[float] = None,
+        server_timing_header: bool = True,
+    ) -> None:
+        """Initialize the middleware.
+
+        :param app: The wrapped ASGI application.
+        :param slow_request_ms: Log requests spending longer than this in the DB
+        (None disables logging).
+        :param server_timing_header: Whether to add a `Server-Timing` header.
+        """
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing_header:
+                app_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(trace, app_ms))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            if self.slow_request_ms is not None and trace.db_ms > self.slow_request_ms:
+                logger.warning(
+                    "Slow request %s %s: %.1f ms in %d queries\n%s",
+                    scope["method"],
+                    scope["path"],
+                    trace.db_ms,
+                    len(trace.statements),
+                    format_trace(trace),
+                )
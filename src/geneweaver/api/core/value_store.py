@@ -0,0 +1,254 @@
+"""A compact, memory-mapped store of geneset values.
+
+Each geneset's values are packed into a single snapshot file:
+
+- a header with the number of values and the size of the symbols,
+- the `ode_gene_id`s (int64), the values (float64) and the offsets of each symbol
+  in the symbols (int64, one more than the number of values),
+- the in-threshold flags (uint8) and the UTF-8 encoded symbols.
+
+Snapshot files are written atomically and read through `mmap`, so every worker
+process reading the same geneset shares the same pages of the OS page cache, and the
+arrays are views of the mapping rather than copies. Snapshots are keyed by the
+geneset's `gs_updated`, like the export artifacts, and the directory is kept under a
+size limit by evicting the least recently used ones. Deleting a snapshot (e.g. when
+the geneset's threshold changes, or on eviction) is noticed by every worker on its
+next read.
+"""
+
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.core.disk_cache import DiskCache
+from geneweaver.api.core.lazy import LazyModule
+
+# Only needed once snapshots are read or written, and slow to import.
+np = LazyModule("numpy")
+
+MAGIC = b"GWV1"
+HEADER = struct.Struct("<4s4xQQ")
+
+
+def pack(rows: Iterable[dict]) -> bytes:
+    """Pack geneset value rows into the snapshot format.
+
+    :param rows: rows with `ode_gene_id`, `gsv_value`, `gsv_in_threshold` and
+    `ode_ref_id`, as returned by `geneset_value.by_geneset_id`.
+    :return: the snapshot contents.
+    """
+    rows = list(rows)
+    symbols = [(row["ode_ref_id"] or "").encode() for row in rows]
+    offsets = np.zeros(len(rows) + 1, dtype="<i8")
+    np.cumsum([len(symbol) for symbol in symbols], out=offsets[1:])
+    return b"".join(
+        (
+            HEADER.pack(MAGIC, len(rows), int(offsets[-1])),
+            np.array([row["ode_gene_id"] for row in rows], dtype="<i8").tobytes(),
+            np.array([row["gsv_value"] for row in rows], dtype="<f8").tobytes(),
+            offsets.tobytes(),
+            np.array([bool(row["gsv_in_threshold"]) for row in rows], "u1").tobytes(),
+            b"".join(symbols),
+        )
+    )
+
+
+class GenesetValues:
+    """Read-only views of a geneset's packed values."""
+
+    def __init__(self, buffer: bytes) -> None:
+        """Map the arrays of a snapshot, without copying.
+
+        :param buffer: The snapshot contents (bytes or an `mmap`).
+        """
+        magic, size, symbols_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a geneset value snapshot.")
+        offset = HEADER.size
+        self.gene_ids = np.frombuffer(buffer, "<i8", size, offset)
+        offset += 8 * size
+        self.gsv_values = np.frombuffer(buffer, "<f8", size, offset)
+        offset += 8 * size
+        self.offsets = np.frombuffer(buffer, "<i8", size + 1, offset)
+        offset += 8 * (size + 1)
+        self.in_threshold = np.frombuffer(buffer, "u1", size, offset).view(bool)
+        offset += size
+        self.symbols = memoryview(buffer)[offset : offset + symbols_size]
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self.gene_ids)
+
+    def symbol(self, idx: int) -> str:
+        """Get the symbol (`ode_ref_id`) of a value."""
+        return str(self.symbols[self.offsets[idx] : self.offsets[idx + 1]], "utf-8")
+
+    def select(
+        self,
+        in_threshold: Optional[bool] = False,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        top_n: Optional[int] = None,
+        descending: Optional[bool] = None,
+    ) -> "np.ndarray":
+        """Select values, with the same filters as the geneset values query.
+
+        :param in_threshold: only values within the geneset's threshold
+        :param min_value: only values greater than or equal to this
+        :param max_value: only values less than or equal to this
+        :param top_n: only the first values, in the requested order
+        :param descending: order by value, descending if True, ascending if False
+        :return: the indices of the selected values.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if in_threshold:
+            mask &= self.in_threshold
+        if min_value is not None:
+            mask &= self.gsv_values >= min_value
+        if max_value is not None:
+            mask &= self.gsv_values <= max_value
+        indices = np.flatnonzero(mask)
+        if descending is not None:
+            order = np.argsort(self.gsv_values[indices], kind="stable")
+            indices = indices[order[::-1] if descending else order]
+        return indices[:top_n]
+
+    def gene_values(self, indices: "np.ndarray") -> List[dict]:
+        """Build the `symbol` and `value` of the selected values."""
+        values = self.gsv_values[indices].tolist()
+        return [
+            {"symbol": self.symbol(idx), "value": value}
+            for idx, value in zip(indices.tolist(), values)
+        ]
+
+
+class ValueStore:
+    """A read-through store of geneset value snapshots in a directory.
+
+    Snapshots are named after the geneset and its update time, so an updated geneset
+    is read from a new snapshot, and the directory is kept under `max_bytes` by
+    evicting the least recently used snapshots (see `DiskCache`). Workers keep the
+    snapshots they have mapped open, up to `max_open`, and check that the file has not
+    been replaced or removed on every read.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_open: int = 256,
+        max_bytes: int = 1024**3,
+    ) -> None:
+        """Initialize the store.
+
+        :param directory: Where snapshots are written, the store is disabled when
+        omitted.
+        :param max_open: Maximum number of snapshots mapped by this process.
+        :param max_bytes: Maximum total size of the snapshots.
+        """
+        self.files = DiskCache(directory, max_bytes)
+        self._open = TTLCache(ttl=None, max_size=max_open)
+
+    @property
+    def directory(self) -> Optional[str]:
+        """Where snapshots are written."""
+        return self.files.directory
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the store has a directory to write snapshots to."""
+        return self.files.enabled
+
+    def configure(
+        self, directory: Optional[str], max_open: int = 256, max_bytes: int = 1024**3
+    ) -> None:
+        """Reconfigure the store, unmapping every open snapshot.
+
+        :param directory: Where snapshots are written (None disables the store).
+        :param max_open: Maximum number of snapshots mapped by this process.
+        :param max_bytes: Maximum total size of the snapshots.
+        """
+        self.files.configure(directory, max_bytes)
+        self._open.configure(ttl=None, max_size=max_open)
+
+    @staticmethod
+    def name(geneset_id: int, updated: datetime) -> str:
+        """Get the snapshot file name of a geneset, at its update time."""
+        return f"{geneset_id}_{updated.strftime('%Y%m%d%H%M%S%f')}.gsv"
+
+    def path(self, geneset_id: int, updated: datetime) -> str:
+        """Get the snapshot file of a geneset, at its update time."""
+        return self.files.path(self.name(geneset_id, updated))
+
+    def get(self, geneset_id: int, updated: datetime) -> Optional[GenesetValues]:
+        """Get the values of a geneset, if a snapshot exists.
+
+        :param geneset_id: geneset identifier
+        :param updated: the geneset's update time (`gs_updated`)
+        """
+        key = (geneset_id, updated)
+        try:
+            path = self.files.get(self.name(geneset_id, updated))
+            if path is None:
+                raise FileNotFoundError(geneset_id)
+            stat = os.stat(path)
+            # Marking a snapshot as used changes its mtime, replacing it its inode.
+            version = (stat.st_ino, stat.st_size)
+            cached = self._open.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            with open(path, "rb") as snapshot:
+                mapping = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            # Removed, or evicted by another worker.
+            self._open.pop(key)
+            return None
+
+        values = GenesetValues(mapping)
+        self._open.set(key, (version, values))
+        return values
+
+    def put(
+        self, geneset_id: int, updated: datetime, rows: Iterable[dict]
+    ) -> GenesetValues:
+        """Write a snapshot of a geneset's values, evicting the least recently used.
+
+        :param geneset_id: geneset identifier
+        :param updated: the geneset's update time (`gs_updated`)
+        :param rows: the geneset's value rows
+        """
+        self.files.put(self.name(geneset_id, updated), pack(rows))
+        return self.get(geneset_id, updated)
+
+    def get_or_load(
+        self,
+        geneset_id: int,
+        updated: datetime,
+        loader: Callable[[], Iterable[dict]],
+    ) -> GenesetValues:
+        """Get the values of a geneset, writing a snapshot on a miss.
+
+        :param geneset_id: geneset identifier
+        :param updated: the geneset's update time (`gs_updated`)
+        :param loader: Called without arguments to read the value rows.
+        """
+        values = self.get(geneset_id, updated)
+        if values is None:
+            values = self.put(geneset_id, updated, loader())
+        return values
+
+    def invalidate(self, geneset_id: Optional[int] = None) -> None:
+        """Remove every snapshot of a geneset, or every snapshot.
+
+        :param geneset_id: geneset identifier
+        """
+        if not self.enabled:
+            return
+        if geneset_id is None:
+            self._open.invalidate()
+            self.files.invalidate()
+        else:
+            self._open.invalidate(lambda key, _: key[0] == geneset_id)
+            self.files.invalidate(f"{geneset_id}_")
@@ -2,15 +2,25 @@
 
 # ruff: noqa: B008
 import logging
+import os
 from contextlib import asynccontextmanager
 from tempfile import TemporaryDirectory
 from typing import Annotated, Optional
 
 import psycopg
 from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from geneweaver.api.core.config import settings
 from geneweaver.api.core.exceptions import AuthenticationMismatch
 from geneweaver.api.core.security import Auth0, UserInternal
+from geneweaver.api.core.tracing import TracingCursor
+from geneweaver.api.services import compare as compare_service
+from geneweaver.api.services import count as count_service
+from geneweaver.api.services import export as export_service
+from geneweaver.api.services import geneset as geneset_service
+from geneweaver.api.services import publications as publication_service
+from geneweaver.api.services import species as species_service
+from geneweaver.api.services import visibility as visibility_service
 from geneweaver.db import user as db_user
 from psycopg.rows import DictRow, dict_row
 from psycopg_pool import ConnectionPool
@@ -21,6 +31,8 @@ auth = Auth0(
     scopes=settings.AUTH_SCOPES,
     email_claim=settings.AUTH_EMAIL_CLAIM,
     auto_error=False,
+    jwks_refresh_interval=settings.AUTH_JWKS_REFRESH_INTERVAL,
+    jwks_timeout=settings.AUTH_JWKS_TIMEOUT,
 )
 
 Cursor = psycopg.Cursor
@@ -28,17 +40,76 @@ Cursor = psycopg.Cursor
 logger = logging.getLogger("uvicorn.error")
 
 
+def configure_connection(conn: psycopg.Connection) -> None:
+    """Configure a new pool connection.
+
+    :param conn: The newly opened connection.
+    """
+    conn.prepared_max = settings.DB_PREPARED_MAX
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> None:
     """Open and close the DB connection pool.
 
     :param app: The FastAPI application (dependency injection).
     """
-    logger.info("Opening DB Connection Pool.")
+    logger.info("Fetching auth provider signing keys.")
+    try:
+        await run_in_threadpool(auth.load_jwks)
+    except Exception as err:
+        # Retried on the first authenticated request.
+        logger.error(err)
+    logger.info("Configuring caches.")
+    visibility_service.private_genesets.configure(
+        ttl=settings.GENESET_VISIBILITY_CACHE_TTL
+    )
+    visibility_service.user_visibility.configure(
+        ttl=settings.GENESET_VISIBILITY_CACHE_TTL,
+        max_size=settings.GENESET_VISIBILITY_CACHE_MAX_USERS,
+    )
+    count_service.counts.configure(
+        ttl=settings.COUNT_CACHE_TTL, max_size=settings.COUNT_CACHE_MAX_SIZE
+    )
+    compare_service.geneset_genes.configure(
+        ttl=settings.GENESET_GENES_CACHE_TTL,
+        max_size=settings.GENESET_GENES_CACHE_MAX_SIZE,
+    )
+    publication_service.publications.configure(
+        ttl=settings.PUBLICATION_CACHE_TTL,
+        max_size=settings.PUBLICATION_CACHE_MAX_SIZE,
+    )
+    geneset_service.value_store.configure(
+        settings.GENESET_VALUE_STORE_DIR,
+        settings.GENESET_VALUE_STORE_MAX_OPEN,
+        settings.GENESET_VALUE_STORE_MAX_BYTES,
+    )
+    export_service.export_artifacts.configure(
+        settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_BYTES
+    )
+    species_service.reference.configure(
+        settings.REFERENCE_REFRESH_INTERVAL, settings.REFERENCE_CHECK_INTERVAL
+    )
+    export_service.start_jobs(
+        settings.EXPORT_JOBS_DIR,
+        settings.EXPORT_JOBS_MAX_BYTES,
+        settings.EXPORT_JOB_WORKERS,
+    )
+    logger.info(
+        "Opening DB Connection Pool (%d-%d connections) in worker %d.",
+        settings.DB_POOL_MIN_SIZE,
+        settings.DB_POOL_MAX_SIZE,
+        os.getpid(),
+    )
     app.pool = ConnectionPool(
         settings.DB.URI,
         connection_class=psycopg.Connection[DictRow],
-        kwargs={"row_factory": dict_row},
+        kwargs={
+            "row_factory": dict_row,
+            "cursor_factory": TracingCursor,
+            "prepare_threshold": settings.DB_PREPARE_THRESHOLD,
+        },
+        configure=configure_connection,
         min_size=settings.DB_POOL_MIN_SIZE,
         max_size=settings.DB_POOL_MAX_SIZE,
         max_lifetime=settings.DB_POOL_MAX_LIFETIME,
@@ -54,7 +125,11 @@ async def lifespan(app: FastAPI) -> None:
                 "public, production, extsrc, odestatic, curation;"
             )
             conn.commit()
+        with conn.cursor() as cur:
+            logger.info("Loading species and gene databases.")
+            species_service.reference.refresh(cur)
     yield
+    export_service.stop_jobs()
     logger.info("Closing DB Connection Pool.")
     app.pool.close()
 
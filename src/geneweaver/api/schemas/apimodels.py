@@ -2,14 +2,16 @@
 
 # ruff: noqa: ANN002, ANN003
 
+from datetime import date
 from enum import Enum
-from typing import Dict, Generic, Iterable, List, Optional, TypeVar
+from typing import Dict, Generic, Iterable, List, Optional, Set, TypeVar
 
-from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.gene import Gene as GeneSchema
 from geneweaver.core.schema.geneset import GeneValue as GeneValueSchema
+from geneweaver.core.schema.score import ScoreType
 from geneweaver.core.schema.species import Species as SpeciesSchema
-from pydantic import AnyUrl, BaseModel
+from pydantic import AnyUrl, BaseModel, Field, model_validator
 
 T = TypeVar("T")
 
@@ -96,6 +98,143 @@ class NewPubmedRecord(BaseModel):
     pubmed_id: int
 
 
+class GenesetCompareReq(BaseModel):
+    """Model for geneset comparison request."""
+
+    geneset_ids: List[int] = Field(min_length=2, max_length=100)
+    in_threshold: bool = True
+
+
+class GenesetSimilarReq(BaseModel):
+    """Model for geneset similarity search request, by gene list or geneset."""
+
+    genes: Optional[List[str]] = Field(None, min_length=1, max_length=10000)
+    species: Optional[Species] = None
+    geneset_id: Optional[int] = None
+    in_threshold: bool = True
+    limit: int = Field(10, ge=1, le=1000)
+
+    @model_validator(mode="after")
+    def check_query(self) -> "GenesetSimilarReq":
+        """Require exactly one of a gene list and a geneset id."""
+        if (self.genes is None) == (self.geneset_id is None):
+            raise ValueError("Provide either `genes` or `geneset_id`.")
+        return self
+
+
+class GeneMatch(str, Enum):
+    """Enum model for whether any or all of a list of genes must match."""
+
+    ANY = "any"
+    ALL = "all"
+
+
+class ValueOrder(str, Enum):
+    """Enum model for ordering geneset values, `-` for descending."""
+
+    VALUE = "value"
+    VALUE_DESC = "-value"
+
+
+class CountMode(str, Enum):
+    """Enum model for how collection totals are counted."""
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
+class HealthStatus(str, Enum):
+    """Enum model for the status reported by health checks."""
+
+    UP = "UP"
+    DEGRADED = "DEGRADED"
+    DOWN = "DOWN"
+
+
+class GeneGenesetsReq(BaseModel):
+    """Model for request of the genesets containing a list of genes."""
+
+    genes: List[str] = Field(min_length=1, max_length=10000)
+    species: Optional[Species] = None
+    match: GeneMatch = GeneMatch.ANY
+    in_threshold: bool = True
+    curation_tier: Optional[Set[GenesetTier]] = None
+    limit: int = Field(10, ge=0, le=1000)
+    offset: int = Field(0, ge=0)
+    count: Optional[CountMode] = None
+    count_only: bool = False
+
+
+class GenesetEnrichmentReq(BaseModel):
+    """Model for geneset enrichment (hypergeometric test) request."""
+
+    genes: List[str] = Field(min_length=1, max_length=10000)
+    species: Species
+    curation_tier: Optional[Set[GenesetTier]] = None
+    only_my_genesets: bool = False
+    score_type: Optional[Set[ScoreType]] = None
+    size_less_than: Optional[int] = Field(None, ge=0)
+    size_greater_than: Optional[int] = Field(None, ge=0)
+    background_size: Optional[int] = Field(None, ge=1)
+    max_q_value: float = Field(1.0, gt=0, le=1)
+    limit: int = Field(100, ge=1, le=1000)
+
+    @model_validator(mode="after")
+    def check_species(self) -> "GenesetEnrichmentReq":
+        """Require a single species."""
+        if self.species == Species.ALL:
+            raise ValueError("Enrichment requires a single `species`.")
+        return self
+
+
+class ExportFormat(str, Enum):
+    """Enum model for the file formats of bulk geneset exports."""
+
+    NDJSON_GZ = "ndjson.gz"
+    PARQUET = "parquet"
+
+
+class GenesetFileFormat(str, Enum):
+    """Enum model for the file formats of single geneset exports."""
+
+    JSON = "json"
+    PARQUET = "parquet"
+
+
+class ExportStatus(str, Enum):
+    """Enum model for the status of a bulk geneset export job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
+class GenesetExportReq(BaseModel):
+    """Model for a bulk geneset export request, filtered like `/genesets`."""
+
+    only_my_genesets: bool = False
+    curation_tier: Optional[Set[GenesetTier]] = None
+    species: Optional[Species] = None
+    name: Optional[str] = None
+    abbreviation: Optional[str] = None
+    publication_id: Optional[int] = Field(None, ge=0)
+    pubmed_id: Optional[int] = Field(None, ge=0)
+    gene_id_type: Optional[GeneIdentifier] = None
+    search_text: Optional[str] = None
+    ontology_term: Optional[str] = None
+    score_type: Optional[Set[ScoreType]] = None
+    size_less_than: Optional[int] = Field(None, ge=0)
+    size_greater_than: Optional[int] = Field(None, ge=0)
+    created_after: Optional[date] = None
+    created_before: Optional[date] = None
+    updated_after: Optional[date] = None
+    updated_before: Optional[date] = None
+    in_threshold: bool = False
+    format: ExportFormat = ExportFormat.NDJSON_GZ
+
+
 class GsPubSearchType(str, Enum):
     """Enum model for genesets and publication search types."""
 
@@ -32,3 +32,12 @@ class UserInternal(User):
     permissions: Optional[List[str]] = None
 
     model_config = ConfigDict(populate_by_name=True)
+
+
+class GenesetAccess(BaseModel):
+    """Access flags a user holds on a single geneset."""
+
+    geneset_id: int
+    readable: bool = False
+    owner: bool = False
+    curator: bool = False
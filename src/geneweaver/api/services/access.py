@@ -0,0 +1,133 @@
+"""Service functions for resolving geneset access.
+
+Readable, owner and curator flags for one or many genesets are resolved with a
+single query. Results are memoized per cursor, and since every request gets its
+own cursor from the connection pool, repeated checks within a request are free.
+"""
+
+from typing import Dict, Iterable, Tuple
+from weakref import WeakKeyDictionary
+
+from fastapi.logger import logger
+from geneweaver.api.schemas.auth import GenesetAccess
+from geneweaver.core.enum import AdminLevelInt
+from psycopg import Cursor
+from psycopg.sql import SQL
+
+GENESET_ACCESS_QUERY = SQL(
+    """
+    SELECT  g.gs_id AS geneset_id,
+            production.geneset_is_readable2(%(user_id)s, g.gs_id) AS readable,
+            g.usr_id = %(user_id)s AS owner,
+            (
+                EXISTS(
+                    SELECT 1 FROM usr
+                    WHERE usr_id = %(user_id)s AND usr_admin > 0
+                )
+                OR EXISTS(
+                    SELECT 1 FROM curation_assignments ca
+                    WHERE ca.curator = %(user_id)s
+                    AND ca.gs_id = g.gs_id
+                    AND ca.curation_state = 2
+                )
+            ) AS curator
+    FROM    geneset g
+    WHERE   g.gs_id = ANY(%(geneset_ids)s);
+    """
+)
+
+IS_ADMIN_QUERY = SQL(
+    """
+    SELECT EXISTS(
+        SELECT 1 FROM usr
+        WHERE usr_id = %(user_id)s AND usr_admin >= %(admin_level)s
+    ) AS admin;
+    """
+)
+
+_memo: "WeakKeyDictionary[Cursor, Dict[Tuple[int, int], GenesetAccess]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _cursor_memo(cursor: Cursor) -> Dict[Tuple[int, int], GenesetAccess]:
+    """Get the access memo bound to a cursor.
+
+    Cursors that cannot be weakly referenced (e.g. `None`) get a throwaway memo.
+
+    :param cursor: DB cursor
+    :return: The (user id, geneset id) -> access memo for the cursor.
+    """
+    try:
+        return _memo.setdefault(cursor, {})
+    except TypeError:
+        return {}
+
+
+def resolve_geneset_access(
+    cursor: Cursor, user_id: int, geneset_ids: Iterable[int]
+) -> Dict[int, GenesetAccess]:
+    """Resolve the access flags a user holds on many genesets.
+
+    Genesets that do not exist resolve to an access object with every flag unset.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :param geneset_ids: geneset identifiers
+    :return: dictionary of geneset id to access flags.
+    """
+    memo = _cursor_memo(cursor)
+    geneset_ids = set(geneset_ids)
+    missing = [gs_id for gs_id in geneset_ids if (user_id, gs_id) not in memo]
+
+    if missing:
+        try:
+            cursor.execute(
+                GENESET_ACCESS_QUERY, {"user_id": user_id, "geneset_ids": missing}
+            )
+            rows = cursor.fetchall()
+
+        except Exception as err:
+            logger.error(err)
+            raise err
+
+        for gs_id in missing:
+            memo[(user_id, gs_id)] = GenesetAccess(geneset_id=gs_id)
+        for row in rows:
+            memo[(user_id, row["geneset_id"])] = GenesetAccess(
+                geneset_id=row["geneset_id"],
+                readable=bool(row["readable"]),
+                owner=bool(row["owner"]),
+                curator=bool(row["curator"]),
+            )
+
+    return {gs_id: memo[(user_id, gs_id)] for gs_id in geneset_ids}
+
+
+def get_geneset_access(cursor: Cursor, user_id: int, geneset_id: int) -> GenesetAccess:
+    """Resolve the access flags a user holds on a single geneset.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :param geneset_id: geneset identifier
+    :return: access flags for the geneset.
+    """
+    return resolve_geneset_access(cursor, user_id, [geneset_id])[geneset_id]
+
+
+def is_admin(cursor: Cursor, user_id: int) -> bool:
+    """Check whether a user is a GeneWeaver administrator (curators are not).
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier
+    """
+    try:
+        cursor.execute(
+            IS_ADMIN_QUERY,
+            {"user_id": user_id, "admin_level": int(AdminLevelInt.ADMIN)},
+        )
+        return bool(cursor.fetchone()["admin"])
+
+    except Exception as err:
+        logger.error(err)
+        raise err
@@ -0,0 +1,333 @@
+"""Service functions for comparing the genes of several genesets.
+
+Every geneset's genes are held as a sorted array of unique `ode_gene_id`s, so the
+size of the intersection of two genesets is a single vectorized merge of two int64
+arrays, and the union and Jaccard similarity follow from the sizes. The arrays are
+cached per geneset: they do not depend on the user, readability is checked on every
+request before the cache is consulted.
+
+Similarity searches run the other way around: the `geneset_value` index on
+`ode_gene_id` is the gene to geneset inverted index, so only the posting lists of
+the query genes are read, and the overlap with every candidate geneset is counted
+in a single aggregate query. Candidate sizes are never counted from the values:
+without a threshold filter they are the stored `gs_count`, and within the threshold
+they are the sizes of the cached gene id arrays, loaded only for the candidates that
+can still reach the top. A pair gets the same Jaccard index from both endpoints.
+"""
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional
+
+from fastapi.logger import logger
+from geneweaver.api.controller import message
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.core.lazy import LazyModule
+from geneweaver.api.schemas.auth import User
+from geneweaver.api.services import genes as genes_service
+from geneweaver.api.services import geneset as geneset_service
+from geneweaver.api.services import visibility as visibility_service
+from geneweaver.core.enum import Species
+from psycopg import Cursor
+from psycopg.sql import SQL
+
+# Only needed for the gene id arrays, and slow to import.
+np = LazyModule("numpy")
+
+READABLE_GENESET_IDS_QUERY = SQL(
+    """
+    SELECT gs_id FROM geneset
+    WHERE gs_id = ANY(%(geneset_ids)s) AND gs_status = 'normal'
+    AND production.geneset_is_readable2(%(user_id)s, gs_id);
+    """
+)
+
+GENESET_GENE_IDS_QUERY = SQL(
+    """
+    SELECT gs_id, ode_gene_id FROM geneset_value
+    WHERE gs_id = ANY(%(geneset_ids)s)
+    AND (gsv_in_threshold OR NOT %(in_threshold)s)
+    ORDER BY gs_id, ode_gene_id;
+    """
+)
+
+# The readable candidate genesets sharing genes with the query, by overlap.
+SIMILAR_CANDIDATES = """
+    SELECT gsv.gs_id, COUNT(DISTINCT gsv.ode_gene_id) AS intersection
+    FROM geneset_value gsv JOIN geneset g ON g.gs_id = gsv.gs_id
+    WHERE gsv.ode_gene_id = ANY(%(gene_ids)s)
+    AND (gsv.gsv_in_threshold OR NOT %(in_threshold)s)
+    AND g.gs_status = 'normal' AND g.gs_id <> ALL(%(exclude_ids)s)
+    AND (g.cur_id <> 5 OR production.geneset_is_readable2(%(user_id)s, g.gs_id))
+    GROUP BY gsv.gs_id
+"""
+
+# Without a threshold filter, a candidate's size is its stored gene count.
+SIMILAR_GENESETS_QUERY = SQL(
+    f"""
+    WITH candidates AS ({SIMILAR_CANDIDATES})
+    SELECT g.gs_id AS geneset_id, g.gs_name AS name,
+           g.gs_abbreviation AS abbreviation, g.gs_count AS size, c.intersection
+    FROM candidates c JOIN geneset g ON g.gs_id = c.gs_id
+    ORDER BY c.intersection::float / (%(query_size)s + g.gs_count - c.intersection)
+             DESC, g.gs_id
+    LIMIT %(limit)s;
+    """
+)
+
+SIMILAR_CANDIDATES_QUERY = SQL(
+    f"""
+    {SIMILAR_CANDIDATES}
+    ORDER BY intersection DESC, gsv.gs_id;
+    """
+)
+
+GENESET_NAMES_QUERY = SQL(
+    """
+    SELECT gs_id AS geneset_id, gs_name AS name, gs_abbreviation AS abbreviation
+    FROM geneset WHERE gs_id = ANY(%(geneset_ids)s);
+    """
+)
+
+# Candidates whose in-threshold sizes are looked up at once.
+SIMILAR_BATCH_SIZE = 100
+
+geneset_genes = TTLCache(max_size=1024, name="geneset_genes")
+
+
+def invalidate(geneset_id: Optional[int] = None) -> None:
+    """Drop cached gene ids after geneset values or thresholds change.
+
+    :param geneset_id: Only drop the gene ids of this geneset.
+    """
+    if geneset_id is None:
+        geneset_genes.invalidate()
+        return
+    geneset_genes.invalidate(lambda key, _: key[0] == geneset_id)
+
+
+def readable_geneset_ids(
+    cursor: Cursor, user_id: int, geneset_ids: Iterable[int]
+) -> set:
+    """Get which of a set of genesets a user can read.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :param geneset_ids: geneset identifiers
+    :return: the readable geneset ids.
+    """
+    geneset_ids = visibility_service.filter_accessible(cursor, user_id, geneset_ids)
+    if not geneset_ids:
+        return set()
+    cursor.execute(
+        READABLE_GENESET_IDS_QUERY, {"geneset_ids": geneset_ids, "user_id": user_id}
+    )
+    return {row["gs_id"] for row in cursor.fetchall()}
+
+
+def get_gene_id_arrays(
+    cursor: Cursor, geneset_ids: Iterable[int], in_threshold: bool = True
+) -> Dict[int, "np.ndarray"]:
+    """Get the sorted, unique gene ids of genesets.
+
+    Genesets missing from the cache are loaded with a single query.
+
+    :param cursor: DB cursor
+    :param geneset_ids: geneset identifiers
+    :param in_threshold: only include the genes within the geneset's threshold
+    :return: a sorted int64 array of `ode_gene_id`s per geneset id.
+    """
+    arrays = {}
+    missing = []
+    for gs_id in geneset_ids:
+        genes = geneset_genes.get((gs_id, in_threshold))
+        if genes is None:
+            missing.append(gs_id)
+        else:
+            arrays[gs_id] = genes
+
+    if missing:
+        version = geneset_genes.version
+        cursor.execute(
+            GENESET_GENE_IDS_QUERY,
+            {"geneset_ids": missing, "in_threshold": in_threshold},
+        )
+        rows = cursor.fetchall()
+        gs_ids = np.fromiter((row["gs_id"] for row in rows), np.int64, len(rows))
+        gene_ids = np.fromiter(
+            (row["ode_gene_id"] for row in rows), np.int64, len(rows)
+        )
+        # Rows are ordered by geneset, so each geneset's genes are a contiguous slice.
+        starts = np.searchsorted(gs_ids, missing, side="left")
+        ends = np.searchsorted(gs_ids, missing, side="right")
+        for gs_id, start, end in zip(missing, starts, ends):
+            genes = np.unique(gene_ids[start:end])
+            genes.flags.writeable = False
+            geneset_genes.set((gs_id, in_threshold), genes, version=version)
+            arrays[gs_id] = genes
+
+    return arrays
+
+
+def compare_gene_id_arrays(arrays: Dict[int, "np.ndarray"]) -> List[dict]:
+    """Compute the overlap of every pair of genesets.
+
+    :param arrays: sorted, unique gene ids per geneset id
+    :return: the intersection and union sizes and Jaccard similarity of each pair.
+    """
+    pairs = []
+    for (gs_id_a, genes_a), (gs_id_b, genes_b) in combinations(arrays.items(), 2):
+        intersection = np.intersect1d(genes_a, genes_b, assume_unique=True).size
+        union = genes_a.size + genes_b.size - intersection
+        pairs.append(
+            {
+                "geneset_ids": [gs_id_a, gs_id_b],
+                "intersection": intersection,
+                "union": union,
+                "jaccard": intersection / union if union else 0.0,
+            }
+        )
+    return pairs
+
+
+def compare_genesets(
+    cursor: Cursor, geneset_ids: List[int], user: User, in_threshold: bool = True
+) -> dict:
+    """Compare the genes of several genesets pairwise.
+
+    :param cursor: DB cursor
+    :param geneset_ids: geneset identifiers
+    :param user: GW user
+    :param in_threshold: only compare the genes within each geneset's threshold
+    :return: dictionary response (geneset sizes and pairwise overlaps).
+    """
+    try:
+        geneset_ids = list(dict.fromkeys(geneset_ids))
+        user_id = geneset_service.determine_user_id(user)
+        readable = readable_geneset_ids(cursor, user_id, geneset_ids)
+        if len(readable) < len(geneset_ids):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+        arrays = get_gene_id_arrays(cursor, geneset_ids, in_threshold)
+        arrays = {gs_id: arrays[gs_id] for gs_id in geneset_ids}
+
+        return {
+            "data": {
+                "genesets": [
+                    {"geneset_id": gs_id, "size": genes.size}
+                    for gs_id, genes in arrays.items()
+                ],
+                "pairs": compare_gene_id_arrays(arrays),
+            }
+        }
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def rank_in_threshold_candidates(
+    cursor: Cursor, candidates: List[dict], query_size: int, limit: int
+) -> List[dict]:
+    """Get the candidates with the highest Jaccard index of their in-threshold genes.
+
+    Candidates are visited by decreasing overlap, sized from the cached gene id
+    arrays. A candidate's Jaccard index is at most its overlap divided by the query
+    size, so the search stops once no remaining candidate can enter the top.
+
+    :param cursor: DB cursor
+    :param candidates: `gs_id` and `intersection`, by decreasing intersection
+    :param query_size: number of query genes
+    :param limit: number of genesets to return
+    :return: the top genesets, with their `size` and `intersection`.
+    """
+    top: List[dict] = []
+    for start in range(0, len(candidates), SIMILAR_BATCH_SIZE):
+        batch = candidates[start : start + SIMILAR_BATCH_SIZE]
+        if len(top) == limit and top[-1]["jaccard"] > (
+            batch[0]["intersection"] / query_size
+        ):
+            break
+        arrays = get_gene_id_arrays(cursor, [row["gs_id"] for row in batch], True)
+        for row in batch:
+            size = arrays[row["gs_id"]].size
+            union = query_size + size - row["intersection"]
+            top.append(
+                {
+                    "geneset_id": row["gs_id"],
+                    "size": size,
+                    "intersection": row["intersection"],
+                    "jaccard": row["intersection"] / union,
+                }
+            )
+        top.sort(key=lambda geneset: (-geneset["jaccard"], geneset["geneset_id"]))
+        del top[limit:]
+
+    if top:
+        cursor.execute(
+            GENESET_NAMES_QUERY,
+            {"geneset_ids": [geneset["geneset_id"] for geneset in top]},
+        )
+        names = {row["geneset_id"]: row for row in cursor.fetchall()}
+        for geneset in top:
+            geneset.update(names.get(geneset["geneset_id"], {}))
+    return top
+
+
+def find_similar_genesets(
+    cursor: Cursor,
+    user: User,
+    genes: Optional[List[str]] = None,
+    species: Optional[Species] = None,
+    geneset_id: Optional[int] = None,
+    in_threshold: bool = True,
+    limit: int = 10,
+) -> dict:
+    """Find the visible genesets most similar to a gene list or geneset.
+
+    Genesets are ranked by the Jaccard index of their genes and the query genes.
+
+    :param cursor: DB cursor
+    :param user: GW user
+    :param genes: query gene reference ids (symbols, database ids)
+    :param species: only match query genes of this species
+    :param geneset_id: use the genes of this geneset as the query
+    :param in_threshold: only compare the genes within each geneset's threshold
+    :param limit: number of genesets to return
+    :return: dictionary response (query size and the most similar genesets).
+    """
+    try:
+        user_id = geneset_service.determine_user_id(user)
+        if geneset_id is not None:
+            if geneset_id not in readable_geneset_ids(cursor, user_id, [geneset_id]):
+                return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+            gene_ids = get_gene_id_arrays(cursor, [geneset_id], in_threshold)
+            gene_ids = gene_ids[geneset_id].tolist()
+        else:
+            gene_ids = genes_service.get_gene_ids(cursor, genes, species)
+
+        similar = []
+        params = {
+            "gene_ids": gene_ids,
+            "query_size": len(gene_ids),
+            "in_threshold": in_threshold,
+            "exclude_ids": [geneset_id] if geneset_id is not None else [],
+            "user_id": user_id,
+            "limit": limit,
+        }
+        if gene_ids and in_threshold:
+            cursor.execute(SIMILAR_CANDIDATES_QUERY, params)
+            similar = rank_in_threshold_candidates(
+                cursor, cursor.fetchall(), len(gene_ids), limit
+            )
+        elif gene_ids:
+            cursor.execute(SIMILAR_GENESETS_QUERY, params)
+            similar = cursor.fetchall()
+            for geneset in similar:
+                union = len(gene_ids) + geneset["size"] - geneset["intersection"]
+                geneset["jaccard"] = geneset["intersection"] / union
+
+        return {"data": {"query_size": len(gene_ids), "genesets": similar}}
+
+    except Exception as err:
+        logger.error(err)
+        raise err
@@ -0,0 +1,126 @@
+"""Service functions for counting the rows of paginated collections.
+
+Three count modes are supported:
+
+- `exact`: wrap the collection query in a `COUNT(*)`.
+- `estimated`: read the planner's row estimate with `EXPLAIN`, no rows are scanned.
+- `cached`: an exact count, cached per normalized filter set.
+"""
+
+from datetime import date
+from enum import Enum
+from typing import Any, Hashable, Optional, Tuple
+
+from fastapi.logger import logger
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.schemas.apimodels import CountMode
+from psycopg import Cursor
+from psycopg.sql import SQL, Composed
+
+counts = TTLCache(max_size=1024, name="collection_counts")
+
+
+def normalize_filters(**filters: Any) -> Tuple[Hashable, ...]:  # noqa: ANN401
+    """Build a hashable cache key out of a set of query filters.
+
+    Filters that are not set are dropped, and sets are sorted so that equivalent
+    requests share a key.
+
+    :param filters: The filters passed to the collection query.
+    :return: a sorted tuple of (name, value) pairs.
+    """
+
+    def normalize(value: Any) -> Hashable:  # noqa: ANN401
+        if isinstance(value, Enum):
+            return normalize(value.value)
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, (set, frozenset, list, tuple)):
+            return tuple(sorted((normalize(v) for v in value), key=repr))
+        return value
+
+    return tuple(
+        sorted(
+            (name, normalize(value))
+            for name, value in filters.items()
+            if value is not None
+        )
+    )
+
+
+def exact_count(cursor: Cursor, query: Composed, params: dict) -> int:
+    """Count the rows a query returns.
+
+    :param cursor: DB cursor
+    :param query: The collection query, without limit or offset.
+    :param params: The collection query parameters.
+    :return: the number of rows.
+    """
+    cursor.execute(
+        SQL("SELECT COUNT(*) AS count FROM ({query}) AS collection;").format(
+            query=query
+        ),
+        params,
+    )
+    return cursor.fetchone()["count"]
+
+
+def estimated_count(cursor: Cursor, query: Composed, params: dict) -> int:
+    """Estimate the rows a query returns using planner statistics.
+
+    :param cursor: DB cursor
+    :param query: The collection query, without limit or offset.
+    :param params: The collection query parameters.
+    :return: the planner's estimate of the number of rows.
+    """
+    cursor.execute(SQL("EXPLAIN (FORMAT JSON) {query}").format(query=query), params)
+    plan = cursor.fetchone()["QUERY PLAN"]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count(
+    cursor: Cursor,
+    query: Composed,
+    params: dict,
+    mode: Optional[CountMode] = None,
+    cache_key: Optional[Hashable] = None,
+) -> Optional[int]:
+    """Count the rows of a collection query.
+
+    :param cursor: DB cursor
+    :param query: The collection query, without limit or offset.
+    :param params: The collection query parameters.
+    :param mode: The count mode, nothing is counted when omitted.
+    :param cache_key: Key identifying the (normalized) filters of the query, required
+    for cached counts.
+    :return: the total number of rows, or None if no count was requested.
+    """
+    try:
+        if mode is None:
+            return None
+
+        if mode == CountMode.ESTIMATED:
+            return estimated_count(cursor, query, params)
+
+        if mode == CountMode.CACHED and cache_key is not None:
+            return counts.get_or_set(
+                cache_key, lambda: exact_count(cursor, query, params)
+            )
+
+        return exact_count(cursor, query, params)
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def invalidate(*collections: str) -> None:
+    """Drop cached counts after writes that change collection contents.
+
+    :param collections: Only drop the counts of these collections (the first element
+    of the cache key), all counts are dropped when omitted.
+    """
+    if not collections:
+        counts.invalidate()
+        return
+    counts.invalidate(lambda key, _: key[0] in collections)
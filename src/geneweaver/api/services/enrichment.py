@@ -0,0 +1,234 @@
+"""Service functions for gene set enrichment (over-representation) analysis.
+
+A query gene list is tested against every visible geneset of a species with the
+hypergeometric test, and the p-values are corrected for multiple testing with the
+Benjamini-Hochberg procedure. The database only returns the genesets that overlap
+the query (counted from the `geneset_value` index on `ode_gene_id`), every other
+visible geneset is a test with a p-value of 1 and only adds to the number of tests.
+"""
+
+from typing import List, Optional, Set
+
+from fastapi.logger import logger
+from geneweaver.api.core.lazy import LazyModule
+from geneweaver.api.schemas.apimodels import CountMode
+from geneweaver.api.schemas.auth import User
+from geneweaver.api.services import count as count_service
+from geneweaver.api.services import genes as genes_service
+from geneweaver.api.services import geneset as geneset_service
+from geneweaver.core.enum import GenesetTier, Species
+from geneweaver.core.schema.score import ScoreType
+from geneweaver.db.query import geneset as geneset_query
+from psycopg import Cursor
+from psycopg.sql import SQL
+
+# Only needed to score enrichment, and slow to import.
+np = LazyModule("numpy")
+
+OVERLAPPING_GENESETS_QUERY = SQL(
+    """
+    WITH candidates AS ({visible}),
+    matches AS (
+        SELECT gsv.gs_id, COUNT(*) AS overlap FROM geneset_value gsv
+        WHERE gsv.ode_gene_id = ANY(%(gene_ids)s) AND gsv.gsv_in_threshold
+        AND gsv.gs_id IN (SELECT id FROM candidates)
+        GROUP BY gsv.gs_id
+    )
+    SELECT candidates.id AS geneset_id, candidates.name, candidates.abbreviation,
+           matches.overlap,
+           (SELECT COUNT(*) FROM geneset_value v
+            WHERE v.gs_id = matches.gs_id AND v.gsv_in_threshold) AS size
+    FROM matches JOIN candidates ON candidates.id = matches.gs_id;
+    """
+)
+
+SPECIES_GENES_QUERY = SQL(
+    """
+    SELECT DISTINCT ode_gene_id FROM gene WHERE sp_id = %(species_id)s
+    """
+)
+
+
+def log_factorials(n: int) -> "np.ndarray":
+    """Tabulate log(i!) for i in 0..n.
+
+    :param n: The largest factorial.
+    :return: a float64 array of length n + 1.
+    """
+    table = np.zeros(n + 1)
+    np.cumsum(np.log(np.arange(1, n + 1)), out=table[1:])
+    return table
+
+
+def hypergeometric_sf(
+    overlaps: "np.ndarray", population: int, successes: "np.ndarray", draws: int
+) -> "np.ndarray":
+    """Vectorized upper tail P(X >= k) of the hypergeometric distribution.
+
+    The tail is summed term by term for every geneset at once, and stops once every
+    remaining term is past the mode and negligible.
+
+    :param overlaps: k, the observed overlap of each geneset with the query.
+    :param population: N, the number of genes in the background.
+    :param successes: K, the size of each geneset.
+    :param draws: n, the size of the query.
+    :return: the p-value of each geneset.
+    """
+    overlaps = np.asarray(overlaps, dtype=np.int64)
+    successes = np.asarray(successes, dtype=np.int64)
+    log_fact = log_factorials(population)
+
+    def log_comb(n: "np.ndarray", k: "np.ndarray") -> "np.ndarray":
+        return log_fact[n] - log_fact[k] - log_fact[n - k]
+
+    upper = np.minimum(successes, draws)
+    mode = (draws + 1) * (successes + 1) // (population + 2)
+    log_total = log_comb(np.int64(population), np.int64(draws))
+    p_values = np.zeros(overlaps.shape)
+    x = overlaps.copy()
+    while True:
+        active = x <= upper
+        if not active.any():
+            break
+        x_valid = np.where(active, x, upper)
+        failures = draws - x_valid
+        # Draws the background can not provide have a probability of zero.
+        possible = active & (failures <= population - successes)
+        failures = np.clip(failures, 0, population - successes)
+        term = np.exp(
+            log_comb(successes, x_valid)
+            + log_comb(population - successes, failures)
+            - log_total
+        )
+        term[~possible] = 0.0
+        p_values += term
+        if np.all(~active | ((x > mode) & (term <= p_values * 1e-16))):
+            break
+        x += 1
+    return np.minimum(p_values, 1.0)
+
+
+def benjamini_hochberg(
+    p_values: "np.ndarray", tests: Optional[int] = None
+) -> "np.ndarray":
+    """Adjust p-values for the false discovery rate (Benjamini-Hochberg).
+
+    :param p_values: The p-values of the reported tests.
+    :param tests: The total number of tests, when tests with a p-value of 1 are
+    not reported. Defaults to the number of p-values.
+    :return: the q-values, in the order of `p_values`.
+    """
+    p_values = np.asarray(p_values, dtype=np.float64)
+    tests = max(tests or 0, p_values.size)
+    order = np.argsort(p_values)
+    ranked = p_values[order] * tests / np.arange(1, p_values.size + 1)
+    q_values = np.empty_like(p_values)
+    q_values[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q_values
+
+
+def get_enrichment(
+    cursor: Cursor,
+    genes: List[str],
+    species: Species,
+    user: Optional[User] = None,
+    curation_tier: Optional[Set[GenesetTier]] = None,
+    only_my_genesets: Optional[bool] = None,
+    score_type: Optional[Set[ScoreType]] = None,
+    lte_count: Optional[int] = None,
+    gte_count: Optional[int] = None,
+    background_size: Optional[int] = None,
+    max_q_value: float = 1.0,
+    limit: int = 100,
+) -> dict:
+    """Test a gene list for over-representation in the visible genesets.
+
+    :param cursor: DB cursor
+    :param genes: The query gene reference ids.
+    :param species: The species of the genes and genesets.
+    :param user: The user requesting the enrichment.
+    :param curation_tier: Only test genesets of these curation tiers.
+    :param only_my_genesets: Only test genesets owned by the user.
+    :param score_type: Only test genesets of these score types.
+    :param lte_count: Only test genesets with at most this many genes.
+    :param gte_count: Only test genesets with at least this many genes.
+    :param background_size: Number of genes in the background, defaults to the
+    number of genes of the species.
+    :param max_q_value: Only return genesets with at most this q-value.
+    :param limit: Return at most this many genesets.
+    :return: dictionary response (test sizes and the most enriched genesets).
+    """
+    try:
+        curation_tier, owner_id, is_readable_by = (
+            geneset_service.determine_geneset_access(
+                user, curation_tier, only_my_genesets
+            )
+        )
+        filters = {
+            "is_readable_by": is_readable_by,
+            "owner_id": owner_id,
+            "curation_tier": curation_tier,
+            "species": species,
+            "score_type": score_type,
+            "lte_count": lte_count,
+            "gte_count": gte_count,
+        }
+        visible, params = geneset_query.get(with_publication_info=False, **filters)
+
+        gene_ids = genes_service.get_gene_ids(cursor, genes, species)
+        data = {
+            "query_size": len(gene_ids),
+            "background_size": background_size,
+            "tested": 0,
+            "genesets": [],
+        }
+        if not gene_ids:
+            return {"data": data}
+
+        if background_size is None:
+            data["background_size"] = count_service.count(
+                cursor,
+                SPECIES_GENES_QUERY,
+                {"species_id": int(species)},
+                mode=CountMode.CACHED,
+                cache_key=("species_genes", int(species)),
+            )
+        # Same cache key as the visible genesets collection with these filters.
+        data["tested"] = count_service.count(
+            cursor,
+            visible,
+            params,
+            mode=CountMode.CACHED,
+            cache_key=("genesets", count_service.normalize_filters(**filters)),
+        )
+
+        cursor.execute(
+            OVERLAPPING_GENESETS_QUERY.format(visible=visible),
+            {**params, "gene_ids": gene_ids},
+        )
+        genesets = cursor.fetchall()
+        if not genesets:
+            return {"data": data}
+
+        overlaps = np.array([gs["overlap"] for gs in genesets], dtype=np.int64)
+        sizes = np.array([gs["size"] for gs in genesets], dtype=np.int64)
+        population = max(data["background_size"], len(gene_ids), int(sizes.max()))
+        p_values = hypergeometric_sf(overlaps, population, sizes, len(gene_ids))
+        q_values = benjamini_hochberg(p_values, data["tested"])
+        expected = sizes * len(gene_ids) / population
+
+        for idx in np.argsort(p_values, kind="stable")[:limit]:
+            if q_values[idx] > max_q_value:
+                break
+            geneset = genesets[idx]
+            geneset["expected"] = float(expected[idx])
+            geneset["fold_enrichment"] = float(overlaps[idx] / expected[idx])
+            geneset["p_value"] = float(p_values[idx])
+            geneset["q_value"] = float(q_values[idx])
+            data["genesets"].append(geneset)
+
+        return {"data": data}
+
+    except Exception as err:
+        logger.error(err)
+        raise err
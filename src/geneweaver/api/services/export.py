@@ -0,0 +1,557 @@
+"""Service functions for exporting genesets to files.
+
+The JSON export of a public geneset only changes when the geneset is updated, so
+it is built once per (geneset, gene identifier type, update time), gzipped, and
+kept in a shared disk cache from which every later download is served.
+
+Bulk exports of every geneset matching a set of filters run as background jobs:
+the genesets are read through a server-side cursor and their values in batches,
+and written to a single file, one JSON document per geneset (NDJSON), gzipped.
+Job status and files are kept in a directory shared by every worker: export files
+are evicted by size, status files are kept so a job never disappears. Jobs left
+pending or running by a dead worker are marked failed when a worker starts on the
+same host.
+
+Geneset values are also exported to Parquet when `pyarrow` is installed, one row
+group per geneset, with dictionary-encoded gene symbols.
+"""
+
+import gzip
+import json
+import os
+import socket
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from datetime import datetime
+from importlib.util import find_spec
+from typing import Iterable, Iterator, Optional, Union
+from uuid import uuid4
+
+from fastapi.logger import logger
+from geneweaver.api.controller import message
+from geneweaver.api.core.disk_cache import DiskCache
+from geneweaver.api.core.lazy import LazyModule
+from geneweaver.api.schemas.apimodels import (
+    ExportFormat,
+    ExportStatus,
+    GenesetExportReq,
+    GenesetFileFormat,
+)
+from geneweaver.api.schemas.auth import User
+from geneweaver.api.services import geneset as geneset_service
+from geneweaver.api.services import visibility as visibility_service
+from geneweaver.core.enum import GeneIdentifier, GenesetTier
+from geneweaver.db import geneset as db_geneset
+from geneweaver.db.query import geneset as geneset_query
+from psycopg import Connection, Cursor
+from psycopg.sql import SQL
+from psycopg_pool import ConnectionPool
+
+# Only needed for Parquet exports, and slow to import.
+pa = LazyModule("pyarrow")
+pq = LazyModule("pyarrow.parquet")
+
+# Artifacts are compressed once and downloaded many times.
+ARTIFACT_GZIP_LEVEL = 9
+
+# Genesets read from the server-side cursor, and whose values are read, at once.
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_VALUES_QUERY = SQL(
+    """
+    SELECT DISTINCT ON (gv.gs_id, gv.ode_gene_id)
+           gv.gs_id, g.ode_ref_id AS symbol, gv.gsv_value AS value,
+           gv.gsv_in_threshold AS in_threshold
+    FROM extsrc.geneset_value gv JOIN extsrc.gene g USING (ode_gene_id)
+    WHERE gv.gs_id = ANY(%(geneset_ids)s)
+    AND (gv.gsv_in_threshold OR NOT %(in_threshold)s)
+    ORDER BY gv.gs_id, gv.ode_gene_id;
+    """
+)
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+MEDIA_TYPES = {
+    ExportFormat.NDJSON_GZ: "application/gzip",
+    ExportFormat.PARQUET: PARQUET_MEDIA_TYPE,
+}
+
+export_artifacts = DiskCache()
+export_jobs = DiskCache()
+job_status_directory: Optional[str] = None
+job_executor: Optional[ThreadPoolExecutor] = None
+
+
+def artifact_name(
+    geneset: dict,
+    gene_id_type: Optional[GeneIdentifier],
+    file_format: GenesetFileFormat = GenesetFileFormat.JSON,
+) -> str:
+    """Get the file name of a geneset's export artifact.
+
+    :param geneset: geneset row, with its `id` and `updated` time
+    :param gene_id_type: gene identifier type of the export
+    :param file_format: file format of the export
+    """
+    id_type = gene_id_type.name if gene_id_type else "uploaded"
+    updated = geneset["updated"].strftime("%Y%m%d%H%M%S%f")
+    extension = "json.gz" if file_format == GenesetFileFormat.JSON else "parquet"
+    return f"{geneset['id']}_{id_type}_{updated}.{extension}"
+
+
+def parquet_available() -> bool:
+    """Whether Parquet exports are available (`pyarrow` is installed)."""
+    return find_spec("pyarrow") is not None
+
+
+def parquet_schema() -> "pa.Schema":
+    """Get the schema of Parquet exports, one row per geneset value."""
+    return pa.schema(
+        [
+            ("geneset_id", pa.int64()),
+            ("symbol", pa.dictionary(pa.int32(), pa.string())),
+            ("value", pa.float64()),
+            ("in_threshold", pa.bool_()),
+        ]
+    )
+
+
+def write_parquet(sink: Union[str, "pa.NativeFile"], documents: Iterable[dict]) -> int:
+    """Write the values of genesets to Parquet, one row group per geneset.
+
+    :param sink: file path or `pyarrow` output stream
+    :param documents: geneset and geneset values (`symbol`, `value` and
+    `in_threshold`) of each geneset
+    :return: the number of genesets written.
+    """
+    schema = parquet_schema()
+    count = 0
+    with pq.ParquetWriter(sink, schema) as writer:
+        for document in documents:
+            count += 1
+            values = document["geneset_values"]
+            if not values:
+                continue
+            table = pa.table(
+                [
+                    pa.array([document["geneset"]["id"]] * len(values), pa.int64()),
+                    pa.array([v["symbol"] for v in values]).dictionary_encode(),
+                    pa.array([v["value"] for v in values], pa.float64()),
+                    pa.array([v["in_threshold"] for v in values], pa.bool_()),
+                ],
+                schema=schema,
+            )
+            writer.write_table(table)
+    return count
+
+
+def geneset_parquet(export: dict) -> bytes:
+    """Convert a geneset's export to Parquet.
+
+    :param export: geneset and geneset values, as returned by `get_geneset`
+    :return: the Parquet file contents.
+    """
+    values = [
+        {
+            "symbol": row["ode_ref_id"],
+            "value": row["gsv_value"],
+            "in_threshold": row["gsv_in_threshold"],
+        }
+        for row in export["geneset_values"] or []
+    ]
+    sink = pa.BufferOutputStream()
+    write_parquet(sink, [{"geneset": export["geneset"], "geneset_values": values}])
+    return sink.getvalue().to_pybytes()
+
+
+def read_artifact(path: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Read an export artifact, decompressed, for clients not accepting gzip.
+
+    :param path: artifact path
+    :param chunk_size: size of the decompressed chunks
+    """
+    with gzip.open(path, "rb") as artifact:
+        while chunk := artifact.read(chunk_size):
+            yield chunk
+
+
+def invalidate(geneset_id: Optional[int] = None) -> None:
+    """Drop the export artifacts of a geneset, or every artifact.
+
+    :param geneset_id: geneset identifier
+    """
+    export_artifacts.invalidate("" if geneset_id is None else f"{geneset_id}_")
+
+
+def build_geneset_export(
+    cursor: Cursor,
+    geneset_id: int,
+    user: User,
+    gene_id_type: Optional[GeneIdentifier] = None,
+) -> dict:
+    """Get the contents of a geneset's export.
+
+    :param cursor: DB cursor
+    :param geneset_id: geneset identifier
+    :param user: GW user
+    :param gene_id_type: gene identifier type of the values
+    :return: dictionary response (geneset and geneset values).
+    """
+    if gene_id_type:
+        return geneset_service.get_geneset_w_gene_id_type(
+            cursor, geneset_id, user, gene_id_type
+        )
+    return geneset_service.get_geneset(cursor, geneset_id, user)
+
+
+def get_geneset_export(
+    cursor: Cursor,
+    geneset_id: int,
+    user: User,
+    gene_id_type: Optional[GeneIdentifier] = None,
+    file_format: GenesetFileFormat = GenesetFileFormat.JSON,
+) -> dict:
+    """Get the export of a geneset, from the artifact cache for public genesets.
+
+    :param cursor: DB cursor
+    :param geneset_id: geneset identifier
+    :param user: GW user
+    :param gene_id_type: gene identifier type of the values
+    :param file_format: file format of the export
+    :return: dictionary response, either the `file` of an artifact (gzipped JSON
+    or Parquet) or the export's contents (geneset and geneset values).
+    """
+    try:
+        if file_format == GenesetFileFormat.PARQUET and not parquet_available():
+            return {"error": True, "message": message.EXPORT_FORMAT_UNAVAILABLE}
+
+        if not export_artifacts.enabled:
+            return build_geneset_export(cursor, geneset_id, user, gene_id_type)
+
+        user_id = geneset_service.determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+        results = db_geneset.get(
+            cursor,
+            is_readable_by=user_id,
+            gs_id=geneset_id,
+            with_publication_info=False,
+        )
+        if len(results) <= 0:
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+        geneset = results[0]
+        # Private genesets are never written to the shared cache.
+        if geneset["curation_id"] == int(GenesetTier.TIER5):
+            return build_geneset_export(cursor, geneset_id, user, gene_id_type)
+
+        name = artifact_name(geneset, gene_id_type, file_format)
+        path = export_artifacts.get(name)
+        if path is None:
+            response = build_geneset_export(cursor, geneset_id, user, gene_id_type)
+            if "error" in response:
+                return response
+            if file_format == GenesetFileFormat.PARQUET:
+                data = geneset_parquet(response)
+            else:
+                data = json.dumps(response, default=str).encode()
+                data = gzip.compress(data, compresslevel=ARTIFACT_GZIP_LEVEL)
+            path = export_artifacts.put(name, data)
+
+        return {
+            "file": path,
+            "gene_identifier_type": gene_id_type.name if gene_id_type else None,
+        }
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def start_jobs(directory: Optional[str], max_bytes: int, workers: int) -> None:
+    """Start running bulk export jobs in this worker.
+
+    :param directory: Where job status and files are written (None disables jobs).
+    :param max_bytes: Maximum total size of the export files kept.
+    :param workers: Maximum number of jobs run at once by this worker.
+    """
+    global job_executor, job_status_directory
+    if directory is None:
+        export_jobs.configure(None, max_bytes)
+        job_status_directory = None
+        return
+
+    export_jobs.configure(os.path.join(directory, "files"), max_bytes)
+    job_status_directory = os.path.join(directory, "status")
+    os.makedirs(job_status_directory, exist_ok=True)
+    fail_orphaned_jobs()
+    job_executor = ThreadPoolExecutor(workers, thread_name_prefix="export")
+
+
+def stop_jobs() -> None:
+    """Stop running bulk export jobs, cancelling the jobs not started yet."""
+    global job_executor
+    if job_executor is not None:
+        job_executor.shutdown(wait=False, cancel_futures=True)
+        job_executor = None
+
+
+def export_file_name(job_id: str, export_format: ExportFormat) -> str:
+    """Get the file name of a bulk export."""
+    return f"{job_id}.{export_format.value}"
+
+
+def job_worker() -> str:
+    """Identify this worker process, in the status of the jobs it runs."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_alive(worker: Optional[str]) -> bool:
+    """Check whether the worker running a job may still be alive.
+
+    Workers on other hosts can not be checked, and are assumed to be alive.
+
+    :param worker: the job's worker, from `job_worker`
+    """
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname():
+        return True
+    if int(pid) == os.getpid():
+        # This process has just started, so it can not be running the job.
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def public_status(status: dict) -> dict:
+    """Get a job status as returned to users, without its worker."""
+    return {key: value for key, value in status.items() if key != "worker"}
+
+
+def job_status_path(job_id: str) -> str:
+    """Get the status file of a bulk export job."""
+    return os.path.join(job_status_directory, f"{job_id}.json")
+
+
+def read_job_status(job_id: str) -> Optional[dict]:
+    """Read the status of a bulk export job.
+
+    :param job_id: job identifier
+    :return: the job status, or None if there is no such job.
+    """
+    if job_status_directory is None:
+        return None
+    try:
+        with open(job_status_path(job_id), "rb") as status:
+            return json.load(status)
+    except FileNotFoundError:
+        return None
+
+
+def write_job_status(status: dict) -> None:
+    """Write the status of a bulk export job, atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=job_status_directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(status, tmp, default=str)
+        os.replace(tmp_path, job_status_path(status["id"]))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def fail_orphaned_jobs() -> None:
+    """Mark the jobs left pending or running by a dead worker as failed."""
+    for name in os.listdir(job_status_directory):
+        if not name.endswith(".json"):
+            continue
+        status = read_job_status(name[: -len(".json")])
+        if (
+            status is not None
+            and status["status"] in (ExportStatus.PENDING, ExportStatus.RUNNING)
+            and not worker_alive(status.get("worker"))
+        ):
+            logger.warning("Export job %s was orphaned, marking it failed.", name)
+            status.update(status=ExportStatus.FAILED, finished=datetime.now())
+            write_job_status(status)
+
+
+def iter_geneset_exports(
+    conn: Connection, filters: dict, in_threshold: bool = False
+) -> Iterator[dict]:
+    """Read the genesets matching filters, with their values.
+
+    :param conn: DB connection, in a transaction for the server-side cursor.
+    :param filters: `geneset.get` filters
+    :param in_threshold: only export the values within each geneset's threshold
+    :return: the geneset and geneset values of each geneset, by geneset id.
+    """
+    query, params = geneset_query.get(with_publication_info=False, **filters)
+    query += SQL(" ORDER BY geneset.gs_id")
+    with conn.cursor(name=f"export_{uuid4().hex}") as genesets, conn.cursor() as cur:
+        genesets.itersize = EXPORT_BATCH_SIZE
+        genesets.execute(query, params)
+        while batch := genesets.fetchmany(EXPORT_BATCH_SIZE):
+            cur.execute(
+                EXPORT_VALUES_QUERY,
+                {
+                    "geneset_ids": [geneset["id"] for geneset in batch],
+                    "in_threshold": in_threshold,
+                },
+            )
+            values = defaultdict(list)
+            for row in cur.fetchall():
+                values[row.pop("gs_id")].append(row)
+            for geneset in batch:
+                yield {"geneset": geneset, "geneset_values": values[geneset["id"]]}
+
+
+def write_ndjson_gz(path: str, documents: Iterator[dict]) -> int:
+    """Write JSON documents to a gzipped file, one per line.
+
+    :param path: file path
+    :param documents: the documents
+    :return: the number of documents written.
+    """
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as export:
+        for document in documents:
+            export.write(json.dumps(document, default=str))
+            export.write("\n")
+            count += 1
+    return count
+
+
+EXPORT_WRITERS = {
+    ExportFormat.NDJSON_GZ: write_ndjson_gz,
+    ExportFormat.PARQUET: write_parquet,
+}
+
+
+def run_export_job(
+    pool: ConnectionPool, status: dict, filters: dict, in_threshold: bool
+) -> None:
+    """Run a bulk export job, recording its progress in its status.
+
+    :param pool: DB connection pool
+    :param status: job status
+    :param filters: `geneset.get` filters
+    :param in_threshold: only export the values within each geneset's threshold
+    """
+    status.update(status=ExportStatus.RUNNING, started=datetime.now())
+    write_job_status(status)
+    tmp_path = export_jobs.temp_path()
+    try:
+        export_format = ExportFormat(status["format"])
+        with pool.connection() as conn:
+            genesets = iter_geneset_exports(conn, filters, in_threshold)
+            status["genesets"] = EXPORT_WRITERS[export_format](tmp_path, genesets)
+        export_jobs.put_file(export_file_name(status["id"], export_format), tmp_path)
+        status["status"] = ExportStatus.COMPLETE
+    except Exception as err:
+        logger.error(err)
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        status["status"] = ExportStatus.FAILED
+    status["finished"] = datetime.now()
+    write_job_status(status)
+
+
+def create_export_job(
+    pool: ConnectionPool, user: Optional[User], export: GenesetExportReq
+) -> dict:
+    """Start a bulk export of the visible genesets matching filters.
+
+    :param pool: DB connection pool, used by the job
+    :param user: GW user
+    :param export: export filters and format
+    :return: dictionary response (job status).
+    """
+    try:
+        if job_executor is None:
+            return {"error": True, "message": message.EXPORTS_UNAVAILABLE}
+        if export.format == ExportFormat.PARQUET and not parquet_available():
+            return {"error": True, "message": message.EXPORT_FORMAT_UNAVAILABLE}
+
+        curation_tier, owner_id, is_readable_by = (
+            geneset_service.determine_geneset_access(
+                user, export.curation_tier, export.only_my_genesets
+            )
+        )
+        filters = {
+            "is_readable_by": is_readable_by,
+            "owner_id": owner_id,
+            "curation_tier": curation_tier,
+            "species": export.species,
+            "name": export.name,
+            "abbreviation": export.abbreviation,
+            "publication_id": export.publication_id,
+            "pubmed_id": export.pubmed_id,
+            "gene_id_type": export.gene_id_type,
+            "search_text": export.search_text,
+            "ontology_term": export.ontology_term,
+            "score_type": export.score_type,
+            "lte_count": export.size_less_than,
+            "gte_count": export.size_greater_than,
+            "created_after": export.created_after,
+            "created_before": export.created_before,
+            "updated_after": export.updated_after,
+            "updated_before": export.updated_before,
+        }
+        status = {
+            "id": uuid4().hex,
+            "user_id": geneset_service.determine_user_id(user),
+            "status": ExportStatus.PENDING,
+            "format": export.format,
+            "genesets": None,
+            "created": datetime.now(),
+            "worker": job_worker(),
+        }
+        write_job_status(status)
+        job_executor.submit(run_export_job, pool, status, filters, export.in_threshold)
+        return {"data": public_status(status)}
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def get_export_job(job_id: str, user: Optional[User]) -> dict:
+    """Get the status of a bulk export job.
+
+    :param job_id: job identifier
+    :param user: GW user, who must have started the job
+    :return: dictionary response (job status).
+    """
+    status = read_job_status(job_id)
+    if status is None or status["user_id"] != geneset_service.determine_user_id(user):
+        return {"error": True, "message": message.RECORD_NOT_FOUND_ERROR}
+    return {"data": public_status(status)}
+
+
+def get_export_file(job_id: str, user: Optional[User]) -> dict:
+    """Get the file of a complete bulk export job.
+
+    :param job_id: job identifier
+    :param user: GW user, who must have started the job
+    :return: dictionary response (`file` path and `format`).
+    """
+    response = get_export_job(job_id, user)
+    if "error" in response:
+        return response
+    status = response["data"]
+    if status["status"] != ExportStatus.COMPLETE:
+        return {"error": True, "message": message.EXPORT_NOT_READY}
+
+    export_format = ExportFormat(status["format"])
+    path = export_jobs.get(export_file_name(job_id, export_format))
+    if path is None:
+        return {"error": True, "message": message.RECORD_NOT_FOUND_ERROR}
+    return {"file": path, "format": export_format}
@@ -1,11 +1,26 @@
 """Service methods for genes."""
 
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Set, Tuple
 
 from fastapi.logger import logger
-from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.api.schemas.apimodels import CountMode, GeneMatch
+from geneweaver.api.schemas.auth import User
+from geneweaver.api.services import count as count_service
+from geneweaver.api.services import geneset as geneset_service
+from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.db import gene as db_gene
+from geneweaver.db.query.geneset.utils import is_readable, restrict_tier
 from psycopg import Cursor
+from psycopg.sql import SQL, Composed
+
+GENE_IDS_BY_REF_ID_QUERY = SQL(
+    """
+    SELECT DISTINCT ode_gene_id FROM gene
+    WHERE ode_ref_id = ANY(%(reference_ids)s)
+    AND (sp_id = %(species_id)s OR %(species_id)s = 0)
+    ORDER BY ode_gene_id;
+    """
+)
 
 
 def get_genes(
@@ -42,6 +57,155 @@ def get_genes(
     return {"data": gene_list}
 
 
+def get_gene_ids(
+    cursor: Cursor, reference_ids: Iterable[str], species: Optional[Species] = None
+) -> List[int]:
+    """Get the geneweaver gene ids of gene references (symbols, database ids).
+
+    :param cursor: The database cursor.
+    :param reference_ids: The gene reference ids.
+    :param species: Only match genes of this species.
+    @return: sorted, unique ode gene ids.
+    """
+    species_id = int(species) if species is not None else 0
+    try:
+        cursor.execute(
+            GENE_IDS_BY_REF_ID_QUERY,
+            {"reference_ids": list(reference_ids), "species_id": species_id},
+        )
+        return [row["ode_gene_id"] for row in cursor.fetchall()]
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def gene_genesets_query(
+    reference_ids: List[str],
+    species: Optional[Species] = None,
+    match: GeneMatch = GeneMatch.ANY,
+    in_threshold: bool = True,
+    curation_tier: Optional[Set[GenesetTier]] = None,
+    is_readable_by: Optional[int] = None,
+) -> Tuple[Composed, dict]:
+    """Build the query for the genesets containing any or all of a list of genes.
+
+    Matches are counted per geneset from the `geneset_value` index on `ode_gene_id`
+    first, so geneset filters (including readability) only run once per geneset.
+
+    :param reference_ids: The gene reference ids.
+    :param species: Only match genes of this species.
+    :param match: Whether genesets must contain any or all of the genes.
+    :param in_threshold: Only match genes within the geneset's threshold.
+    :param curation_tier: Only return genesets of these curation tiers.
+    :param is_readable_by: Only return genesets readable by this user.
+    @return: the query, without ordering, limit or offset, and its parameters.
+    """
+    params = {"reference_ids": reference_ids}
+    match_filters = [SQL("gene.ode_ref_id = ANY(%(reference_ids)s)")]
+    if species is not None and species != Species.ALL:
+        match_filters.append(SQL("gene.sp_id = %(species_id)s"))
+        params["species_id"] = int(species)
+    if in_threshold:
+        match_filters.append(SQL("gsv.gsv_in_threshold"))
+
+    having = SQL("")
+    if match == GeneMatch.ALL:
+        having = SQL("HAVING COUNT(DISTINCT gene.ode_ref_id) = %(gene_count)s")
+        params["gene_count"] = len(set(reference_ids))
+
+    filters = [SQL("geneset.gs_status = 'normal'")]
+    filters, params = restrict_tier(filters, params, curation_tier)
+    filters, params = is_readable(filters, params, is_readable_by)
+
+    query = SQL(
+        """
+        WITH matches AS (
+            SELECT gsv.gs_id, COUNT(DISTINCT gene.ode_ref_id) AS matched_genes
+            FROM geneset_value gsv JOIN gene ON gene.ode_gene_id = gsv.ode_gene_id
+            WHERE {match_filters}
+            GROUP BY gsv.gs_id {having}
+        )
+        SELECT geneset.gs_id AS geneset_id, geneset.gs_name AS name,
+               geneset.gs_abbreviation AS abbreviation, geneset.sp_id AS species_id,
+               geneset.cur_id AS curation_id, geneset.gs_count AS size,
+               matches.matched_genes
+        FROM matches JOIN geneset ON geneset.gs_id = matches.gs_id
+        WHERE {filters}
+        """
+    ).format(
+        match_filters=SQL(" AND ").join(match_filters),
+        having=having,
+        filters=SQL(" AND ").join(filters),
+    )
+    return query, params
+
+
+def get_genesets_by_genes(
+    cursor: Cursor,
+    reference_ids: List[str],
+    user: Optional[User] = None,
+    species: Optional[Species] = None,
+    match: GeneMatch = GeneMatch.ANY,
+    in_threshold: bool = True,
+    curation_tier: Optional[Set[GenesetTier]] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    count_mode: Optional[CountMode] = None,
+    count_only: bool = False,
+) -> dict:
+    """Get the visible genesets containing any or all of a list of genes.
+
+    :param cursor: The database cursor.
+    :param reference_ids: The gene reference ids.
+    :param user: The user requesting the genesets.
+    :param species: Only match genes of this species.
+    :param match: Whether genesets must contain any or all of the genes.
+    :param in_threshold: Only match genes within the geneset's threshold.
+    :param curation_tier: Only return genesets of these curation tiers.
+    :param limit: The limit of results to return.
+    :param offset: The offset of results to return.
+    :param count_mode: Also count the total number of results, returned as `total`.
+    :param count_only: Only count the results (exactly, unless `count_mode` is set).
+    @return: dictionary with the genesets (and total).
+    """
+    if count_only and count_mode is None:
+        count_mode = CountMode.EXACT
+
+    try:
+        curation_tier, _, is_readable_by = geneset_service.determine_geneset_access(
+            user, curation_tier
+        )
+        reference_ids = sorted(set(reference_ids))
+        query, params = gene_genesets_query(
+            reference_ids, species, match, in_threshold, curation_tier, is_readable_by
+        )
+
+        response = {"data": []}
+        if not count_only:
+            cursor.execute(
+                query + SQL("ORDER BY geneset.gs_id LIMIT %(limit)s OFFSET %(offset)s"),
+                {**params, "limit": limit, "offset": offset or 0},
+            )
+            response["data"] = cursor.fetchall()
+
+        if count_mode is not None:
+            filters = count_service.normalize_filters(**params)
+            response["total"] = count_service.count(
+                cursor,
+                query,
+                params,
+                mode=count_mode,
+                cache_key=("gene_genesets", match, in_threshold, filters),
+            )
+
+        return response
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
 def get_gene_preferred(cursor: Cursor, gene_id: int) -> dict:
     """Get preferred gene from DB.
 
@@ -1,12 +1,21 @@
 """Service functions for dealing with genesets."""
 
 from datetime import date
-from typing import Iterable, Optional, Set
+from typing import Iterable, List, Optional, Set, Tuple
 
 from fastapi.logger import logger
 from geneweaver.api.controller import message
 from geneweaver.api.core.exceptions import UnauthorizedException
+from geneweaver.api.core.value_store import ValueStore
+from geneweaver.api.schemas.apimodels import CountMode, ValueOrder
 from geneweaver.api.schemas.auth import AppRoles, User
+from geneweaver.api.services import access as access_service
+from geneweaver.api.services import compare as compare_service
+from geneweaver.api.services import count as count_service
+from geneweaver.api.services import export as export_service
+from geneweaver.api.services import publications as publication_service
+from geneweaver.api.services import species as species_service
+from geneweaver.api.services import visibility as visibility_service
 from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.score import GenesetScoreType, ScoreType
 from geneweaver.db import gene as db_gene
@@ -14,10 +23,37 @@ from geneweaver.db import geneset as db_geneset
 from geneweaver.db import geneset_value as db_geneset_value
 from geneweaver.db import ontology as db_ontology
 from geneweaver.db import threshold as db_threshold
+from geneweaver.db.query import geneset as geneset_query
+from geneweaver.db.query import threshold as threshold_query
+from geneweaver.db.query.const import PUB_FIELDS
 from psycopg import Cursor, errors
+from psycopg.sql import SQL, Composed
 
 ONTO_GSO_REF_TYPE = "GeneWeaver Primary Annotation"
 
+# Score types for which the lowest values are the most significant.
+ASCENDING_SCORE_TYPES = {ScoreType.P_VALUE, ScoreType.Q_VALUE}
+
+# The publication of a geneset, with a row (and NULL fields) for readable genesets
+# without a publication. Deleted genesets have no row, as in `geneset_query.get`.
+GENESET_PUBLICATION_QUERY = SQL(" ").join(
+    [
+        SQL("SELECT geneset.gs_id AS geneset_id,"),
+        SQL(",").join(PUB_FIELDS),
+        SQL(
+            """
+            FROM geneset
+            LEFT JOIN publication ON publication.pub_id = geneset.pub_id
+            WHERE geneset.gs_id = %(geneset_id)s AND geneset.gs_status = 'normal'
+            AND production.geneset_is_readable2(%(user_id)s, geneset.gs_id);
+            """
+        ),
+    ]
+)
+
+# Snapshots of public genesets' values, shared by every worker.
+value_store = ValueStore()
+
 
 def determine_user_id(user: Optional[User] = None) -> int:
     """Determine the user ID from the user object.
@@ -113,6 +149,7 @@ def get_visible_genesets(
     updated_before: Optional[date] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    count_mode: Optional[CountMode] = None,
 ) -> dict:
     """Get genesets from the database.
 
@@ -140,38 +177,54 @@ def get_visible_genesets(
     :param limit: Limit the number of results.
     :param offset: Offset the results.
     :param with_publication_info: Include publication info in the return.
+    :param count_mode: Also count the total number of results (exact, estimated or
+                       cached), returned as `total`.
     """
     try:
         curation_tier, owner_id, is_readable_by = determine_geneset_access(
             user, curation_tier, only_my_genesets
         )
 
+        filters = {
+            "is_readable_by": is_readable_by,
+            "owner_id": owner_id,
+            "gs_id": gs_id,
+            "curation_tier": curation_tier,
+            "species": species,
+            "name": name,
+            "abbreviation": abbreviation,
+            "publication_id": publication_id,
+            "pubmed_id": pubmed_id,
+            "gene_id_type": gene_id_type,
+            "search_text": search_text,
+            "ontology_term": ontology_term,
+            "score_type": score_type,
+            "lte_count": lte_count,
+            "gte_count": gte_count,
+            "created_after": created_after,
+            "created_before": created_before,
+            "updated_after": updated_after,
+            "updated_before": updated_before,
+        }
+
         results = db_geneset.get(
             cursor,
-            is_readable_by=is_readable_by,
-            owner_id=owner_id,
-            gs_id=gs_id,
-            curation_tier=curation_tier,
-            species=species,
-            name=name,
-            abbreviation=abbreviation,
-            publication_id=publication_id,
-            pubmed_id=pubmed_id,
-            gene_id_type=gene_id_type,
-            search_text=search_text,
             with_publication_info=with_publication_info,
-            ontology_term=ontology_term,
-            score_type=score_type,
-            lte_count=lte_count,
-            gte_count=gte_count,
-            created_after=created_after,
-            created_before=created_before,
-            updated_after=updated_after,
-            updated_before=updated_before,
             limit=limit,
             offset=offset,
+            **filters,
         )
-        return {"data": results}
+
+        if count_mode is None:
+            return {"data": results}
+
+        total = count_service.count(
+            cursor,
+            *geneset_query.get(with_publication_info=False, **filters),
+            mode=count_mode,
+            cache_key=("genesets", count_service.normalize_filters(**filters)),
+        )
+        return {"data": results, "total": total}
 
     except Exception as err:
         logger.error(err)
@@ -190,9 +243,13 @@ def get_geneset_metadata(
     @return: dictionary response (geneset).
     """
     try:
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
         results = db_geneset.get(
             cursor,
-            is_readable_by=determine_user_id(user),
+            is_readable_by=user_id,
             gs_id=geneset_id,
             with_publication_info=include_pub_info,
         )
@@ -207,6 +264,40 @@ def get_geneset_metadata(
         raise err
 
 
+def get_geneset_publication(cursor: Cursor, geneset_id: int, user: User) -> dict:
+    """Get the publication of a geneset, with the geneset readability, in one query.
+
+    @param cursor: DB cursor
+    @param geneset_id: geneset identifier
+    @param user: GW user
+    @return: dictionary response (publication).
+    """
+    try:
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+        version = publication_service.publications.version
+        cursor.execute(
+            GENESET_PUBLICATION_QUERY, {"geneset_id": geneset_id, "user_id": user_id}
+        )
+        pub = cursor.fetchone()
+
+        if pub is None:
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+        del pub["geneset_id"]
+        if pub["id"] is None:
+            return {"error": True, "message": message.RECORD_NOT_FOUND_ERROR}
+
+        publication_service.cache_publication(pub, version)
+        return {"object": pub}
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
 def get_geneset(
     cursor: Cursor, geneset_id: int, user: User, in_threshold: Optional[bool] = False
 ) -> dict:
@@ -219,9 +310,13 @@ def get_geneset(
     @return: dictionary response (geneset and genset values).
     """
     try:
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
         results = db_geneset.get(
             cursor,
-            is_readable_by=determine_user_id(user),
+            is_readable_by=user_id,
             gs_id=geneset_id,
             with_publication_info=False,
         )
@@ -241,12 +336,119 @@ def get_geneset(
         raise err
 
 
+def values_descending(
+    order_by: Optional[ValueOrder] = None,
+    top_n: Optional[int] = None,
+    score_type: Optional[int] = None,
+) -> Optional[bool]:
+    """Determine the order of geneset values.
+
+    Without an explicit order, the top values are the most significant for the
+    geneset's score type (lowest first for p-values and q-values).
+
+    :param order_by: requested order
+    :param top_n: requested number of top values
+    :param score_type: the geneset's score type (threshold type) identifier
+    :return: True for descending, False for ascending, None if unordered.
+    """
+    if order_by is not None:
+        return order_by == ValueOrder.VALUE_DESC
+    if top_n is None:
+        return None
+    return score_type is None or ScoreType(score_type) not in ASCENDING_SCORE_TYPES
+
+
+def geneset_values_query(
+    geneset_id: int,
+    in_threshold: Optional[bool] = False,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    top_n: Optional[int] = None,
+    descending: Optional[bool] = None,
+) -> Tuple[Composed, dict]:
+    """Build a query for the (as uploaded) values of a geneset, filtered by value.
+
+    Returns the same rows as `db_geneset_value.by_geneset_id` without an identifier,
+    but the value range, ordering and limit are applied by the database.
+
+    :param geneset_id: geneset identifier
+    :param in_threshold: geneset’s threshold filter
+    :param min_value: only values greater than or equal to this
+    :param max_value: only values less than or equal to this
+    :param top_n: only the first values, in the requested order
+    :param descending: order by value, descending if True, ascending if False
+    :return: the query and its parameters.
+    """
+    filters = [SQL("gs_id = %(geneset_id)s")]
+    params = {"geneset_id": geneset_id, "top_n": top_n}
+    if in_threshold:
+        filters.append(SQL("gv.gsv_in_threshold"))
+    if min_value is not None:
+        filters.append(SQL("gv.gsv_value >= %(min_value)s"))
+        params["min_value"] = min_value
+    if max_value is not None:
+        filters.append(SQL("gv.gsv_value <= %(max_value)s"))
+        params["max_value"] = max_value
+
+    order = SQL("")
+    if descending is not None:
+        order = SQL("ORDER BY gsv.gsv_value {direction}, gsv.ode_gene_id").format(
+            direction=SQL("DESC") if descending else SQL("ASC")
+        )
+
+    query = SQL(
+        """
+        SELECT gsv.* FROM (
+            SELECT DISTINCT ON (gv.ode_gene_id) gv.*, g.ode_ref_id
+            FROM        extsrc.geneset_value gv
+            INNER JOIN  extsrc.gene g
+            USING       (ode_gene_id)
+            WHERE       {filters}
+        ) AS gsv
+        {order}
+        LIMIT %(top_n)s
+        """
+    ).format(filters=SQL(" AND ").join(filters), order=order)
+    return query, params
+
+
+def filter_geneset_values(
+    geneset_values: Iterable[dict],
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    top_n: Optional[int] = None,
+    descending: Optional[bool] = None,
+) -> List[dict]:
+    """Filter geneset values by value in memory, like `geneset_values_query`.
+
+    :param geneset_values: geneset values
+    :param min_value: only values greater than or equal to this
+    :param max_value: only values less than or equal to this
+    :param top_n: only the first values, in the requested order
+    :param descending: order by value, descending if True, ascending if False
+    :return: the filtered geneset values.
+    """
+    geneset_values = [
+        gsv
+        for gsv in geneset_values
+        if (min_value is None or gsv["gsv_value"] >= min_value)
+        and (max_value is None or gsv["gsv_value"] <= max_value)
+    ]
+    if descending is not None:
+        geneset_values.sort(key=lambda gsv: gsv["gsv_value"], reverse=descending)
+    return geneset_values[:top_n]
+
+
 def get_geneset_gene_values(
     cursor: Cursor,
     geneset_id: int,
     user: User,
     gene_id_type: GeneIdentifier = None,
     in_threshold: Optional[bool] = False,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    top_n: Optional[int] = None,
+    order_by: Optional[ValueOrder] = None,
 ) -> dict:
     """Get a gene values for a given geneset ID.
 
@@ -255,20 +457,38 @@ def get_geneset_gene_values(
     :param user: GW user
     :param gene_id_type: gene identifier type object
     :param in_threshold: geneset’s threshold filter
+    :param min_value: only values greater than or equal to this
+    :param max_value: only values less than or equal to this
+    :param top_n: only the top values (most significant unless `order_by` is set)
+    :param order_by: order the values
     :return: dictionary response (geneset and genset values).
     """
     try:
         ## Check genset exists and user can read it
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
         results = db_geneset.get(
             cursor,
             gs_id=geneset_id,
-            is_readable_by=determine_user_id(user),
+            is_readable_by=user_id,
             with_publication_info=False,
         )
 
         if len(results) <= 0:
             return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
+        value_filters = {
+            "min_value": min_value,
+            "max_value": max_value,
+            "top_n": top_n,
+            "descending": values_descending(
+                order_by, top_n, results[0].get("score_type")
+            ),
+        }
+        filter_values = any(v is not None for v in value_filters.values())
+
         # If gene id type is given, check gene species homology to
         # construct proper gene species mapping
         if gene_id_type is not None:
@@ -279,6 +499,26 @@ def get_geneset_gene_values(
                 gene_id_type=gene_id_type,
                 in_threshold=in_threshold,
             )
+            if filter_values and geneset_values:
+                geneset_values = filter_geneset_values(geneset_values, **value_filters)
+        elif value_store.enabled and results[0]["curation_id"] != int(
+            GenesetTier.TIER5
+        ):
+            # Private genesets are never written to the shared store.
+            stored = value_store.get_or_load(
+                geneset_id,
+                results[0]["updated"],
+                lambda: db_geneset_value.by_geneset_id(cursor, geneset_id),
+            )
+            genes_data = stored.gene_values(
+                stored.select(in_threshold, **value_filters)
+            )
+            return {"data": genes_data or None}
+        elif filter_values:
+            cursor.execute(
+                *geneset_values_query(geneset_id, in_threshold, **value_filters)
+            )
+            geneset_values = cursor.fetchall()
         else:
             geneset_values = db_geneset_value.by_geneset_id(
                 cursor, geneset_id, gsv_in_threshold=in_threshold
@@ -316,9 +556,13 @@ def get_geneset_w_gene_id_type(
     @return: Dictionary response (geneset identifier, geneset, and genset values).
     """
     try:
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
         results = db_geneset.get(
             cursor,
-            is_readable_by=determine_user_id(user),
+            is_readable_by=user_id,
             gs_id=geneset_id,
             with_publication_info=False,
         )
@@ -360,7 +604,10 @@ def get_gsv_w_gene_homology_update(
     """
     mapping_across_species = False
     original_gene_id_type = gene_id_type
-    genedb_sp_id = db_gene.gene_database_by_id(cursor, gene_id_type)[0]["sp_id"]
+    genedb = species_service.reference.gene_database(gene_id_type)
+    if genedb is None:
+        genedb = db_gene.gene_database_by_id(cursor, gene_id_type)[0]
+    genedb_sp_id = genedb["sp_id"]
 
     if genedb_sp_id != 0 and geneset["species_id"] != genedb_sp_id:
         mapping_across_species = True
@@ -408,27 +655,74 @@ def map_geneset_homology(
         raise err
 
 
+def set_geneset_value_threshold(
+    cursor: Cursor, geneset_id: int, geneset_score: GenesetScoreType
+) -> int:
+    """Persist the in-threshold flags of a geneset's values for a new threshold.
+
+    A single bulk UPDATE, which only rewrites the values whose flag changes.
+
+    :param cursor: DB cursor
+    :param geneset_id: geneset identifier
+    :param geneset_score: the new score type and threshold
+    :return: the number of values whose flag changed.
+    """
+    params = {"geneset_id": geneset_id, "threshold_high": geneset_score.threshold}
+    if geneset_score.threshold_low is not None:
+        in_threshold = SQL("gsv_value BETWEEN %(threshold_low)s AND %(threshold_high)s")
+        params["threshold_low"] = geneset_score.threshold_low
+    else:
+        in_threshold = SQL("gsv_value < %(threshold_high)s")
+
+    cursor.execute(
+        SQL(
+            """
+            UPDATE geneset_value SET gsv_in_threshold = COALESCE({in_threshold}, FALSE)
+            WHERE gs_id = %(geneset_id)s
+            AND gsv_in_threshold IS DISTINCT FROM COALESCE({in_threshold}, FALSE);
+            """
+        ).format(in_threshold=in_threshold),
+        params,
+    )
+    return cursor.rowcount
+
+
 def update_geneset_threshold(
     cursor: Cursor, geneset_id: int, geneset_score: GenesetScoreType, user: User
 ) -> dict:
-    """Set geneset threshold if user is the owner."""
+    """Set geneset threshold if user is the owner.
+
+    The in-threshold flag of every value is recomputed in the same transaction, and
+    the cached data that depends on it is dropped.
+    """
     try:
         if user is None or user.id is None:
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
-        try:
-            db_threshold.set_geneset_threshold(
-                cursor=cursor,
-                user_id=user.id,
-                geneset_id=geneset_id,
-                geneset_score_type=geneset_score,
-            )
-
-        except ValueError:
+        if not db_threshold.user_can_set_threshold(cursor, user.id, geneset_id):
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
+        cursor.execute(
+            *threshold_query.set_geneset_threshold(geneset_id, geneset_score)
+        )
+        changed = set_geneset_value_threshold(cursor, geneset_id, geneset_score)
+        logger.info(
+            "Threshold of geneset %s set to %s, %s values changed.",
+            geneset_id,
+            geneset_score,
+            changed,
+        )
+
+        compare_service.invalidate(geneset_id)
+        value_store.invalidate(geneset_id)
+        export_service.invalidate(geneset_id)
+        count_service.invalidate("genesets", "gene_genesets")
+
         return {}
 
+    except ValueError:
+        return {"error": True, "message": message.ACCESS_FORBIDDEN}
+
     except Exception as err:
         logger.error(err)
         raise err
@@ -451,8 +745,12 @@ def get_geneset_ontology_terms(
     @return: dictionary response (ontology terms).
     """
     try:
+        user_id = determine_user_id(user)
+        if visibility_service.is_inaccessible(cursor, user_id, geneset_id):
+            return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
         is_gs_readable = db_geneset.is_readable(
-            cursor=cursor, user_id=determine_user_id(user), geneset_id=geneset_id
+            cursor=cursor, user_id=user_id, geneset_id=geneset_id
         )
 
         if is_gs_readable is False:
@@ -492,18 +790,13 @@ def add_geneset_ontology_term(
         if user is None or user.id is None:
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
-        is_gs_readable = db_geneset.is_readable(
-            cursor=cursor, user_id=user.id, geneset_id=geneset_id
-        )
-        if is_gs_readable is False:
+        access = access_service.get_geneset_access(cursor, user.id, geneset_id)
+        if not access.readable:
             return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
-        owner = db_geneset.user_is_owner(
-            cursor=cursor, user_id=user.id, geneset_id=geneset_id
-        )
-        curator = user.role is AppRoles.curator
+        curator = user.role is AppRoles.curator or access.curator
 
-        if not owner and not curator:
+        if not access.owner and not curator:
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
         onto_term = db_ontology.by_ontology_term(
@@ -550,18 +843,13 @@ def delete_geneset_ontology_term(
         if user is None or user.id is None:
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
-        is_gs_readable = db_geneset.is_readable(
-            cursor=cursor, user_id=user.id, geneset_id=geneset_id
-        )
-        if is_gs_readable is False:
+        access = access_service.get_geneset_access(cursor, user.id, geneset_id)
+        if not access.readable:
             return {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
-        owner = db_geneset.user_is_owner(
-            cursor=cursor, user_id=user.id, geneset_id=geneset_id
-        )
-        curator = user.role is AppRoles.curator
+        curator = user.role is AppRoles.curator or access.curator
 
-        if not owner and not curator:
+        if not access.owner and not curator:
             return {"error": True, "message": message.ACCESS_FORBIDDEN}
 
         onto_term = db_ontology.by_ontology_term(
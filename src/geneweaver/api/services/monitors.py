@@ -1,8 +1,15 @@
 """Service monitors for system health."""
 
+import time
+from typing import Dict, Optional
+
 from fastapi.logger import logger
+from geneweaver.api.core import metrics
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.schemas.apimodels import HealthStatus
 from geneweaver.db.monitor.db_health import health_check as db_health_check
 from psycopg import Cursor
+from psycopg_pool import ConnectionPool
 
 
 def check_db_health(cursor: Cursor) -> dict:
@@ -18,3 +25,149 @@ def check_db_health(cursor: Cursor) -> dict:
     except Exception as err:
         logger.error(err)
         raise err
+
+
+def get_metrics(
+    pool: Optional[ConnectionPool] = None,
+    caches: Optional[Dict[str, TTLCache]] = None,
+) -> str:
+    """Get the API metrics in the Prometheus text format.
+
+    @param pool: DB connection pool, pool metrics are omitted when not given.
+    @param caches: in-process caches, by name.
+    @return: metrics exposition (str).
+    """
+    pool_stats = pool.get_stats() if pool is not None else None
+    cache_stats = {name: cache.stats() for name, cache in (caches or {}).items()}
+    return metrics.render(pool_stats, cache_stats)
+
+
+def worst_status(*statuses: HealthStatus) -> HealthStatus:
+    """Get the most severe of a set of health statuses."""
+    order = [HealthStatus.UP, HealthStatus.DEGRADED, HealthStatus.DOWN]
+    return max(statuses, key=order.index, default=HealthStatus.UP)
+
+
+def check_db_latency(
+    pool: Optional[ConnectionPool], budget_ms: float, timeout: float
+) -> dict:
+    """Measure the round-trip latency of a trivial query.
+
+    @param pool: DB connection pool
+    @param budget_ms: latency above which the DB is reported DEGRADED.
+    @param timeout: seconds to wait for a pool connection before reporting DOWN.
+    @return: status and latency (dict).
+    """
+    if pool is None:
+        return {"status": HealthStatus.DOWN, "details": "No connection pool."}
+    try:
+        with pool.connection(timeout=timeout) as conn:
+            start = time.perf_counter()
+            conn.execute("SELECT 1;")
+            latency_ms = (time.perf_counter() - start) * 1000
+    except Exception as err:
+        logger.error(err)
+        return {"status": HealthStatus.DOWN, "details": str(err)}
+
+    status = HealthStatus.DEGRADED if latency_ms > budget_ms else HealthStatus.UP
+    return {"status": status, "latency_ms": latency_ms, "budget_ms": budget_ms}
+
+
+def check_pool(pool: Optional[ConnectionPool]) -> dict:
+    """Check the DB connection pool has connections to hand out.
+
+    @param pool: DB connection pool
+    @return: status and pool availability (dict).
+    """
+    if pool is None:
+        return {"status": HealthStatus.DOWN, "details": "No connection pool."}
+    stats = pool.get_stats()
+    available = stats.get("pool_available", 0)
+    waiting = stats.get("requests_waiting", 0)
+    return {
+        "status": (
+            HealthStatus.DEGRADED if waiting and not available else HealthStatus.UP
+        ),
+        "pool_size": stats.get("pool_size", 0),
+        "pool_max": stats.get("pool_max", 0),
+        "pool_available": available,
+        "requests_waiting": waiting,
+    }
+
+
+def check_caches(caches: Dict[str, TTLCache], max_age: float) -> dict:
+    """Check the in-process caches have been refreshed recently.
+
+    @param caches: caches, by name.
+    @param max_age: seconds after which a cache's oldest entry is reported stale.
+    @return: status and per-cache freshness (dict).
+    """
+    details = {}
+    for name, cache in caches.items():
+        age = cache.age()
+        stale = age is not None and age > max_age
+        details[name] = {
+            "status": HealthStatus.DEGRADED if stale else HealthStatus.UP,
+            "enabled": cache.enabled,
+            "size": len(cache),
+            "hit_rate": cache.stats()["hit_rate"],
+            "age": age,
+        }
+    return {
+        "status": worst_status(*(d["status"] for d in details.values())),
+        "caches": details,
+    }
+
+
+def check_jwks(
+    jwks: Optional[dict], fetched_at: Optional[float], max_age: float
+) -> dict:
+    """Check the auth provider's signing keys are loaded and recent.
+
+    @param jwks: the JSON web key set, None if it has not been fetched.
+    @param fetched_at: time (epoch seconds) the key set was fetched.
+    @param max_age: seconds after which the key set is reported stale.
+    @return: status and key set age (dict).
+    """
+    keys = len((jwks or {}).get("keys", []))
+    age = time.time() - fetched_at if fetched_at is not None else None
+    healthy = keys > 0 and age is not None and age <= max_age
+    return {
+        "status": HealthStatus.UP if healthy else HealthStatus.DEGRADED,
+        "keys": keys,
+        "age": age,
+    }
+
+
+def check_readiness(
+    pool: Optional[ConnectionPool],
+    caches: Dict[str, TTLCache],
+    jwks: Optional[dict],
+    jwks_fetched_at: Optional[float],
+    db_latency_budget_ms: float,
+    pool_timeout: float,
+    cache_max_age: float,
+    jwks_max_age: float,
+) -> dict:
+    """Check the API is ready to serve requests.
+
+    @param pool: DB connection pool
+    @param caches: in-process caches, by name.
+    @param jwks: the auth provider's JSON web key set.
+    @param jwks_fetched_at: time (epoch seconds) the key set was fetched.
+    @param db_latency_budget_ms: DB round-trip latency budget.
+    @param pool_timeout: seconds to wait for a pool connection.
+    @param cache_max_age: seconds after which a cache is reported stale.
+    @param jwks_max_age: seconds after which the key set is reported stale.
+    @return: overall and per-check status (dict).
+    """
+    checks = {
+        "database": check_db_latency(pool, db_latency_budget_ms, pool_timeout),
+        "pool": check_pool(pool),
+        "caches": check_caches(caches, cache_max_age),
+        "jwks": check_jwks(jwks, jwks_fetched_at, jwks_max_age),
+    }
+    return {
+        "status": worst_status(*(check["status"] for check in checks.values())),
+        "checks": checks,
+    }
@@ -1,15 +1,52 @@
-"""Service functions for publications."""
+"""Service functions for publications.
+
+Publications are read far more often than they are added, and a few of them are
+requested constantly, so single publications are cached by id and by PubMed id
+(`publications`). Publications are only added through `add_pubmed_record`, which
+invalidates both keys.
+"""
 
 from typing import Optional
 
 from fastapi.logger import logger
 from geneweaver.api.controller import message
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.core.lazy import LazyModule
 from geneweaver.api.schemas.auth import User
 from geneweaver.core.exc import ExternalAPIError
-from geneweaver.core.publication import pubmed
 from geneweaver.db import publication as db_publication
 from psycopg import Cursor
 
+# Only needed to add new PubMed records, and slow to import (`requests`).
+pubmed = LazyModule("geneweaver.core.publication.pubmed")
+
+# Publications by ("id", pub_id) and ("pubmed", pubmed_id), missing ones are not
+# cached.
+publications = TTLCache(max_size=4096, name="publications")
+
+
+def cache_publication(pub: dict, version: Optional[int] = None) -> None:
+    """Cache a publication under its id and PubMed id.
+
+    :param pub: publication row
+    :param version: the cache version the publication was read at.
+    """
+    publications.set(("id", pub["id"]), pub, version=version)
+    if pub.get("pubmed_id"):
+        publications.set(("pubmed", str(pub["pubmed_id"])), pub, version=version)
+
+
+def invalidate(pub_id: Optional[int] = None, pubmed_id: Optional[str] = None) -> None:
+    """Drop a cached publication.
+
+    :param pub_id: publication identifier
+    :param pubmed_id: PubMed identifier
+    """
+    if pub_id is not None:
+        publications.pop(("id", pub_id))
+    if pubmed_id is not None:
+        publications.pop(("pubmed", str(pubmed_id)))
+
 
 def get_publication(cursor: Cursor, pub_id: int) -> dict:
     """Get a publication by ID from the DB.
@@ -19,7 +56,12 @@ def get_publication(cursor: Cursor, pub_id: int) -> dict:
     @return: dictionary response (publication).
     """
     try:
-        pub = db_publication.by_id(cursor, pub_id)
+        pub = publications.get(("id", pub_id))
+        if pub is None:
+            version = publications.version
+            pub = db_publication.by_id(cursor, pub_id)
+            if pub is not None:
+                cache_publication(pub, version)
 
     except Exception as err:
         logger.error(err)
@@ -36,7 +78,12 @@ def get_publication_by_pubmed_id(cursor: Cursor, pubmed_id: str) -> dict:
     @return: dictionary response (publication).
     """
     try:
-        pub = db_publication.by_pubmed_id(cursor, pubmed_id)
+        pub = publications.get(("pubmed", str(pubmed_id)))
+        if pub is None:
+            version = publications.version
+            pub = db_publication.by_pubmed_id(cursor, pubmed_id)
+            if pub is not None:
+                cache_publication(pub, version)
         return pub
 
     except Exception as err:
@@ -69,6 +116,7 @@ def add_pubmed_record(cursor: Cursor, user: User, pubmed_id: str) -> dict:
         if results is None:
             return {"error": True, "message": message.UNEXPECTED_ERROR}
 
+        invalidate(results.get("pub_id"), pubmed_id)
         return {"pubmed_id": pubmed_id, "pub_id": results.get("pub_id")}
 
     except ExternalAPIError as err:
@@ -1,43 +1,273 @@
-"""Service functions for Species."""
+"""Service functions for Species.
 
-from typing import Optional
+The species and gene database tables change very rarely, so both are loaded into an
+immutable snapshot (`reference`) serving the species endpoints and gene database
+lookups without querying the DB. The snapshot is reloaded once it is older than its
+refresh interval, or on demand by an administrator. Its ETag is a hash of its
+contents, so every worker serving the same data agrees on it.
+
+Every worker also compares a fingerprint of both tables, computed by the DB, with
+the one of its snapshot on a short check interval, and reloads when they differ. A
+change (e.g. followed by an administrator's refresh on one worker) reaches every
+worker within that interval rather than the refresh interval.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from types import MappingProxyType
+from typing import Iterable, Mapping, NamedTuple, Optional, Tuple
 
 from fastapi.logger import logger
+from geneweaver.api.controller import message
+from geneweaver.api.schemas.auth import AppRoles, User
+from geneweaver.api.services import access as access_service
 from geneweaver.core.enum import GeneIdentifier, Species
 from geneweaver.db import species as db_species
 from psycopg import Cursor
+from psycopg.sql import SQL
+from psycopg_pool import ConnectionPool
+
+GENE_DATABASES_QUERY = SQL("SELECT * FROM odestatic.genedb ORDER BY gdb_id;")
+
+REFERENCE_FINGERPRINT_QUERY = SQL(
+    """
+    SELECT md5(
+        (SELECT COALESCE(string_agg(s::text, ',' ORDER BY s.sp_id), '')
+         FROM species s)
+        || '|' ||
+        (SELECT COALESCE(string_agg(g::text, ',' ORDER BY g.gdb_id), '')
+         FROM odestatic.genedb g)
+    ) AS fingerprint;
+    """
+)
+
+
+class ReferenceData(NamedTuple):
+    """An immutable snapshot of the species and gene database tables."""
+
+    species: Tuple[Mapping, ...]
+    gene_databases: Mapping[int, Mapping]
+    etag: str
+    loaded_at: float
+    fingerprint: Optional[str] = None
+
+
+def build_reference(
+    species_rows: Iterable[dict],
+    gene_database_rows: Iterable[dict],
+    fingerprint: Optional[str] = None,
+) -> ReferenceData:
+    """Freeze species and gene database rows into a snapshot.
+
+    :param species_rows: rows as returned by `db_species.get`
+    :param gene_database_rows: rows of `odestatic.genedb`
+    :param fingerprint: fingerprint of the tables the rows were read from
+    """
+    species = tuple(
+        MappingProxyType(dict(row))
+        for row in sorted(species_rows, key=lambda row: row["id"])
+    )
+    gene_databases = MappingProxyType(
+        {row["gdb_id"]: MappingProxyType(dict(row)) for row in gene_database_rows}
+    )
+    contents = json.dumps(
+        [
+            [dict(row) for row in species],
+            [dict(row) for row in gene_databases.values()],
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(contents.encode()).hexdigest()[:32]
+    return ReferenceData(
+        species, gene_databases, f'W/"{digest}"', time.monotonic(), fingerprint
+    )
+
+
+def fetch_fingerprint(cursor: Cursor) -> str:
+    """Get the fingerprint of the species and gene database tables.
+
+    :param cursor: DB cursor
+    """
+    cursor.execute(REFERENCE_FINGERPRINT_QUERY)
+    return cursor.fetchone()["fingerprint"]
+
+
+def load_reference(cursor: Cursor) -> ReferenceData:
+    """Load a snapshot of the species and gene database tables.
+
+    :param cursor: DB cursor
+    """
+    # Read first, so a change made while loading is picked up by the next check.
+    fingerprint = fetch_fingerprint(cursor)
+    species_rows = db_species.get(cursor)
+    cursor.execute(GENE_DATABASES_QUERY)
+    return build_reference(species_rows, cursor.fetchall(), fingerprint)
+
+
+class ReferenceCache:
+    """The current reference snapshot of this process, reloaded when stale."""
+
+    def __init__(
+        self,
+        refresh_interval: Optional[float] = None,
+        check_interval: Optional[float] = None,
+    ) -> None:
+        """Initialize the cache, empty until first loaded.
+
+        :param refresh_interval: Seconds before the snapshot is reloaded (None to
+        only reload on demand).
+        :param check_interval: Seconds between checks of the tables' fingerprint
+        (None to never check).
+        """
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+        self.data: Optional[ReferenceData] = None
+        self.checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(
+        self, refresh_interval: Optional[float], check_interval: Optional[float] = None
+    ) -> None:
+        """Reconfigure the cache, dropping the current snapshot.
+
+        :param refresh_interval: Seconds before the snapshot is reloaded (None to
+        only reload on demand).
+        :param check_interval: Seconds between checks of the tables' fingerprint
+        (None to never check).
+        """
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+        self.data = None
+
+    def stale(self) -> bool:
+        """Whether the snapshot is missing or older than the refresh interval."""
+        return self.data is None or (
+            self.refresh_interval is not None
+            and time.monotonic() - self.data.loaded_at > self.refresh_interval
+        )
+
+    def check_due(self) -> bool:
+        """Whether the tables' fingerprint should be compared with the snapshot's."""
+        return (
+            self.check_interval is not None
+            and time.monotonic() - self.checked_at > self.check_interval
+        )
+
+    def refresh(self, cursor: Cursor) -> ReferenceData:
+        """Reload the snapshot.
+
+        :param cursor: DB cursor
+        """
+        self.data = load_reference(cursor)
+        self.checked_at = time.monotonic()
+        return self.data
+
+    def get(self, pool: ConnectionPool) -> ReferenceData:
+        """Get the snapshot, reloading it from a pool connection when stale.
+
+        The snapshot is also reloaded when the tables' fingerprint no longer matches
+        it. A snapshot that fails to reload keeps being served until the next
+        interval.
+
+        :param pool: DB connection pool
+        """
+        if not self.stale() and not self.check_due():
+            return self.data
+        with self._lock:
+            if self.stale():
+                try:
+                    with pool.connection() as conn, conn.cursor() as cursor:
+                        return self.refresh(cursor)
+                except Exception as err:
+                    logger.error(err)
+                    if self.data is None:
+                        raise err
+                    self.data = self.data._replace(loaded_at=time.monotonic())
+                    return self.data
+
+            if self.check_due():
+                self.checked_at = time.monotonic()
+                try:
+                    with pool.connection() as conn, conn.cursor() as cursor:
+                        if fetch_fingerprint(cursor) != self.data.fingerprint:
+                            return self.refresh(cursor)
+                except Exception as err:
+                    logger.error(err)
+            return self.data
+
+    def gene_database(self, gene_id_type: GeneIdentifier) -> Optional[Mapping]:
+        """Get a gene database row from the snapshot, None if it is not loaded.
+
+        :param gene_id_type: gene database identifier
+        """
+        if self.data is None:
+            return None
+        return self.data.gene_databases.get(int(gene_id_type))
+
+
+reference = ReferenceCache()
 
 
 def get_species(
-    cursor: Cursor,
+    data: ReferenceData,
     taxonomy_id: Optional[int] = None,
     reference_gene_id_type: Optional[GeneIdentifier] = None,
 ) -> dict:
-    """Get species from DB.
+    """Get species from the reference snapshot.
 
-    @param cursor: DB cursor
+    @param data: reference snapshot
     @param taxonomy_id:
     @param reference_gene_id_type:
     @return: dictionary response (species).
     """
-    try:
-        response = db_species.get(cursor, taxonomy_id, reference_gene_id_type)
-        return {"data": response}
+    species = [
+        dict(row)
+        for row in data.species
+        if (not taxonomy_id or row["taxonomic_id"] == taxonomy_id)
+        and (
+            not reference_gene_id_type
+            or row["reference_gene_identifier"] == int(reference_gene_id_type)
+        )
+    ]
+    return {"data": species}
 
-    except Exception as err:
-        logger.error(err)
-        raise err
+
+def get_species_by_id(data: ReferenceData, species: Species) -> Optional[dict]:
+    """Get species from the reference snapshot.
+
+    @param data: reference snapshot
+    @param species: species id
+    @return: species, None if it does not exist.
+    """
+    return next((dict(row) for row in data.species if row["id"] == int(species)), None)
 
 
-def get_species_by_id(cursor: Cursor, species: Species) -> dict:
-    """Get species from DB.
+def refresh_reference(cursor: Cursor, user: User) -> dict:
+    """Reload the reference snapshot of this process (administrators only).
 
     @param cursor: DB cursor
-    @param species: species id
-    @return: dictionary response (species).
+    @param user: GW user
+    @return: dictionary response (snapshot ETag and sizes).
     """
     try:
-        return db_species.get_by_id(cursor, species)
+        if user is None or user.id is None:
+            return {"error": True, "message": message.ACCESS_FORBIDDEN}
+        if user.role is not AppRoles.admin and not access_service.is_admin(
+            cursor, user.id
+        ):
+            return {"error": True, "message": message.ACCESS_FORBIDDEN}
+
+        data = reference.refresh(cursor)
+        return {
+            "data": {
+                "etag": data.etag,
+                "species": len(data.species),
+                "gene_databases": len(data.gene_databases),
+            }
+        }
 
     except Exception as err:
         logger.error(err)
@@ -0,0 +1,197 @@
+"""Service functions for cached geneset visibility.
+
+Public genesets (curation tiers 1-4) are readable by everyone, so a user's
+visibility is fully described by which private (tier 5) genesets they can read.
+Two caches hold that information:
+
+- the sorted ids of every private geneset, shared by all users, and
+- per user, the sorted ids of the private genesets they can read, plus the ids of
+  the groups they belong to.
+
+Both are used to reject requests for private genesets a user cannot read without a
+round trip to the database. Geneset ids that are not known to be private (e.g.
+genesets created after the cache was loaded) always fall through to the database,
+so the cache can only ever short-circuit a 404, never grant access.
+
+The API itself never changes geneset sharing, group membership or curation tiers;
+those are written by the GeneWeaver application. Until the caches expire (at most
+`GENESET_VISIBILITY_CACHE_TTL` seconds, capped at 300), a user who was just granted
+access to a private geneset, or a geneset just made public, can still be denied.
+Write paths added to the API must call `invalidate` to close that window.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from fastapi.logger import logger
+from geneweaver.api.core.cache import TTLCache
+from psycopg import Cursor
+from psycopg.sql import SQL
+
+PRIVATE_GENESET_IDS_QUERY = SQL(
+    """
+    SELECT gs_id FROM geneset
+    WHERE cur_id = 5 AND gs_status = 'normal'
+    ORDER BY gs_id;
+    """
+)
+
+# Owners and members of the groups a geneset is shared with (`gs_groups` is a comma
+# separated list of group ids) can read it. Only curators and admins, who may read
+# more, fall back to the per geneset readability function.
+READABLE_PRIVATE_GENESET_IDS_QUERY = SQL(
+    """
+    SELECT gs_id FROM geneset
+    WHERE cur_id = 5 AND gs_status = 'normal'
+    AND (
+        usr_id = %(user_id)s
+        OR string_to_array(gs_groups, ',') && %(group_ids)s::text[]
+        OR CASE
+            WHEN EXISTS(
+                SELECT 1 FROM usr WHERE usr_id = %(user_id)s AND usr_admin > 0
+            ) THEN production.geneset_is_readable2(%(user_id)s, gs_id)
+            ELSE false
+        END
+    )
+    ORDER BY gs_id;
+    """
+)
+
+USER_GROUP_IDS_QUERY = SQL(
+    """
+    SELECT grp_id FROM usr2grp WHERE usr_id = %(user_id)s ORDER BY grp_id;
+    """
+)
+
+
+class GenesetVisibility(NamedTuple):
+    """The private genesets and groups visible to a single user."""
+
+    version: int
+    group_ids: Tuple[int, ...]
+    geneset_ids: array
+
+
+private_genesets = TTLCache(max_size=1, name="private_genesets")
+user_visibility = TTLCache(max_size=4096, name="user_visibility")
+
+
+def _contains(sorted_ids: array, value: int) -> bool:
+    """Check membership in a sorted id array."""
+    idx = bisect_left(sorted_ids, value)
+    return idx < len(sorted_ids) and sorted_ids[idx] == value
+
+
+def _fetch_ids(cursor: Cursor, query: SQL, params: dict, key: str) -> array:
+    """Run a query returning a sorted column of ids as a compact array."""
+    cursor.execute(query, params)
+    return array("q", (row[key] for row in cursor.fetchall()))
+
+
+def get_private_geneset_ids(cursor: Cursor) -> array:
+    """Get the sorted ids of every private geneset.
+
+    :param cursor: DB cursor
+    :return: sorted array of geneset ids.
+    """
+    try:
+        return private_genesets.get_or_set(
+            None,
+            lambda: _fetch_ids(cursor, PRIVATE_GENESET_IDS_QUERY, {}, "gs_id"),
+        )
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def get_user_visibility(cursor: Cursor, user_id: int) -> GenesetVisibility:
+    """Get the private genesets and groups visible to a user.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :return: the user's visibility set.
+    """
+    if not user_id:
+        return GenesetVisibility(user_visibility.version, (), array("q"))
+
+    def load() -> GenesetVisibility:
+        params = {"user_id": user_id}
+        version = user_visibility.version
+        group_ids = _fetch_ids(cursor, USER_GROUP_IDS_QUERY, params, "grp_id")
+        params["group_ids"] = [str(grp_id) for grp_id in group_ids]
+        geneset_ids = _fetch_ids(
+            cursor, READABLE_PRIVATE_GENESET_IDS_QUERY, params, "gs_id"
+        )
+        return GenesetVisibility(version, tuple(group_ids), geneset_ids)
+
+    try:
+        return user_visibility.get_or_set(user_id, load)
+
+    except Exception as err:
+        logger.error(err)
+        raise err
+
+
+def is_inaccessible(cursor: Cursor, user_id: int, geneset_id: int) -> bool:
+    """Check if a geneset is known to be unreadable by a user.
+
+    A `False` result does not mean that the geneset is readable, only that the
+    database has to be asked.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :param geneset_id: geneset identifier
+    :return: True if the geneset is private and not visible to the user.
+    """
+    if not user_visibility.enabled or not private_genesets.enabled:
+        return False
+
+    if not _contains(get_private_geneset_ids(cursor), geneset_id):
+        return False
+
+    return not _contains(get_user_visibility(cursor, user_id).geneset_ids, geneset_id)
+
+
+def filter_accessible(
+    cursor: Cursor, user_id: int, geneset_ids: Iterable[int]
+) -> List[int]:
+    """Drop the genesets known to be unreadable by a user.
+
+    :param cursor: DB cursor
+    :param user_id: GW user identifier (0 for anonymous users)
+    :param geneset_ids: geneset identifiers
+    :return: the geneset ids that may be readable, in their original order.
+    """
+    geneset_ids = list(geneset_ids)
+    if not user_visibility.enabled or not private_genesets.enabled:
+        return geneset_ids
+
+    private_ids = get_private_geneset_ids(cursor)
+    visible_ids = get_user_visibility(cursor, user_id).geneset_ids
+    return [
+        gs_id
+        for gs_id in geneset_ids
+        if not _contains(private_ids, gs_id) or _contains(visible_ids, gs_id)
+    ]
+
+
+def invalidate(user_id: Optional[int] = None, group_id: Optional[int] = None) -> None:
+    """Invalidate cached visibility after sharing or group membership changes.
+
+    With no arguments, every cached visibility set is dropped.
+
+    :param user_id: Only drop the visibility set of this user.
+    :param group_id: Only drop the visibility sets of members of this group.
+    """
+    if user_id is None and group_id is None:
+        private_genesets.invalidate()
+        user_visibility.invalidate()
+        return
+
+    if user_id is not None:
+        user_visibility.pop(user_id)
+
+    if group_id is not None:
+        user_visibility.invalidate(lambda _, vis: group_id in vis.group_ids)
@@ -0,0 +1,80 @@
+"""Tests for bulk export API."""
+
+from unittest.mock import Mock, patch
+
+from geneweaver.api.controller import message
+from geneweaver.api.schemas.apimodels import ExportFormat
+from geneweaver.core.enum import GenesetTier
+
+JOB_ID = "0123456789abcdef0123456789abcdef"
+STATUS = {"id": JOB_ID, "status": "pending", "format": "ndjson.gz", "genesets": None}
+
+
+@patch("geneweaver.api.main.app.pool", Mock(), create=True)
+@patch("geneweaver.api.services.export.create_export_job")
+def test_create_export(mock_create_export_job, client):
+    """Test bulk exports are accepted with the filters of `/genesets`."""
+    mock_create_export_job.return_value = {"data": STATUS}
+
+    response = client.post("/api/exports", json={"species": 1, "curation_tier": [1, 2]})
+    assert response.status_code == 202
+    assert response.json()["object"] == STATUS
+    export = mock_create_export_job.call_args[0][2]
+    assert export.curation_tier == {GenesetTier.TIER1, GenesetTier.TIER2}
+    assert export.format == ExportFormat.NDJSON_GZ
+
+    mock_create_export_job.return_value = {
+        "error": True,
+        "message": message.EXPORTS_UNAVAILABLE,
+    }
+    response = client.post("/api/exports", json={})
+    assert response.status_code == 503
+
+    response = client.post("/api/exports", json={"format": "csv"})
+    assert response.status_code == 422
+
+
+@patch("geneweaver.api.services.export.get_export_job")
+def test_get_export(mock_get_export_job, client):
+    """Test the status of a bulk export."""
+    mock_get_export_job.return_value = {"data": STATUS}
+
+    response = client.get(f"/api/exports/{JOB_ID}")
+    assert response.status_code == 200
+    assert response.json()["object"] == STATUS
+
+    mock_get_export_job.return_value = {
+        "error": True,
+        "message": message.RECORD_NOT_FOUND_ERROR,
+    }
+    response = client.get(f"/api/exports/{JOB_ID}")
+    assert response.status_code == 404
+
+    response = client.get("/api/exports/..%2F..%2Fetc")
+    assert response.status_code in (404, 422)
+
+
+@patch("geneweaver.api.services.export.get_export_file")
+def test_get_export_file(mock_get_export_file, client, tmp_path):
+    """Test the file of a complete bulk export is downloaded."""
+    export_file = tmp_path / f"{JOB_ID}.ndjson.gz"
+    export_file.write_bytes(b"gzipped")
+    mock_get_export_file.return_value = {
+        "file": str(export_file),
+        "format": ExportFormat.NDJSON_GZ,
+    }
+
+    response = client.get(f"/api/exports/{JOB_ID}/file")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert f"geneset_export_{JOB_ID}.ndjson.gz" in (
+        response.headers["content-disposition"]
+    )
+    assert response.content == b"gzipped"
+
+    mock_get_export_file.return_value = {
+        "error": True,
+        "message": message.EXPORT_NOT_READY,
+    }
+    response = client.get(f"/api/exports/{JOB_ID}/file")
+    assert response.status_code == 409
@@ -193,3 +193,63 @@ def test_valid_get_preferred_gene_req(mock_gene_call, client):
 
     assert response.status_code == 200
     assert response.json() == Response(gene_preferred_resp_1).model_dump()
+
+
+@patch("geneweaver.api.services.genes.get_genesets_by_genes")
+def test_get_genesets_by_genes(mock_get_genesets_by_genes, client):
+    """Test getting the genesets containing any of a list of genes."""
+    data = [{"geneset_id": 1, "matched_genes": 2}]
+    mock_get_genesets_by_genes.return_value = {"data": data}
+
+    response = client.get("/api/genes/genesets?gene=Pten&gene=Gad1&match=all")
+
+    assert response.status_code == 200
+    assert response.json()["data"] == data
+    args, kwargs = mock_get_genesets_by_genes.call_args
+    assert args[1] == ["Pten", "Gad1"]
+    assert kwargs["match"] == "all"
+    assert kwargs["limit"] == 10
+
+
+@patch("geneweaver.api.services.genes.get_genesets_by_genes")
+def test_post_genesets_by_genes_count_only(mock_get_genesets_by_genes, client):
+    """Test counting the genesets containing a list of genes."""
+    mock_get_genesets_by_genes.return_value = {"data": [], "total": 42}
+
+    response = client.post(
+        "/api/genes/genesets", json={"genes": ["Pten"], "count_only": True}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+    assert response.json()["paging"]["total_items"] == 42
+    assert mock_get_genesets_by_genes.call_args.kwargs["count_only"] is True
+
+
+@patch("geneweaver.api.services.genes.get_genesets_by_genes")
+def test_post_genesets_by_genes_paging(mock_get_genesets_by_genes, client):
+    """Test paging of counted genesets, with limit 0 and a partial last page."""
+    mock_get_genesets_by_genes.return_value = {"data": [], "total": 42}
+
+    response = client.post(
+        "/api/genes/genesets",
+        json={"genes": ["Pten"], "count": "exact", "limit": 0},
+    )
+    assert response.status_code == 200
+    assert response.json()["paging"]["total_items"] == 42
+
+    response = client.post(
+        "/api/genes/genesets",
+        json={"genes": ["Pten"], "count": "exact", "limit": 10, "offset": 40},
+    )
+    paging = response.json()["paging"]
+    assert paging["page"] == 5
+    assert paging["total_pages"] == 5
+    assert paging["links"]["next"] is None
+
+
+def test_genesets_by_genes_invalid(client):
+    """Test a gene list is required."""
+    assert client.get("/api/genes/genesets").status_code == 422
+    assert client.get("/api/genes/genesets?gene=Pten&limit=5000").status_code == 422
+    assert client.post("/api/genes/genesets", json={"genes": []}).status_code == 422
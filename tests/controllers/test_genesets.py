@@ -1,5 +1,6 @@
 """Tests for geneset API."""
 
+import gzip
 import json
 from unittest.mock import patch
 
@@ -94,6 +95,57 @@ def test_export_geneset_errors(mock_get_geneset, client):
     assert response.status_code == 500
 
 
+@patch("geneweaver.api.services.export.get_geneset_export")
+def test_export_geneset_artifact(mock_get_geneset_export, client, tmp_path):
+    """Test precompressed geneset exports are sent as they are, or decompressed."""
+    artifact = tmp_path / "1234_uploaded.json.gz"
+    artifact.write_bytes(gzip.compress(b'{"geneset": {}}'))
+    mock_get_geneset_export.return_value = {
+        "file": str(artifact),
+        "gene_identifier_type": None,
+    }
+
+    response = client.get("/api/genesets/1234/file")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"geneset": {}}
+
+    response = client.get(
+        "/api/genesets/1234/file", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == b'{"geneset": {}}'
+
+
+@patch("geneweaver.api.services.export.get_geneset_export")
+def test_export_geneset_parquet(mock_get_geneset_export, client, tmp_path):
+    """Test geneset Parquet exports."""
+    artifact = tmp_path / "1234_uploaded.parquet"
+    artifact.write_bytes(b"PAR1")
+    mock_get_geneset_export.return_value = {
+        "file": str(artifact),
+        "gene_identifier_type": None,
+    }
+
+    response = client.get("/api/genesets/1234/file?format=parquet")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert ".parquet" in response.headers["content-disposition"]
+    assert response.content == b"PAR1"
+
+    mock_get_geneset_export.return_value = {
+        "error": True,
+        "message": message.EXPORT_FORMAT_UNAVAILABLE,
+    }
+    response = client.get("/api/genesets/1234/file?format=parquet")
+    assert response.status_code == 501
+
+    response = client.get("/api/genesets/1234/file?format=csv")
+    assert response.status_code == 422
+
+
 @patch("geneweaver.api.services.geneset.get_geneset_metadata")
 def test_get_geneset_metadata(mock_get_genenset, client):
     """Test get geneset metadata."""
@@ -131,17 +183,10 @@ def test_get_geneset_metadata_w_publication(mock_get_genenset, client):
     assert response.json()["object"] == geneset_metadata_w_pub_info["geneset"]
 
 
-@patch("geneweaver.api.services.geneset.get_geneset_metadata")
-@patch("geneweaver.api.services.publications.get_publication")
-def test_publication_for_geneset(
-    mock_pub_service_call, mock_get_genenset_metadata, client
-):
+@patch("geneweaver.api.services.geneset.get_geneset_publication")
+def test_publication_for_geneset(mock_geneset_publication, client):
     """Test valid url request to get publication for a geneset."""
-    mock_get_genenset_metadata.return_value = {
-        "object": geneset_metadata_w_pub_info["geneset"]
-    }
-
-    mock_pub_service_call.return_value = publication_by_id_resp
+    mock_geneset_publication.return_value = {"object": publication_by_id_resp}
 
     response = client.get("/api/genesets/1234/publication")
 
@@ -149,32 +194,31 @@ def test_publication_for_geneset(
     assert response.json()["object"] == publication_by_id_resp
 
 
-@patch("geneweaver.api.services.geneset.get_geneset_metadata")
-@patch("geneweaver.api.services.publications.get_publication")
-def test_publication_not_found_for_geneset(
-    mock_pub_service_call, mock_get_genenset_metadata, client
-):
+@patch("geneweaver.api.services.geneset.get_geneset_publication")
+def test_publication_not_found_for_geneset(mock_geneset_publication, client):
     """Test get publication for a geneset with not found record."""
-    mock_get_genenset_metadata.return_value = geneset_metadata_w_pub_info
-    mock_pub_service_call.return_value = None
+    mock_geneset_publication.return_value = {
+        "error": True,
+        "message": message.RECORD_NOT_FOUND_ERROR,
+    }
 
     response = client.get("/api/genesets/1234/publication")
 
     assert response.status_code == 404
 
-    geneset = geneset_metadata_w_pub_info.copy()
-    geneset["publication_id"] = None
-
-    mock_get_genenset_metadata.return_value = geneset
+    mock_geneset_publication.return_value = {
+        "error": True,
+        "message": message.INACCESSIBLE_OR_FORBIDDEN,
+    }
     response = client.get("/api/genesets/1234/publication")
 
     assert response.status_code == 404
 
 
-@patch("geneweaver.api.services.geneset.get_geneset_metadata")
-def test_get_publication_errors(mock_get_geneset_metadata, client):
+@patch("geneweaver.api.services.geneset.get_geneset_publication")
+def test_get_publication_errors(mock_geneset_publication, client):
     """Test get geneset ID data response."""
-    mock_get_geneset_metadata.return_value = {
+    mock_geneset_publication.return_value = {
         "error": True,
         "message": message.ACCESS_FORBIDDEN,
     }
@@ -182,7 +226,7 @@ def test_get_publication_errors(mock_get_geneset_metadata, client):
     response = client.get("/api/genesets/1234/publication")
     assert response.status_code == 403
 
-    mock_get_geneset_metadata.return_value = {"error": True, "message": "other"}
+    mock_geneset_publication.return_value = {"error": True, "message": "other"}
 
     response = client.get("/api/genesets/1234/publication")
     assert response.status_code == 500
@@ -200,6 +244,61 @@ def test_get_visible_geneset_response(mock_get_visible_genesets, client):
     assert response.json()["data"][0] == geneset_by_id_resp.get("geneset")
 
 
+@patch("geneweaver.api.services.geneset.get_visible_genesets")
+def test_get_visible_geneset_with_count(mock_get_visible_genesets, client):
+    """Test get visible genesets with a total count."""
+    mock_get_visible_genesets.return_value = {
+        "data": [geneset_by_id_resp.get("geneset")],
+        "total": 25,
+    }
+
+    response = client.get("/api/genesets?count=estimated&limit=10")
+    assert response.status_code == 200
+    assert mock_get_visible_genesets.call_args.kwargs["count_mode"] == "estimated"
+    assert response.json()["paging"]["total_items"] == 25
+    assert response.json()["paging"]["total_pages"] == 3
+    assert response.json()["paging"]["page"] == 1
+
+    response = client.get("/api/genesets?count=unknown")
+    assert response.status_code == 422
+
+
+@patch("geneweaver.api.services.geneset.get_visible_genesets")
+def test_get_visible_geneset_count_paging(mock_get_visible_genesets, client):
+    """Test paging of counted genesets with an offset and a partial last page."""
+    mock_get_visible_genesets.return_value = {"data": [], "total": 25}
+
+    response = client.get("/api/genesets?count=exact&limit=10&offset=20")
+    paging = response.json()["paging"]
+
+    assert response.status_code == 200
+    assert paging["page"] == 3
+    assert paging["total_pages"] == 3
+    assert "offset=10" in paging["links"]["previous"]
+    assert paging["links"]["next"] is None
+    assert "offset=20" in paging["links"]["last"]
+    assert "offset" not in paging["links"]["first"]
+
+    mock_get_visible_genesets.return_value = {"data": [], "total": 5}
+    response = client.get("/api/genesets?count=exact&limit=10")
+    paging = response.json()["paging"]
+
+    assert paging["total_pages"] == 1
+    assert "offset" not in paging["links"]["last"]
+
+
+@patch("geneweaver.api.services.geneset.get_visible_genesets")
+def test_get_visible_geneset_count_limit_0(mock_get_visible_genesets, client):
+    """Test counting genesets without returning any."""
+    mock_get_visible_genesets.return_value = {"data": [], "total": 25}
+
+    response = client.get("/api/genesets?count=exact&limit=0")
+
+    assert response.status_code == 200
+    assert response.json()["paging"]["total_items"] == 25
+    assert response.json()["paging"]["total_pages"] is None
+
+
 @patch("geneweaver.api.services.geneset.get_visible_genesets")
 def test_get_visible_geneset_errors(mock_get_visible_genesets, client):
     """Test get geneset ID data response."""
@@ -227,6 +326,26 @@ def test_get_geneset_gene_values_url_response(mock_get_geneset_gene_values, clie
     assert response.json()["data"] == geneset_genes_values_resp["data"]
 
 
+@patch("geneweaver.api.services.geneset.get_geneset_gene_values")
+def test_get_geneset_gene_values_filters(mock_get_geneset_gene_values, client):
+    """Test get geneset gene values with value filters."""
+    mock_get_geneset_gene_values.return_value = geneset_genes_values_resp
+
+    response = client.get(
+        "/api/genesets/1234/values?min_value=0.1&max_value=2&top_n=10&order_by=-value"
+    )
+
+    assert response.status_code == 200
+    kwargs = mock_get_geneset_gene_values.call_args.kwargs
+    assert kwargs["min_value"] == 0.1
+    assert kwargs["max_value"] == 2
+    assert kwargs["top_n"] == 10
+    assert kwargs["order_by"] == "-value"
+
+    response = client.get("/api/genesets/1234/values?top_n=0")
+    assert response.status_code == 422
+
+
 @patch("geneweaver.api.services.geneset.get_geneset_gene_values")
 def test_get_geneset_gene_values_errors(mock_get_geneset_gene_values, client):
     """Test get geneset gene values error responses."""
@@ -498,3 +617,121 @@ def test_invalid_update_date_params(updated_before, updated_after, client):
         + updated_after
     )
     assert response.status_code == 422
+
+
+@patch("geneweaver.api.services.compare.compare_genesets")
+def test_compare_genesets(mock_compare_genesets, client):
+    """Test comparing genesets."""
+    data = {
+        "genesets": [{"geneset_id": 1, "size": 3}, {"geneset_id": 2, "size": 3}],
+        "pairs": [
+            {"geneset_ids": [1, 2], "intersection": 2, "union": 4, "jaccard": 0.5}
+        ],
+    }
+    mock_compare_genesets.return_value = {"data": data}
+
+    response = client.post("/api/genesets/compare", json={"geneset_ids": [1, 2]})
+
+    assert response.status_code == 200
+    assert response.json()["object"] == data
+    assert mock_compare_genesets.call_args.kwargs["in_threshold"] is True
+
+
+@patch("geneweaver.api.services.compare.compare_genesets")
+def test_compare_genesets_errors(mock_compare_genesets, client):
+    """Test comparing inaccessible genesets and invalid requests."""
+    mock_compare_genesets.return_value = {
+        "error": True,
+        "message": message.INACCESSIBLE_OR_FORBIDDEN,
+    }
+
+    response = client.post("/api/genesets/compare", json={"geneset_ids": [1, 2]})
+    assert response.status_code == 404
+
+    response = client.post("/api/genesets/compare", json={"geneset_ids": [1]})
+    assert response.status_code == 422
+
+
+@patch("geneweaver.api.services.compare.find_similar_genesets")
+def test_find_similar_genesets(mock_find_similar_genesets, client):
+    """Test finding similar genesets by gene list."""
+    data = {
+        "query_size": 2,
+        "genesets": [
+            {
+                "geneset_id": 1,
+                "name": "Geneset",
+                "abbreviation": "GS",
+                "size": 3,
+                "intersection": 2,
+                "jaccard": 2 / 3,
+            }
+        ],
+    }
+    mock_find_similar_genesets.return_value = {"data": data}
+
+    response = client.post(
+        "/api/genesets/similar", json={"genes": ["Pten", "Gad1"], "limit": 5}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["object"] == data
+    kwargs = mock_find_similar_genesets.call_args.kwargs
+    assert kwargs["genes"] == ["Pten", "Gad1"]
+    assert kwargs["geneset_id"] is None
+    assert kwargs["limit"] == 5
+
+
+@pytest.mark.parametrize(
+    "request_body",
+    [{}, {"genes": ["Pten"], "geneset_id": 1}, {"geneset_id": 1, "limit": 0}],
+)
+def test_find_similar_genesets_invalid(request_body, client):
+    """Test a similarity search needs exactly one of a gene list and a geneset."""
+    response = client.post("/api/genesets/similar", json=request_body)
+    assert response.status_code == 422
+
+
+@patch("geneweaver.api.services.compare.find_similar_genesets")
+def test_find_similar_genesets_errors(mock_find_similar_genesets, client):
+    """Test finding genesets similar to an inaccessible geneset."""
+    mock_find_similar_genesets.return_value = {
+        "error": True,
+        "message": message.INACCESSIBLE_OR_FORBIDDEN,
+    }
+
+    response = client.post("/api/genesets/similar", json={"geneset_id": 1})
+    assert response.status_code == 404
+
+
+@patch("geneweaver.api.services.enrichment.get_enrichment")
+def test_get_enrichment(mock_get_enrichment, client):
+    """Test a geneset enrichment request."""
+    data = {"query_size": 2, "background_size": 100, "tested": 5, "genesets": []}
+    mock_get_enrichment.return_value = {"data": data}
+
+    response = client.post(
+        "/api/genesets/enrichment",
+        json={"genes": ["Pten", "Gad1"], "species": "Mus Musculus"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["object"] == data
+    kwargs = mock_get_enrichment.call_args.kwargs
+    assert kwargs["genes"] == ["Pten", "Gad1"]
+    assert kwargs["max_q_value"] == 1.0
+
+
+@pytest.mark.parametrize(
+    "request_body",
+    [
+        {"genes": ["Pten"]},
+        {"genes": [], "species": "Mus Musculus"},
+        {"genes": ["Pten"], "species": "All"},
+        {"genes": ["Pten"], "species": "Mus Musculus", "max_q_value": 0},
+    ],
+)
+def test_get_enrichment_invalid(request_body, client):
+    """Test enrichment requests need genes and a single species."""
+    response = client.post("/api/genesets/enrichment", json=request_body)
+    assert response.status_code == 422
@@ -2,6 +2,8 @@
 
 from unittest.mock import patch
 
+from geneweaver.api.schemas.apimodels import HealthStatus
+
 from tests.data import test_monitors_data
 
 db_health_status = test_monitors_data.get("db_health_status")
@@ -23,3 +25,38 @@ def test_valid_url_req(mock_db_heath_service_call, client):
     assert response.json().get("object").get("DB_status") == db_health_status.get(
         "DB_status"
     )
+
+
+def test_metrics_req(client):
+    """Test that metrics are served in the Prometheus text format."""
+    client.get(url="/api/monitors/servers/health")
+    response = client.get(url="/api/monitors/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        "geneweaver_http_request_duration_seconds_count{"
+        'method="GET",route="/api/monitors/servers/health",status="200"}'
+    ) in response.text
+
+
+def test_liveness_req(client):
+    """Test that the liveness check does not need a DB cursor or pool."""
+    response = client.get(url="/api/monitors/servers/live")
+
+    assert response.status_code == 200
+    assert response.json().get("object").get("status") == "UP"
+
+
+@patch("geneweaver.api.services.monitors.check_readiness")
+def test_readiness_req(mock_readiness, client):
+    """Test that readiness is 200 when UP or DEGRADED, 503 when DOWN."""
+    mock_readiness.return_value = {"status": HealthStatus.DEGRADED, "checks": {}}
+    response = client.get(url="/api/monitors/servers/ready")
+    assert response.status_code == 200
+    assert response.json().get("object").get("status") == "DEGRADED"
+
+    mock_readiness.return_value = {"status": HealthStatus.DOWN, "checks": {}}
+    response = client.get(url="/api/monitors/servers/ready")
+    assert response.status_code == 503
+    assert response.json().get("detail").get("status") == "DOWN"
@@ -1,6 +1,10 @@
 """Tests for species API."""
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+
+import pytest
+from geneweaver.api.controller import message
+from geneweaver.api.services import species as species_service
 
 from tests.data import test_species_data
 
@@ -10,6 +14,22 @@ species_by_gene_id_type_flybase = test_species_data.get(
     "species_by_gene_id_type_flybase"
 )
 
+reference = species_service.build_reference(
+    [{**row, "reference_gene_identifier": None} for row in species_no_params["data"]],
+    [],
+)
+
+
+@pytest.fixture(autouse=True)
+def reference_cache(mock_settings):
+    """Serve the test species without a DB connection pool."""
+    cache = species_service.ReferenceCache()
+    cache.data = reference
+    with patch.object(species_service, "reference", cache), patch(
+        "geneweaver.api.main.app.pool", Mock(), create=True
+    ):
+        yield cache
+
 
 def _validate_species_response(response_item: dict, expected_item: dict) -> None:
     """Validate species response."""
@@ -72,3 +92,54 @@ def test_valid_url_species_by_id(mock_species_service_call, client):
     _validate_species_response(
         response.json().get("object"), species_by_gene_id_type_flybase
     )
+
+
+def test_species_cache_headers(client):
+    """Test species are served with their ETag and a max-age."""
+    response = client.get(url="/api/species")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == reference.etag
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    assert len(response.json()["data"]) == len(species_no_params["data"])
+
+
+@pytest.mark.parametrize("url", ["/api/species", "/api/species/5"])
+def test_species_not_modified(url, client):
+    """Test a matching `If-None-Match` is answered without a body."""
+    response = client.get(url=url, headers={"If-None-Match": reference.etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == reference.etag
+
+
+def test_species_modified(client):
+    """Test an outdated `If-None-Match` gets the species."""
+    response = client.get(url="/api/species/5", headers={"If-None-Match": 'W/"old"'})
+
+    assert response.status_code == 200
+    assert response.json()["object"]["id"] == 5
+
+
+@patch("geneweaver.api.services.species.refresh_reference")
+def test_refresh_species(mock_refresh, client):
+    """Test the reference refresh endpoint."""
+    mock_refresh.return_value = {
+        "data": {"etag": reference.etag, "species": 11, "gene_databases": 0}
+    }
+
+    response = client.post(url="/api/species/refresh")
+
+    assert response.status_code == 200
+    assert response.json()["object"]["etag"] == reference.etag
+
+
+@patch("geneweaver.api.services.species.refresh_reference")
+def test_refresh_species_forbidden(mock_refresh, client):
+    """Test the reference refresh endpoint is forbidden to non-admins."""
+    mock_refresh.return_value = {"error": True, "message": message.ACCESS_FORBIDDEN}
+
+    response = client.post(url="/api/species/refresh")
+
+    assert response.status_code == 403
@@ -0,0 +1,125 @@
+"""Tests for the in-process TTL cache."""
+
+from unittest.mock import Mock, patch
+
+from geneweaver.api.core.cache import TTLCache, caches
+
+
+def test_cache_disabled_by_default():
+    """Test a cache created without a ttl never stores values."""
+    cache = TTLCache()
+    cache.set("key", 1)
+
+    assert cache.enabled is False
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_cache_get_or_set():
+    """Test values are loaded once and then served from the cache."""
+    cache = TTLCache(ttl=60)
+    loader = Mock(return_value="value")
+
+    assert cache.get_or_set("key", loader) == "value"
+    assert cache.get_or_set("key", loader) == "value"
+    assert loader.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+@patch("geneweaver.api.core.cache.time")
+def test_cache_entries_expire(mock_time):
+    """Test entries are dropped once their ttl has passed."""
+    mock_time.monotonic.return_value = 100.0
+    cache = TTLCache(ttl=10)
+    cache.set("key", 1)
+
+    mock_time.monotonic.return_value = 105.0
+    assert cache.get("key") == 1
+
+    mock_time.monotonic.return_value = 111.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_cache_no_expiry():
+    """Test a ttl of None keeps entries until they are evicted."""
+    cache = TTLCache(ttl=None, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_invalidate():
+    """Test invalidating all entries, or only matching entries."""
+    cache = TTLCache(ttl=60)
+    cache.set(1, "one")
+    cache.set(2, "two")
+
+    cache.invalidate(lambda key, _: key == 1)
+    assert cache.get(1) is None
+    assert cache.get(2) == "two"
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_cache_discards_stale_values():
+    """Test a value loaded across an invalidation is not stored."""
+    cache = TTLCache(ttl=60)
+
+    def loader() -> str:
+        cache.invalidate()
+        return "stale"
+
+    assert cache.get_or_set("key", loader) == "stale"
+    assert cache.get("key") is None
+
+
+def test_cache_configure():
+    """Test reconfiguring a cache clears it."""
+    cache = TTLCache(ttl=60)
+    cache.set("key", 1)
+    cache.configure(ttl=0)
+
+    assert cache.get("key") is None
+    assert cache.enabled is False
+
+
+def test_age_of_oldest_entry():
+    """Test that the age reports the oldest stored entry."""
+    cache = TTLCache(ttl=None)
+    assert cache.age() is None
+
+    cache.set("old", 1)
+    cache._data["old"] = (cache._data["old"][0] - 30, 1)
+    cache.set("new", 2)
+
+    assert 30 <= cache.age() < 31
+
+
+def test_age_purges_expired_entries():
+    """Test that expired entries are purged rather than reported as stale."""
+    cache = TTLCache(ttl=60)
+    cache.set("expired", 1)
+    cache._data["expired"] = (cache._data["expired"][0] - 120, 1)
+
+    assert cache.age() is None
+    assert len(cache) == 0
+
+    cache.set("live", 2)
+    assert cache.age() < 1
+
+
+def test_named_caches_are_registered():
+    """Test that named caches are registered for health reporting."""
+    cache = TTLCache(name="test_named_cache")
+    assert caches["test_named_cache"] is cache
+    del caches["test_named_cache"]
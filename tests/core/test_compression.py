@@ -0,0 +1,160 @@
+"""Tests for response compression."""
+
+import asyncio
+import gzip
+import zlib
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from geneweaver.api.core import compression
+
+LARGE = {"values": [{"symbol": f"Gene{i}", "value": i / 1000} for i in range(1000)]}
+
+
+def compressed_app(minimum_size: int = 1024) -> FastAPI:
+    """Build an app with small, large, streamed and binary responses."""
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware, minimum_size=minimum_size)
+    app.get("/small")(lambda: {"id": 1})
+    app.get("/large")(lambda: LARGE)
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        chunks = (f"line {i}\n".encode() * 100 for i in range(50))
+        return StreamingResponse(chunks, media_type="text/csv")
+
+    @app.get("/image")
+    def image() -> PlainTextResponse:
+        return PlainTextResponse("x" * 4096, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded() -> PlainTextResponse:
+        body = gzip.compress(b"x" * 4096)
+        return PlainTextResponse(body, headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "gzip"),
+        ("*", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    """Test the encoding is chosen from the client's q-values."""
+    assert compression.negotiate(accept_encoding, ["gzip"]) == expected
+
+
+def test_negotiate_preference():
+    """Test ties are broken by the server's preference, q-values win otherwise."""
+    available = ["zstd", "br", "gzip"]
+    assert compression.negotiate("gzip, br, zstd", available) == "zstd"
+    assert compression.negotiate("gzip, br;q=0.8, zstd;q=0.5", available) == "gzip"
+    assert compression.negotiate("zstd;q=bad, br", available) == "br"
+
+
+def test_large_response_is_compressed():
+    """Test JSON responses over the size threshold are gzipped."""
+    client = TestClient(compressed_app())
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == LARGE
+    assert int(response.headers["content-length"]) < len(response.content)
+
+
+def test_small_response_is_not_compressed():
+    """Test responses under the size threshold are sent as they are."""
+    client = TestClient(compressed_app())
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"id": 1}
+
+
+def test_client_without_gzip():
+    """Test clients that do not accept an encoding get plain responses."""
+    client = TestClient(compressed_app())
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+
+def test_streaming_response_is_compressed():
+    """Test streamed responses are compressed as one stream, chunk by chunk."""
+    sent = []
+    app = compressed_app()
+
+    async def receive() -> dict:
+        await asyncio.Event().wait()
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(app(scope, receive, send))
+
+    start, *bodies = sent
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    assert not any(name == b"content-length" for name, _ in start["headers"])
+    assert len(bodies) > 1
+    assert bodies[-1]["more_body"] is False
+    data = zlib.decompress(b"".join(m["body"] for m in bodies), 31)
+    assert data == b"".join(f"line {i}\n".encode() * 100 for i in range(50))
+
+
+def test_incompressible_responses():
+    """Test binary and already encoded responses are not compressed again."""
+    client = TestClient(compressed_app(minimum_size=0))
+
+    response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"x" * 4096
+
+
+@patch.object(compression, "zstandard", None)
+@patch.object(compression, "brotli", None)
+def test_encoders_without_optional_packages():
+    """Test gzip is the only encoding without brotli and zstandard."""
+    assert list(compression.encoders()) == ["gzip"]
+    compressor = compression.encoders(gzip_level=1)["gzip"]()
+    data = compressor.compress(b"abc" * 100) + compressor.flush()
+    assert gzip.decompress(data) == b"abc" * 100
+
+
+@pytest.mark.parametrize(
+    ("encoding", "package"), [("br", "brotli"), ("zstd", "zstandard")]
+)
+def test_optional_encoders(encoding, package):
+    """Test the brotli and zstd encoders round-trip (`compression` extra)."""
+    module = pytest.importorskip(package)
+    compressor = compression.encoders()[encoding]()
+    data = compressor.compress(b"abc" * 100) + compressor.flush()
+
+    if encoding == "br":
+        assert module.decompress(data) == b"abc" * 100
+    else:
+        assert module.ZstdDecompressor().decompressobj().decompress(data) == (
+            b"abc" * 100
+        )
@@ -0,0 +1,46 @@
+"""Tests for the API configuration."""
+
+from geneweaver.api.core.config_class import GeneweaverAPIConfig
+
+
+def make_config(**kwargs: int) -> GeneweaverAPIConfig:
+    """Build a config without reading the environment or a `.env` file."""
+    return GeneweaverAPIConfig(
+        _env_file=None,
+        DB_HOST="localhost",
+        DB_USERNAME="postgres",
+        DB_PASSWORD="postgres",
+        DB_NAME="geneweaver",
+        **kwargs,
+    )
+
+
+def test_pool_size_without_budget():
+    """Test that pool sizes are used as configured without a budget."""
+    config = make_config(WEB_CONCURRENCY=4, DB_POOL_MAX_SIZE=8)
+    assert config.DB_POOL_MAX_SIZE == 8
+
+
+def test_pool_size_split_across_workers():
+    """Test that the connection budget is shared equally between workers."""
+    config = make_config(WEB_CONCURRENCY=4, DB_CONNECTION_BUDGET=32)
+    assert config.DB_POOL_MAX_SIZE == 8
+    assert config.DB_POOL_MIN_SIZE == 4
+
+
+def test_pool_min_size_capped_by_budget():
+    """Test that a small budget caps both pool bounds, to at least one connection."""
+    config = make_config(WEB_CONCURRENCY=4, DB_CONNECTION_BUDGET=10)
+    assert config.DB_POOL_MAX_SIZE == 2
+    assert config.DB_POOL_MIN_SIZE == 2
+
+    config = make_config(WEB_CONCURRENCY=8, DB_CONNECTION_BUDGET=4)
+    assert config.DB_POOL_MAX_SIZE == 1
+
+
+def test_visibility_cache_ttl_capped():
+    """Test that the visibility cache TTL is capped to keep stale denials short."""
+    assert make_config().GENESET_VISIBILITY_CACHE_TTL == 60
+    assert make_config(GENESET_VISIBILITY_CACHE_TTL=0).GENESET_VISIBILITY_CACHE_TTL == 0
+    config = make_config(GENESET_VISIBILITY_CACHE_TTL=3600)
+    assert config.GENESET_VISIBILITY_CACHE_TTL == 300
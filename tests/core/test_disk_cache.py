@@ -0,0 +1,57 @@
+"""Tests for the size-limited disk cache."""
+
+import os
+
+from geneweaver.api.core.disk_cache import DiskCache
+
+
+def test_disabled_by_default():
+    """Test a cache created without a directory is disabled."""
+    cache = DiskCache()
+    assert cache.enabled is False
+    cache.invalidate()
+
+
+def test_put_and_get(tmp_path):
+    """Test files are written atomically and found again."""
+    cache = DiskCache()
+    cache.configure(str(tmp_path / "cache"))
+
+    assert cache.get("a.gz") is None
+    path = cache.put("a.gz", b"contents")
+    assert cache.get("a.gz") == path
+    with open(path, "rb") as cached:
+        assert cached.read() == b"contents"
+    assert os.listdir(tmp_path / "cache") == ["a.gz"]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Test the least recently used files are removed over the size limit."""
+    cache = DiskCache(str(tmp_path), max_bytes=25)
+    for age, name in enumerate(["a", "b", "c"]):
+        cache.put(name, b"x" * 10)
+        os.utime(cache.path(name), ns=(age * 10**9, age * 10**9))
+    assert cache.get("a") is None
+
+    # "b" is used, so "c" is evicted next
+    cache.get("b")
+    cache.put("d", b"x" * 10)
+    assert sorted(os.listdir(tmp_path)) == ["b", "d"]
+
+    # a file over the limit is kept until the next write
+    cache.put("e", b"x" * 30)
+    assert sorted(os.listdir(tmp_path)) == ["e"]
+
+
+def test_invalidate(tmp_path):
+    """Test files are removed by name prefix."""
+    cache = DiskCache(str(tmp_path))
+    cache.put("1_uploaded.gz", b"1")
+    cache.put("12_uploaded.gz", b"12")
+    cache.put("2_uploaded.gz", b"2")
+
+    cache.invalidate("1_")
+    assert sorted(os.listdir(tmp_path)) == ["12_uploaded.gz", "2_uploaded.gz"]
+
+    cache.invalidate()
+    assert os.listdir(tmp_path) == []
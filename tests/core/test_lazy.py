@@ -0,0 +1,24 @@
+"""Tests for deferred module imports."""
+
+import sys
+from unittest.mock import patch
+
+from geneweaver.api.core.lazy import LazyModule
+
+
+def test_lazy_module_imports_on_attribute_access():
+    """Test that the real module is imported on first attribute access."""
+    sys.modules.pop("colorsys", None)
+    colorsys = LazyModule("colorsys")
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert "colorsys" in sys.modules
+
+
+def test_lazy_module_can_be_patched():
+    """Test that patched attributes shadow the real module and are restored."""
+    colorsys = LazyModule("colorsys")
+    with patch.object(colorsys, "rgb_to_hsv", return_value="patched"):
+        assert colorsys.rgb_to_hsv(1, 0, 0) == "patched"
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
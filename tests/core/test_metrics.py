@@ -0,0 +1,106 @@
+"""Tests for the request and DB pool metrics."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from geneweaver.api.core import metrics
+
+
+def test_histogram_render_is_cumulative():
+    """Test that histogram buckets, sum and count are rendered cumulatively."""
+    histogram = metrics.Histogram("test_seconds", "Test.", (0.1, 1.0), ("route",))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    lines = histogram.render()
+
+    assert "# TYPE test_seconds histogram" in lines
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_sum{route="/a"} 5.55' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    """Test that quotes in label values do not break the exposition format."""
+    histogram = metrics.Histogram("test_total", "Test.", (1,), ("route",))
+    histogram.observe(1, 'a"b')
+
+    assert 'test_total_count{route="a\\"b"} 1' in histogram.render()
+
+
+def test_record_query_outside_request():
+    """Test that queries outside of a request are not counted."""
+    metrics.record_query()
+    assert metrics.current_request.get() is None
+
+
+def test_render_pool_stats():
+    """Test that pool stats are rendered with connections in use derived."""
+    lines = metrics.render_pool_stats(
+        {"pool_size": 10, "pool_available": 3, "requests_waiting": 2}
+    )
+
+    assert "geneweaver_db_connections_in_use 7" in lines
+    assert "geneweaver_db_requests_waiting 2" in lines
+    assert "# TYPE geneweaver_db_requests_wait_ms_total counter" in lines
+    assert "geneweaver_db_requests_wait_ms_total 0" in lines
+
+
+def test_render_cache_stats():
+    """Test that cache hits, misses and sizes are rendered per cache."""
+    content = metrics.render(
+        None,
+        {
+            "publications": {"size": 3, "hits": 10, "misses": 2},
+            "counts": {"size": 0, "hits": 0, "misses": 1},
+        },
+    )
+
+    assert "# TYPE geneweaver_cache_hits_total counter" in content
+    assert 'geneweaver_cache_hits_total{cache="publications"} 10' in content
+    assert 'geneweaver_cache_misses_total{cache="counts"} 1' in content
+    assert 'geneweaver_cache_size{cache="publications"} 3' in content
+
+
+def test_render_without_pool():
+    """Test that pool metrics are omitted when no pool is open."""
+    content = metrics.render(None)
+    assert "geneweaver_db_pool_size" not in content
+    assert "geneweaver_http_request_duration_seconds" in content
+
+
+def test_middleware_records_route_template_and_queries():
+    """Test that the middleware labels by route template and counts queries."""
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int) -> dict:
+        metrics.record_query()
+        metrics.record_query()
+        return {"id": item_id}
+
+    client = TestClient(app)
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/missing").status_code == 404
+
+    latency = metrics.REQUEST_LATENCY.render()
+    queries = metrics.REQUEST_QUERIES.render()
+    assert any(
+        line.startswith(
+            "geneweaver_http_request_duration_seconds_count"
+            '{method="GET",route="/items/{item_id}",status="200"}'
+        )
+        for line in latency
+    )
+    assert any('route="unmatched",status="404"' in line for line in latency)
+    assert (
+        "geneweaver_http_request_db_queries_bucket"
+        '{method="GET",route="/items/{item_id}",le="2"} 1'
+    ) in queries
+    assert (
+        "geneweaver_http_request_db_queries_bucket"
+        '{method="GET",route="/items/{item_id}",le="1"} 0'
+    ) in queries
@@ -0,0 +1,61 @@
+"""Tests for the prepared statement registry."""
+
+from unittest.mock import patch
+
+import pytest
+from geneweaver.api.core import prepared
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.query import geneset as geneset_query
+
+
+def test_registry_contains_hot_statements():
+    """Test the hot query shapes are captured from the database layer."""
+    assert set(prepared.REGISTRY) >= {
+        "geneset_by_id",
+        "values_by_geneset_id",
+        "values_by_geneset_id_and_identifier",
+        "gene_mapping",
+    }
+
+
+@pytest.mark.parametrize("geneset_id", [1, 1234, 123456789])
+@pytest.mark.parametrize("user_id", [0, 42])
+def test_registered_name_ignores_parameter_values(geneset_id, user_id):
+    """Test a query shape matches regardless of its parameter values."""
+    query, _ = geneset_query.get(
+        is_readable_by=user_id, gs_id=geneset_id, with_publication_info=False
+    )
+    assert prepared.registered_name(query) == "geneset_by_id"
+
+    statements = prepared.capture_statements(
+        geneset_id=geneset_id,
+        user_id=user_id,
+        gene_id_type=GeneIdentifier.ENTREZ,
+        species=Species.HOMO_SAPIENS,
+        gene_ids=["A", "B"],
+    )
+    for name, (query, _) in statements.items():
+        assert prepared.registered_name(query) == name
+
+
+def test_registered_name_unknown_query():
+    """Test queries that are not registered are not matched."""
+    query, _ = geneset_query.get(is_readable_by=0, search_text="mouse")
+    assert prepared.registered_name(query) is None
+    assert prepared.registered_name("SELECT 1;") is None
+
+
+@patch("geneweaver.api.core.prepared.psycopg.Cursor.execute")
+def test_preparing_cursor(mock_execute):
+    """Test the cursor only forces preparation of registered statements."""
+    cursor = prepared.PreparingCursor.__new__(prepared.PreparingCursor)
+    hot_query, hot_params = prepared.capture_statements()["geneset_by_id"]
+
+    cursor.execute(hot_query, hot_params)
+    assert mock_execute.call_args.kwargs["prepare"] is True
+
+    cursor.execute("SELECT 1;")
+    assert mock_execute.call_args.kwargs["prepare"] is None
+
+    cursor.execute(hot_query, hot_params, prepare=False)
+    assert mock_execute.call_args.kwargs["prepare"] is False
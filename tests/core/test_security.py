@@ -295,3 +295,78 @@ async def test_missing_claim_email_error_claim(
             auto_error_auth=True,
             disallow_public=True,
         )
+
+
+@patch("geneweaver.api.core.security.requests")
+def test_jwks_fetched_on_first_use(mock_requests):
+    """Test that constructing Auth0 does not fetch the key set."""
+    mock_requests.get.return_value = MockGetResponse()
+    auth = Auth0(domain=test_domain, api_audience=test_audience)
+
+    mock_requests.get.assert_not_called()
+    assert auth.jwks_fetched_at is None
+
+    assert auth.jwks == {"mock_key": "mock_response"}
+    assert auth.jwks == {"mock_key": "mock_response"}
+
+    mock_requests.get.assert_called_once_with(
+        f"https://{test_domain}/.well-known/jwks.json", timeout=auth.jwks_timeout
+    )
+    assert auth.jwks_fetched_at is not None
+
+
+@patch("geneweaver.api.core.security.requests")
+def test_jwks_refreshed_when_stale(mock_requests):
+    """Test that the key set is fetched again once older than the interval."""
+    mock_requests.get.return_value = MockGetResponse()
+    auth = Auth0(
+        domain=test_domain, api_audience=test_audience, jwks_refresh_interval=60
+    )
+    auth.jwks = {"old": "keys"}
+    fetched_at = auth.jwks_fetched_at
+
+    assert auth.jwks == {"old": "keys"}
+    mock_requests.get.assert_not_called()
+
+    auth.jwks_fetched_at = fetched_at - 120
+    assert auth.jwks == {"mock_key": "mock_response"}
+    assert auth.jwks_fetched_at >= fetched_at
+
+
+@patch("geneweaver.api.core.security.requests")
+def test_jwks_kept_when_refresh_fails(mock_requests):
+    """Test that the current keys are used when a refresh fails."""
+    mock_requests.get.side_effect = Exception("ERROR")
+    auth = Auth0(
+        domain=test_domain, api_audience=test_audience, jwks_refresh_interval=60
+    )
+
+    with pytest.raises(Exception, match="ERROR"):
+        auth.jwks  # noqa: B018
+
+    auth.jwks = {"old": "keys"}
+    auth.jwks_fetched_at -= 120
+    assert auth.jwks == {"old": "keys"}
+    assert auth.jwks_stale()
+
+
+@pytest.mark.asyncio()
+@patch("geneweaver.api.core.security.run_in_threadpool")
+@patch("geneweaver.api.core.security.requests")
+async def test_get_jwks_fetches_in_threadpool(mock_requests, mock_run):
+    """Test that a missing key set is fetched off the event loop, with a timeout."""
+    mock_requests.get.return_value = MockGetResponse()
+
+    async def run(func):  # noqa: ANN001, ANN202
+        return func()
+
+    mock_run.side_effect = run
+    auth = Auth0(domain=test_domain, api_audience=test_audience, jwks_timeout=2)
+
+    assert await auth.get_jwks() == {"mock_key": "mock_response"}
+    assert await auth.get_jwks() == {"mock_key": "mock_response"}
+
+    assert mock_run.call_count == 1
+    mock_requests.get.assert_called_once_with(
+        f"https://{test_domain}/.well-known/jwks.json", timeout=2
+    )
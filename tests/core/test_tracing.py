@@ -0,0 +1,97 @@
+"""Tests for per-request DB statement tracing."""
+
+import logging
+from unittest.mock import PropertyMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from geneweaver.api.core import tracing
+from geneweaver.api.core.prepared import PreparingCursor
+
+
+def traced_app(slow_request_ms: float = None) -> FastAPI:
+    """Build an app whose endpoint records two statements in its trace."""
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware, slow_request_ms=slow_request_ms)
+
+    @app.get("/items")
+    def get_items() -> dict:
+        trace = tracing.current_trace.get()
+        trace.statements.append(tracing.TracedStatement("a.get", None, 1.5, 3))
+        trace.statements.append(tracing.TracedStatement("b.get", "gene_mapping", 2, 1))
+        return {}
+
+    return app
+
+
+def test_server_timing_header():
+    """Test that the DB time and statement count are reported."""
+    response = TestClient(traced_app()).get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith(
+        'db;dur=3.5;desc="2 queries", app;dur='
+    )
+
+
+def test_server_timing_header_disabled():
+    """Test that the header can be switched off."""
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware, server_timing_header=False)
+    app.get("/")(lambda: {})
+
+    assert "server-timing" not in TestClient(app).get("/").headers
+
+
+def test_slow_request_is_logged(caplog):
+    """Test that requests over the DB time threshold are logged with detail."""
+    with caplog.at_level(logging.WARNING):
+        TestClient(traced_app(slow_request_ms=1)).get("/items")
+
+    assert "Slow request GET /items: 3.5 ms in 2 queries" in caplog.text
+    assert "b.get [gene_mapping]" in caplog.text
+
+
+def test_fast_request_is_not_logged(caplog):
+    """Test that requests under the DB time threshold are not logged."""
+    with caplog.at_level(logging.WARNING):
+        TestClient(traced_app(slow_request_ms=100)).get("/items")
+
+    assert "Slow request" not in caplog.text
+
+
+@patch.object(tracing.TracingCursor, "rowcount", new_callable=PropertyMock)
+@patch.object(PreparingCursor, "execute")
+def test_cursor_records_statements(mock_execute, mock_rowcount):
+    """Test that the cursor records duration, rows and caller in the trace."""
+    mock_rowcount.return_value = 7
+    cursor = tracing.TracingCursor.__new__(tracing.TracingCursor)
+    trace = tracing.RequestTrace()
+    token = tracing.current_trace.set(trace)
+    try:
+        cursor.execute("SELECT 1;")
+    finally:
+        tracing.current_trace.reset(token)
+
+    mock_execute.assert_called_once_with("SELECT 1;", None, prepare=None, binary=None)
+    (statement,) = trace.statements
+    assert statement.rows == 7
+    assert statement.statement is None
+    assert statement.duration_ms >= 0
+    assert statement.caller.endswith("test_cursor_records_statements")
+
+
+@patch.object(PreparingCursor, "execute")
+def test_cursor_without_trace(mock_execute):
+    """Test that statements outside of a request are executed untraced."""
+    cursor = tracing.TracingCursor.__new__(tracing.TracingCursor)
+    cursor.execute("SELECT 1;")
+    mock_execute.assert_called_once()
+
+
+def test_format_trace():
+    """Test that a trace is formatted one statement per line."""
+    trace = tracing.RequestTrace()
+    trace.statements.append(tracing.TracedStatement("geneset.get", None, 12.25, 4))
+
+    assert tracing.format_trace(trace) == "      12.2 ms      4 rows  geneset.get"
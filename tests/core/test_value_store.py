@@ -0,0 +1,126 @@
+"""Tests for the memory-mapped geneset value store."""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+from geneweaver.api.core.value_store import GenesetValues, ValueStore, pack
+
+UPDATED = datetime(2024, 1, 2, 3, 4, 5, 6)
+NEWER = datetime(2024, 2, 1)
+
+ROWS = [
+    {"ode_gene_id": 10, "gsv_value": 0.5, "gsv_in_threshold": True, "ode_ref_id": "A"},
+    {"ode_gene_id": 11, "gsv_value": 0.1, "gsv_in_threshold": True, "ode_ref_id": "Bb"},
+    {"ode_gene_id": 12, "gsv_value": 0.9, "gsv_in_threshold": False, "ode_ref_id": "C"},
+    {"ode_gene_id": 13, "gsv_value": 0.3, "gsv_in_threshold": True, "ode_ref_id": "Dé"},
+]
+
+
+def test_pack_round_trip():
+    """Test packed values are read back unchanged."""
+    values = GenesetValues(pack(ROWS))
+
+    assert len(values) == 4
+    assert values.gene_ids.tolist() == [10, 11, 12, 13]
+    assert values.gsv_values.tolist() == [0.5, 0.1, 0.9, 0.3]
+    assert values.in_threshold.tolist() == [True, True, False, True]
+    assert [values.symbol(idx) for idx in range(4)] == ["A", "Bb", "C", "Dé"]
+    assert len(GenesetValues(pack([]))) == 0
+
+
+def test_not_a_snapshot():
+    """Test other files are rejected."""
+    with pytest.raises(ValueError, match="Not a geneset value snapshot"):
+        GenesetValues(b"\0" * 64)
+
+
+def test_select():
+    """Test the filters and ordering of the geneset values query."""
+    values = GenesetValues(pack(ROWS))
+
+    assert values.select().tolist() == [0, 1, 2, 3]
+    assert values.select(in_threshold=True).tolist() == [0, 1, 3]
+    assert values.select(min_value=0.3, max_value=0.5).tolist() == [0, 3]
+    assert values.select(descending=True, top_n=2).tolist() == [2, 0]
+    assert values.select(True, descending=False, top_n=2).tolist() == [1, 3]
+    assert values.gene_values(np.array([1, 3])) == [
+        {"symbol": "Bb", "value": 0.1},
+        {"symbol": "Dé", "value": 0.3},
+    ]
+
+
+def test_store_get_or_load(tmp_path):
+    """Test snapshots are written once and read through the mapping."""
+    store = ValueStore()
+    assert store.enabled is False
+    store.configure(str(tmp_path / "values"))
+    loader = lambda: ROWS  # noqa: E731
+
+    assert store.get(1234, UPDATED) is None
+    first = store.get_or_load(1234, UPDATED, loader)
+    assert os.path.exists(store.path(1234, UPDATED))
+    assert (
+        store.get_or_load(1234, UPDATED, lambda: pytest.fail("loaded twice")) is first
+    )
+    assert first.gsv_values.tolist() == [0.5, 0.1, 0.9, 0.3]
+    assert os.listdir(tmp_path / "values") == ["1234_20240102030405000006.gsv"]
+
+
+def test_store_keyed_by_update_time(tmp_path):
+    """Test an updated geneset is read from a new snapshot."""
+    store = ValueStore(str(tmp_path))
+    store.put(1, UPDATED, ROWS)
+
+    assert store.get(1, NEWER) is None
+    assert len(store.get_or_load(1, NEWER, lambda: ROWS[:1])) == 1
+    assert len(store.get(1, UPDATED)) == 4
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    """Test snapshots are evicted, least recently used first, over the size limit."""
+    size = len(pack(ROWS))
+    store = ValueStore(str(tmp_path), max_bytes=2 * size)
+    other = ValueStore(str(tmp_path), max_bytes=2 * size)
+    store.put(1, UPDATED, ROWS)
+    store.put(2, UPDATED, ROWS)
+    assert other.get(1, UPDATED) is not None
+    past = datetime(2020, 1, 1).timestamp()
+    os.utime(store.path(2, UPDATED), (past, past))
+
+    store.put(3, UPDATED, ROWS)
+
+    assert sorted(os.listdir(tmp_path)) == [
+        store.name(1, UPDATED),
+        store.name(3, UPDATED),
+    ]
+    assert other.get(2, UPDATED) is None
+    assert other.get(1, UPDATED) is not None
+
+
+def test_store_invalidate(tmp_path):
+    """Test removed or replaced snapshots are noticed by every store."""
+    store = ValueStore(str(tmp_path))
+    other = ValueStore(str(tmp_path))
+    store.put(1, UPDATED, ROWS)
+    store.put(1, NEWER, ROWS)
+    store.put(2, UPDATED, ROWS)
+    assert other.get(1, UPDATED) is not None
+
+    store.invalidate(1)
+    assert other.get(1, UPDATED) is None
+    assert other.get(1, NEWER) is None
+    assert other.get(2, UPDATED) is not None
+
+    store.put(2, UPDATED, ROWS[:1])
+    assert len(other.get(2, UPDATED)) == 1
+
+    store.invalidate()
+    assert os.listdir(tmp_path) == []
+    assert other.get(2, UPDATED) is None
+
+
+def test_store_disabled_invalidate():
+    """Test invalidating a disabled store does nothing."""
+    ValueStore().invalidate(1234)
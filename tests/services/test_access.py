@@ -0,0 +1,106 @@
+"""Tests for geneset access resolution service."""
+
+from unittest.mock import Mock
+
+import pytest
+from geneweaver.api.schemas.auth import GenesetAccess
+from geneweaver.api.services import access
+from geneweaver.core.enum import AdminLevelInt
+
+
+def mock_cursor(rows):
+    """Build a mock cursor returning the given rows."""
+    cursor = Mock()
+    cursor.fetchall.return_value = rows
+    return cursor
+
+
+def test_resolve_geneset_access_flags():
+    """Test access flags are resolved for many genesets in one query."""
+    cursor = mock_cursor(
+        [
+            {"geneset_id": 1, "readable": True, "owner": True, "curator": False},
+            {"geneset_id": 2, "readable": True, "owner": False, "curator": True},
+        ]
+    )
+
+    response = access.resolve_geneset_access(cursor, 10, [1, 2, 3])
+
+    assert cursor.execute.call_count == 1
+    assert response[1] == GenesetAccess(geneset_id=1, readable=True, owner=True)
+    assert response[2] == GenesetAccess(geneset_id=2, readable=True, curator=True)
+    # genesets that do not exist have no access
+    assert response[3] == GenesetAccess(geneset_id=3)
+
+
+def test_geneset_access_is_memoized_per_cursor():
+    """Test repeated checks on the same cursor never re-query."""
+    cursor = mock_cursor(
+        [{"geneset_id": 1, "readable": True, "owner": False, "curator": False}]
+    )
+
+    first = access.get_geneset_access(cursor, 10, 1)
+    second = access.get_geneset_access(cursor, 10, 1)
+    assert first == second
+    assert cursor.execute.call_count == 1
+
+    # a different user is resolved separately
+    access.get_geneset_access(cursor, 11, 1)
+    assert cursor.execute.call_count == 2
+
+    # a new cursor (i.e. a new request) starts with an empty memo
+    other_cursor = mock_cursor([])
+    assert access.get_geneset_access(other_cursor, 10, 1).readable is False
+    assert other_cursor.execute.call_count == 1
+
+
+def test_geneset_access_only_queries_missing_ids():
+    """Test only genesets missing from the memo are queried."""
+    cursor = mock_cursor(
+        [{"geneset_id": 1, "readable": True, "owner": False, "curator": False}]
+    )
+    access.get_geneset_access(cursor, 10, 1)
+
+    cursor.fetchall.return_value = []
+    access.resolve_geneset_access(cursor, 10, [1, 2])
+
+    assert cursor.execute.call_args[0][1]["geneset_ids"] == [2]
+
+
+def test_geneset_access_db_error():
+    """Test error in access DB call."""
+    cursor = Mock()
+    cursor.execute.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        access.get_geneset_access(cursor, 10, 1)
+
+
+@pytest.mark.parametrize("admin", [True, False])
+def test_is_admin(admin):
+    """Test the administrator flag is read from the DB."""
+    cursor = Mock()
+    cursor.fetchone.return_value = {"admin": admin}
+
+    assert access.is_admin(cursor, 10) is admin
+    assert cursor.execute.call_args[0][1] == {"user_id": 10, "admin_level": 2}
+
+
+@pytest.mark.parametrize(
+    ("level", "admin"),
+    [
+        (AdminLevelInt.NORMAL_USER, False),
+        (AdminLevelInt.CURATOR, False),
+        (AdminLevelInt.ADMIN, True),
+        (AdminLevelInt.ADMIN_WITH_DEBUG, True),
+    ],
+)
+def test_is_admin_level(level, admin):
+    """Test curators are not administrators."""
+    cursor = Mock()
+    cursor.execute.side_effect = lambda query, params: setattr(
+        cursor, "fetchone", lambda: {"admin": int(level) >= params["admin_level"]}
+    )
+
+    assert access.is_admin(cursor, 10) is admin
+    assert "usr_admin >= %(admin_level)s" in repr(access.IS_ADMIN_QUERY)
@@ -0,0 +1,255 @@
+"""Tests for the geneset comparison service."""
+
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from geneweaver.api.controller import message
+from geneweaver.api.services import compare
+
+GENE_ROWS = [
+    {"gs_id": 1, "ode_gene_id": 10},
+    {"gs_id": 1, "ode_gene_id": 11},
+    {"gs_id": 1, "ode_gene_id": 12},
+    {"gs_id": 2, "ode_gene_id": 11},
+    {"gs_id": 2, "ode_gene_id": 12},
+    {"gs_id": 2, "ode_gene_id": 13},
+    {"gs_id": 2, "ode_gene_id": 13},
+]
+
+
+@pytest.fixture()
+def _cache() -> Iterator[None]:
+    """Enable the geneset genes cache for the duration of a test."""
+    compare.geneset_genes.configure(ttl=60)
+    yield
+    compare.geneset_genes.configure(ttl=0)
+
+
+@pytest.fixture()
+def cursor():
+    """Provide a mock cursor answering the comparison queries."""
+    cursor = Mock()
+
+    def execute(query, params=None) -> None:
+        if query is compare.READABLE_GENESET_IDS_QUERY:
+            cursor.fetchall.return_value = [
+                {"gs_id": gs_id} for gs_id in params["geneset_ids"] if gs_id != 4
+            ]
+        elif query is compare.SIMILAR_GENESETS_QUERY:
+            cursor.fetchall.return_value = []
+        elif query is compare.SIMILAR_CANDIDATES_QUERY:
+            cursor.fetchall.return_value = [dict(row) for row in cursor.candidates]
+        elif query is compare.GENESET_NAMES_QUERY:
+            cursor.fetchall.return_value = [
+                {"geneset_id": gs_id, "name": f"GS{gs_id}", "abbreviation": None}
+                for gs_id in params["geneset_ids"]
+            ]
+        else:
+            cursor.fetchall.return_value = [
+                row for row in GENE_ROWS if row["gs_id"] in params["geneset_ids"]
+            ]
+
+    cursor.execute.side_effect = execute
+    cursor.candidates = []
+    return cursor
+
+
+def test_compare_gene_id_arrays():
+    """Test pairwise intersection, union and Jaccard index."""
+    pairs = compare.compare_gene_id_arrays(
+        {
+            1: np.array([1, 2, 3, 4]),
+            2: np.array([3, 4, 5]),
+            3: np.array([], dtype=np.int64),
+        }
+    )
+
+    assert pairs == [
+        {"geneset_ids": [1, 2], "intersection": 2, "union": 5, "jaccard": 0.4},
+        {"geneset_ids": [1, 3], "intersection": 0, "union": 4, "jaccard": 0.0},
+        {"geneset_ids": [2, 3], "intersection": 0, "union": 3, "jaccard": 0.0},
+    ]
+    assert compare.compare_gene_id_arrays({1: np.array([], dtype=np.int64)}) == []
+
+
+def test_compare_genesets(cursor):
+    """Test comparing readable genesets, including one without genes."""
+    response = compare.compare_genesets(cursor, [2, 1, 3, 2], None)
+
+    assert response["data"]["genesets"] == [
+        {"geneset_id": 2, "size": 3},
+        {"geneset_id": 1, "size": 3},
+        {"geneset_id": 3, "size": 0},
+    ]
+    assert response["data"]["pairs"][0] == {
+        "geneset_ids": [2, 1],
+        "intersection": 2,
+        "union": 4,
+        "jaccard": 0.5,
+    }
+    assert len(response["data"]["pairs"]) == 3
+
+
+def test_compare_genesets_inaccessible(cursor):
+    """Test a single unreadable geneset fails the comparison."""
+    response = compare.compare_genesets(cursor, [1, 4], None)
+
+    assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+    assert cursor.execute.call_count == 1
+
+
+@pytest.mark.usefixtures("_cache")
+def test_gene_id_arrays_cached(cursor):
+    """Test gene ids are loaded once per geneset and threshold filter."""
+    compare.get_gene_id_arrays(cursor, [1])
+    arrays = compare.get_gene_id_arrays(cursor, [1, 2])
+
+    assert cursor.execute.call_count == 2
+    assert cursor.execute.call_args[0][1]["geneset_ids"] == [2]
+    assert arrays[1].tolist() == [10, 11, 12]
+    assert arrays[2].tolist() == [11, 12, 13]
+    assert not arrays[1].flags.writeable
+
+    compare.get_gene_id_arrays(cursor, [1], in_threshold=False)
+    assert cursor.execute.call_count == 3
+
+
+@patch("geneweaver.api.services.compare.readable_geneset_ids")
+def test_compare_genesets_error(mock_readable, cursor):
+    """Test errors are raised."""
+    mock_readable.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        compare.compare_genesets(cursor, [1, 2], None)
+
+
+def test_find_similar_genesets_by_genes(cursor):
+    """Test finding similar genesets to a gene list, sized by their gene count."""
+    cursor.fetchall.side_effect = [
+        [{"ode_gene_id": 11}, {"ode_gene_id": 12}],
+        [
+            {"geneset_id": 2, "size": 3, "intersection": 2},
+            {"geneset_id": 1, "size": 4, "intersection": 1},
+        ],
+    ]
+    cursor.execute.side_effect = None
+
+    response = compare.find_similar_genesets(
+        cursor, None, genes=["A", "B"], in_threshold=False, limit=5
+    )
+
+    assert response["data"]["query_size"] == 2
+    assert [g["jaccard"] for g in response["data"]["genesets"]] == [2 / 3, 1 / 5]
+    query, params = cursor.execute.call_args[0]
+    assert query is compare.SIMILAR_GENESETS_QUERY
+    assert params["gene_ids"] == [11, 12]
+    assert params["exclude_ids"] == []
+    assert params["user_id"] == 0
+    assert params["limit"] == 5
+    assert "g.gs_count AS size" in repr(query)
+
+
+@patch("geneweaver.api.services.compare.genes_service")
+def test_find_similar_genesets_in_threshold(mock_genes_service, cursor):
+    """Test in-threshold candidates are sized from their gene id arrays."""
+    mock_genes_service.get_gene_ids.return_value = [11, 12, 13]
+    cursor.candidates = [
+        {"gs_id": 2, "intersection": 3},
+        {"gs_id": 1, "intersection": 2},
+    ]
+
+    response = compare.find_similar_genesets(cursor, None, genes=["A"], limit=5)
+
+    assert response["data"]["genesets"] == [
+        {
+            "geneset_id": 2,
+            "name": "GS2",
+            "abbreviation": None,
+            "size": 3,
+            "intersection": 3,
+            "jaccard": 1.0,
+        },
+        {
+            "geneset_id": 1,
+            "name": "GS1",
+            "abbreviation": None,
+            "size": 3,
+            "intersection": 2,
+            "jaccard": 0.5,
+        },
+    ]
+
+
+@patch.object(compare, "SIMILAR_BATCH_SIZE", 1)
+@patch("geneweaver.api.services.compare.genes_service")
+def test_find_similar_genesets_stops_early(mock_genes_service, cursor):
+    """Test candidates that can not reach the top are never sized."""
+    mock_genes_service.get_gene_ids.return_value = [11, 12, 13]
+    cursor.candidates = [
+        {"gs_id": 2, "intersection": 3},
+        {"gs_id": 1, "intersection": 2},
+    ]
+
+    response = compare.find_similar_genesets(cursor, None, genes=["A"], limit=1)
+
+    assert [g["geneset_id"] for g in response["data"]["genesets"]] == [2]
+    sized = [
+        call[0][1]["geneset_ids"]
+        for call in cursor.execute.call_args_list
+        if call[0][0] is compare.GENESET_GENE_IDS_QUERY
+    ]
+    assert sized == [[2]]
+
+
+@patch("geneweaver.api.services.compare.genes_service")
+def test_find_similar_genesets_matches_compare(mock_genes_service, cursor):
+    """Test a similar geneset gets the same Jaccard index as a comparison."""
+    mock_genes_service.get_gene_ids.return_value = [10, 11]
+    cursor.candidates = [{"gs_id": 2, "intersection": 1}]
+
+    response = compare.find_similar_genesets(cursor, None, genes=["A", "B"])
+
+    arrays = compare.get_gene_id_arrays(cursor, [2])
+    pair = compare.compare_gene_id_arrays({1: np.array([10, 11]), 2: arrays[2]})[0]
+    assert response["data"]["genesets"][0]["jaccard"] == pair["jaccard"]
+
+
+def test_find_similar_genesets_unknown_genes(cursor):
+    """Test no genesets are searched when none of the genes are known."""
+    cursor.fetchall.side_effect = [[]]
+    cursor.execute.side_effect = None
+
+    response = compare.find_similar_genesets(cursor, None, genes=["unknown"])
+
+    assert response == {"data": {"query_size": 0, "genesets": []}}
+    assert cursor.execute.call_count == 1
+
+
+def test_find_similar_genesets_by_geneset(cursor):
+    """Test finding genesets similar to a geneset, excluding the geneset itself."""
+    response = compare.find_similar_genesets(cursor, None, geneset_id=2)
+
+    assert response["data"]["query_size"] == 3
+    query, params = cursor.execute.call_args[0]
+    assert query is compare.SIMILAR_CANDIDATES_QUERY
+    assert params["gene_ids"] == [11, 12, 13]
+    assert params["exclude_ids"] == [2]
+
+    response = compare.find_similar_genesets(cursor, None, geneset_id=4)
+    assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+
+@pytest.mark.usefixtures("_cache")
+def test_invalidate(cursor):
+    """Test dropping the cached gene ids of a single or every geneset."""
+    compare.get_gene_id_arrays(cursor, [1, 2])
+    compare.get_gene_id_arrays(cursor, [1], in_threshold=False)
+
+    compare.invalidate(1)
+    assert len(compare.geneset_genes) == 1
+    assert compare.geneset_genes.get((2, True)) is not None
+
+    compare.invalidate()
+    assert len(compare.geneset_genes) == 0
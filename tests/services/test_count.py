@@ -0,0 +1,104 @@
+"""Tests for the collection count service."""
+
+import datetime
+from unittest.mock import Mock
+
+import pytest
+from geneweaver.api.schemas.apimodels import CountMode
+from geneweaver.api.services import count
+from geneweaver.core.enum import GenesetTier, Species
+from psycopg.sql import SQL
+
+QUERY = SQL("SELECT * FROM geneset WHERE sp_id = %(sp_id)s")
+PARAMS = {"sp_id": 1}
+
+
+@pytest.fixture()
+def _cached_counts() -> None:
+    """Enable the count cache for the duration of a test."""
+    count.counts.configure(ttl=60)
+    yield
+    count.counts.configure(ttl=0)
+
+
+def test_normalize_filters():
+    """Test equivalent filter sets share a cache key."""
+    first = count.normalize_filters(
+        species=Species.MUS_MUSCULUS,
+        curation_tier={GenesetTier.TIER1, GenesetTier.TIER2},
+        created_after=datetime.date(2024, 1, 1),
+        name=None,
+    )
+    second = count.normalize_filters(
+        created_after=datetime.date(2024, 1, 1),
+        curation_tier={GenesetTier.TIER2, GenesetTier.TIER1},
+        species=Species.MUS_MUSCULUS,
+    )
+
+    assert first == second
+    hash(first)
+
+
+def test_count_not_requested():
+    """Test nothing is queried without a count mode."""
+    cursor = Mock()
+
+    assert count.count(cursor, QUERY, PARAMS) is None
+    cursor.execute.assert_not_called()
+
+
+def test_exact_count():
+    """Test exact counts wrap the collection query."""
+    cursor = Mock()
+    cursor.fetchone.return_value = {"count": 42}
+
+    assert count.count(cursor, QUERY, PARAMS, CountMode.EXACT) == 42
+    query, params = cursor.execute.call_args[0]
+    assert "COUNT(*)" in query.as_string(None)
+    assert params == PARAMS
+
+
+def test_estimated_count():
+    """Test estimated counts are read from the query plan."""
+    cursor = Mock()
+    cursor.fetchone.return_value = {"QUERY PLAN": [{"Plan": {"Plan Rows": 1234}}]}
+
+    assert count.count(cursor, QUERY, PARAMS, CountMode.ESTIMATED) == 1234
+    query, _ = cursor.execute.call_args[0]
+    assert query.as_string(None).startswith("EXPLAIN")
+
+
+@pytest.mark.usefixtures("_cached_counts")
+def test_cached_count():
+    """Test cached counts only query once per filter set."""
+    cursor = Mock()
+    cursor.fetchone.return_value = {"count": 42}
+    key = ("genesets", count.normalize_filters(species=Species.MUS_MUSCULUS))
+
+    assert count.count(cursor, QUERY, PARAMS, CountMode.CACHED, key) == 42
+    assert count.count(cursor, QUERY, PARAMS, CountMode.CACHED, key) == 42
+    assert cursor.execute.call_count == 1
+
+
+def test_count_db_error():
+    """Test error in count DB call."""
+    cursor = Mock()
+    cursor.execute.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        count.count(cursor, QUERY, PARAMS, CountMode.EXACT)
+
+
+@pytest.mark.usefixtures("_cached_counts")
+def test_invalidate():
+    """Test dropping the cached counts of some or all collections."""
+    count.counts.set(("genesets", ()), 1)
+    count.counts.set(("gene_genesets", ()), 2)
+    count.counts.set(("species_genes", 1), 3)
+
+    count.invalidate("genesets", "gene_genesets")
+    assert len(count.counts) == 1
+    assert count.counts.get(("species_genes", 1)) == 3
+
+    count.invalidate()
+    assert len(count.counts) == 0
@@ -0,0 +1,129 @@
+"""Tests for the geneset enrichment service."""
+
+import math
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from geneweaver.api.services import enrichment
+from geneweaver.core.enum import Species
+
+
+def hypergeometric_sf(overlap: int, population: int, size: int, draws: int) -> float:
+    """Compute the hypergeometric upper tail exactly."""
+    return sum(
+        math.comb(size, i) * math.comb(population - size, draws - i)
+        for i in range(overlap, min(size, draws) + 1)
+    ) / math.comb(population, draws)
+
+
+def test_log_factorials():
+    """Test the log factorial table."""
+    table = enrichment.log_factorials(10)
+    assert len(table) == 11
+    assert np.allclose(np.exp(table), [math.factorial(i) for i in range(11)])
+
+
+@pytest.mark.parametrize(("population", "draws"), [(50, 10), (2000, 150), (25000, 300)])
+def test_hypergeometric_sf(population, draws):
+    """Test the vectorized tail against an exact computation."""
+    rng = np.random.default_rng(42)
+    sizes = rng.integers(1, population // 2, 50)
+    overlaps = np.array(
+        [
+            rng.integers(max(1, draws + size - population), min(size, draws) + 1)
+            for size in sizes
+        ]
+    )
+
+    p_values = enrichment.hypergeometric_sf(overlaps, population, sizes, draws)
+
+    expected = [
+        hypergeometric_sf(int(k), population, int(size), draws)
+        for k, size in zip(overlaps, sizes)
+    ]
+    # Tails below the normal float range lose precision.
+    assert np.allclose(p_values, expected, rtol=1e-9, atol=1e-300)
+
+
+def test_benjamini_hochberg():
+    """Test the FDR adjustment, with and without unreported tests."""
+    q_values = enrichment.benjamini_hochberg([0.01, 0.04, 0.03, 0.5])
+    assert np.allclose(q_values, [0.04, 0.16 / 3, 0.16 / 3, 0.5])
+
+    q_values = enrichment.benjamini_hochberg([0.01, 0.04], tests=10)
+    assert np.allclose(q_values, [0.1, 0.2])
+
+    assert enrichment.benjamini_hochberg([0.9, 0.8], tests=2).max() <= 1.0
+
+
+@patch("geneweaver.api.services.enrichment.genes_service.get_gene_ids")
+def test_get_enrichment(mock_get_gene_ids):
+    """Test ranking the overlapping genesets by p-value."""
+    mock_get_gene_ids.return_value = list(range(10))
+    cursor = Mock()
+    # background size, number of tested genesets
+    cursor.fetchone.side_effect = [{"count": 1000}, {"count": 50}]
+    cursor.fetchall.return_value = [
+        {"geneset_id": 1, "overlap": 1, "size": 100},
+        {"geneset_id": 2, "overlap": 8, "size": 20},
+    ]
+
+    response = enrichment.get_enrichment(cursor, ["A"], Species.MUS_MUSCULUS, limit=10)
+
+    data = response["data"]
+    assert data["query_size"] == 10
+    assert data["background_size"] == 1000
+    assert data["tested"] == 50
+    assert [gs["geneset_id"] for gs in data["genesets"]] == [2, 1]
+    top = data["genesets"][0]
+    assert top["p_value"] == pytest.approx(hypergeometric_sf(8, 1000, 20, 10))
+    assert top["q_value"] == pytest.approx(top["p_value"] * 50)
+    assert top["expected"] == pytest.approx(0.2)
+    assert top["fold_enrichment"] == pytest.approx(40)
+
+    # anonymous users only test public genesets of the species
+    params = cursor.execute.call_args[0][1]
+    assert params["gene_ids"] == list(range(10))
+    assert params["is_readable_by"] == 0
+    assert params["sp_id"] == 1
+
+
+@patch("geneweaver.api.services.enrichment.genes_service.get_gene_ids")
+def test_get_enrichment_max_q_value(mock_get_gene_ids):
+    """Test genesets above the q-value cutoff are dropped."""
+    mock_get_gene_ids.return_value = list(range(10))
+    cursor = Mock()
+    cursor.fetchone.side_effect = [{"count": 50}]
+    cursor.fetchall.return_value = [
+        {"geneset_id": 1, "overlap": 1, "size": 100},
+        {"geneset_id": 2, "overlap": 8, "size": 20},
+    ]
+
+    response = enrichment.get_enrichment(
+        cursor, ["A"], Species.MUS_MUSCULUS, background_size=1000, max_q_value=0.05
+    )
+
+    assert [gs["geneset_id"] for gs in response["data"]["genesets"]] == [2]
+
+
+@patch("geneweaver.api.services.enrichment.genes_service.get_gene_ids")
+def test_get_enrichment_unknown_genes(mock_get_gene_ids):
+    """Test nothing is tested when none of the genes are known."""
+    mock_get_gene_ids.return_value = []
+    cursor = Mock()
+
+    response = enrichment.get_enrichment(cursor, ["A"], Species.MUS_MUSCULUS)
+
+    assert response["data"]["tested"] == 0
+    assert response["data"]["genesets"] == []
+    cursor.execute.assert_not_called()
+
+
+@patch("geneweaver.api.services.enrichment.genes_service.get_gene_ids")
+def test_get_enrichment_error(mock_get_gene_ids):
+    """Test errors are raised."""
+    mock_get_gene_ids.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        enrichment.get_enrichment(Mock(), ["A"], Species.MUS_MUSCULUS)
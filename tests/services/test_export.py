@@ -0,0 +1,340 @@
+"""Tests for the geneset export service."""
+
+import gzip
+import json
+import os
+import socket
+from datetime import datetime
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+from geneweaver.api.controller import message
+from geneweaver.api.schemas.apimodels import (
+    ExportFormat,
+    ExportStatus,
+    GenesetExportReq,
+    GenesetFileFormat,
+)
+from geneweaver.api.schemas.auth import User
+from geneweaver.api.services import export
+from geneweaver.core.enum import GeneIdentifier, Species
+
+mock_user = User()
+mock_user.id = 1
+
+GENESET = {"id": 1234, "curation_id": 3, "updated": datetime(2024, 1, 2, 3, 4, 5)}
+EXPORT = {"geneset": {"id": 1234}, "geneset_values": [{"ode_ref_id": "A"}]}
+
+
+@pytest.fixture()
+def _artifacts(tmp_path) -> Iterator[None]:
+    """Enable the export artifact cache for the duration of a test."""
+    export.export_artifacts.configure(str(tmp_path))
+    yield
+    export.export_artifacts.configure(None)
+
+
+def test_artifact_name():
+    """Test artifacts are named by geneset, identifier type and update time."""
+    assert export.artifact_name(GENESET, None) == (
+        "1234_uploaded_20240102030405000000.json.gz"
+    )
+    assert export.artifact_name(GENESET, GeneIdentifier.ENSEMBLE_GENE) == (
+        "1234_ENSEMBLE_GENE_20240102030405000000.json.gz"
+    )
+
+
+@patch("geneweaver.api.services.export.geneset_service")
+def test_export_without_cache(mock_geneset_service):
+    """Test the export is built every time when the cache is disabled."""
+    mock_geneset_service.get_geneset.return_value = EXPORT
+
+    response = export.get_geneset_export(None, 1234, mock_user)
+    assert response == EXPORT
+
+    export.get_geneset_export(None, 1234, mock_user, GeneIdentifier.ENSEMBLE_GENE)
+    mock_geneset_service.get_geneset_w_gene_id_type.assert_called_once()
+
+
+@pytest.mark.usefixtures("_artifacts")
+@patch("geneweaver.api.services.export.visibility_service")
+@patch("geneweaver.api.services.export.db_geneset")
+@patch("geneweaver.api.services.export.geneset_service")
+def test_export_artifact(mock_geneset_service, mock_db_geneset, mock_visibility):
+    """Test public geneset exports are built once and served from the cache."""
+    mock_visibility.is_inaccessible.return_value = False
+    mock_db_geneset.get.return_value = [GENESET]
+    mock_geneset_service.get_geneset.return_value = EXPORT
+
+    response = export.get_geneset_export(None, 1234, mock_user)
+    assert response["gene_identifier_type"] is None
+    with gzip.open(response["file"]) as artifact:
+        assert json.load(artifact) == EXPORT
+    assert b"".join(export.read_artifact(response["file"], 8)) == (
+        json.dumps(EXPORT).encode()
+    )
+
+    assert export.get_geneset_export(None, 1234, mock_user) == response
+    assert mock_geneset_service.get_geneset.call_count == 1
+
+    export.invalidate(1234)
+    export.get_geneset_export(None, 1234, mock_user)
+    assert mock_geneset_service.get_geneset.call_count == 2
+
+
+@pytest.mark.usefixtures("_artifacts")
+@patch("geneweaver.api.services.export.visibility_service")
+@patch("geneweaver.api.services.export.db_geneset")
+@patch("geneweaver.api.services.export.geneset_service")
+def test_export_artifact_private_or_forbidden(
+    mock_geneset_service, mock_db_geneset, mock_visibility
+):
+    """Test private genesets are not cached, and access is always checked."""
+    mock_visibility.is_inaccessible.return_value = False
+    mock_db_geneset.get.return_value = [{**GENESET, "curation_id": 5}]
+    mock_geneset_service.get_geneset.return_value = EXPORT
+    assert export.get_geneset_export(None, 1234, mock_user) == EXPORT
+
+    mock_db_geneset.get.return_value = []
+    response = export.get_geneset_export(None, 1234, mock_user)
+    assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+
+    mock_visibility.is_inaccessible.return_value = True
+    response = export.get_geneset_export(None, 1234, mock_user)
+    assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
+    assert mock_geneset_service.get_geneset.call_count == 1
+
+
+@pytest.fixture()
+def jobs(tmp_path) -> Iterator[Mock]:
+    """Enable bulk export jobs, run synchronously, for the duration of a test."""
+    export.start_jobs(str(tmp_path), 10 * 1024**2, 1)
+    export.job_executor.shutdown()
+    executor = Mock()
+    executor.submit.side_effect = lambda fn, *args: fn(*args)
+    export.job_executor = executor
+    yield executor
+    export.stop_jobs()
+    export.start_jobs(None, 0, 1)
+
+
+def export_connection(genesets: list, values: list) -> Mock:
+    """Build a mock pool whose connection returns genesets and their values."""
+    named, cursor = Mock(), Mock()
+    named.__enter__ = Mock(return_value=named)
+    named.__exit__ = Mock(return_value=False)
+    cursor.__enter__ = Mock(return_value=cursor)
+    cursor.__exit__ = Mock(return_value=False)
+    batches = [genesets[i : i + 2] for i in range(0, len(genesets), 2)]
+    named.fetchmany.side_effect = [*batches, []]
+    cursor.fetchall.side_effect = lambda: [
+        dict(row)
+        for row in values
+        if row["gs_id"] in cursor.execute.call_args[0][1]["geneset_ids"]
+    ]
+    conn = Mock()
+    conn.cursor.side_effect = lambda name=None: named if name else cursor
+    pool = Mock()
+    pool.connection.return_value.__enter__ = Mock(return_value=conn)
+    pool.connection.return_value.__exit__ = Mock(return_value=False)
+    return pool
+
+
+def test_iter_geneset_exports_batches():
+    """Test genesets are read in batches, with one values query per batch."""
+    pool = export_connection(
+        [{"id": 1}, {"id": 2}, {"id": 3}],
+        [
+            {"gs_id": 1, "symbol": "A", "value": 0.1, "in_threshold": True},
+            {"gs_id": 3, "symbol": "B", "value": 0.2, "in_threshold": False},
+        ],
+    )
+    conn = pool.connection.return_value.__enter__()
+
+    exports = list(export.iter_geneset_exports(conn, {"is_readable_by": 1}, True))
+
+    assert [document["geneset"]["id"] for document in exports] == [1, 2, 3]
+    assert exports[0]["geneset_values"] == [
+        {"symbol": "A", "value": 0.1, "in_threshold": True}
+    ]
+    assert exports[1]["geneset_values"] == []
+    values_cursor = conn.cursor()
+    assert values_cursor.execute.call_count == 2
+    assert values_cursor.execute.call_args[0][1]["in_threshold"] is True
+    assert "ORDER BY geneset.gs_id" in repr(conn.cursor("n").execute.call_args[0][0])
+
+
+@patch("geneweaver.api.services.export.geneset_service")
+def test_export_job(mock_geneset_service, jobs):
+    """Test a bulk export job writes a gzipped NDJSON file and its status."""
+    mock_geneset_service.determine_geneset_access.return_value = ({1}, None, 0)
+    mock_geneset_service.determine_user_id.return_value = 0
+    pool = export_connection(
+        [{"id": 1}, {"id": 2}],
+        [{"gs_id": 1, "symbol": "A", "value": 0.1, "in_threshold": True}],
+    )
+
+    response = export.create_export_job(pool, None, GenesetExportReq(species=1))
+    job_id = response["data"]["id"]
+    assert jobs.submit.call_args[0][3]["species"] == Species.MUS_MUSCULUS
+
+    status = export.get_export_job(job_id, None)["data"]
+    assert status["status"] == ExportStatus.COMPLETE
+    assert status["genesets"] == 2
+
+    response = export.get_export_file(job_id, None)
+    with gzip.open(response["file"], "rt") as export_file:
+        lines = [json.loads(line) for line in export_file]
+    assert [line["geneset"]["id"] for line in lines] == [1, 2]
+    assert lines[0]["geneset_values"][0]["symbol"] == "A"
+
+    # other users can not see the job
+    mock_geneset_service.determine_user_id.return_value = 2
+    response = export.get_export_file(job_id, mock_user)
+    assert response == {"error": True, "message": message.RECORD_NOT_FOUND_ERROR}
+
+
+@patch("geneweaver.api.services.export.geneset_service")
+def test_export_job_failed_or_pending(mock_geneset_service, jobs):
+    """Test failed and pending jobs have no file."""
+    mock_geneset_service.determine_geneset_access.return_value = ({1}, None, 0)
+    mock_geneset_service.determine_user_id.return_value = 0
+    pool = Mock()
+    pool.connection.side_effect = Exception("ERROR")
+
+    job_id = export.create_export_job(pool, None, GenesetExportReq())["data"]["id"]
+    assert export.get_export_job(job_id, None)["data"]["status"] == "failed"
+    response = export.get_export_file(job_id, None)
+    assert response == {"error": True, "message": message.EXPORT_NOT_READY}
+    assert os.listdir(export.export_jobs.directory) == []
+    assert os.listdir(export.job_status_directory) == [f"{job_id}.json"]
+
+    jobs.submit.side_effect = None
+    job_id = export.create_export_job(pool, None, GenesetExportReq())["data"]["id"]
+    assert export.get_export_job(job_id, None)["data"]["status"] == "pending"
+    assert export.get_export_job("0" * 32, None)["error"] is True
+
+
+@patch("geneweaver.api.services.export.geneset_service")
+def test_job_status_not_evicted(mock_geneset_service, jobs):
+    """Test status files are kept when export files are evicted."""
+    mock_geneset_service.determine_geneset_access.return_value = ({1}, None, 0)
+    mock_geneset_service.determine_user_id.return_value = 0
+    export.export_jobs.max_bytes = 0
+    pool = export_connection([{"id": 1}], [])
+
+    first = export.create_export_job(pool, None, GenesetExportReq())["data"]["id"]
+    pool = export_connection([{"id": 2}], [])
+    second = export.create_export_job(pool, None, GenesetExportReq())["data"]["id"]
+
+    assert export.get_export_job(first, None)["data"]["status"] == "complete"
+    assert "worker" not in export.get_export_job(first, None)["data"]
+    response = export.get_export_file(first, None)
+    assert response == {"error": True, "message": message.RECORD_NOT_FOUND_ERROR}
+    assert "file" in export.get_export_file(second, None)
+
+
+def test_orphaned_jobs_failed(tmp_path):
+    """Test jobs left pending or running by a dead worker are marked failed."""
+    export.start_jobs(str(tmp_path), 10 * 1024**2, 1)
+    alive = f"{socket.gethostname()}:{os.getppid()}"
+    statuses = {
+        "a" * 32: ("running", export.job_worker()),
+        "b" * 32: ("pending", f"{socket.gethostname()}:{2**22 + 1}"),
+        "c" * 32: ("running", alive),
+        "d" * 32: ("running", "elsewhere:1"),
+        "e" * 32: ("complete", export.job_worker()),
+    }
+    for job_id, (status, worker) in statuses.items():
+        export.write_job_status({"id": job_id, "status": status, "worker": worker})
+    export.stop_jobs()
+
+    export.start_jobs(str(tmp_path), 10 * 1024**2, 1)
+    export.stop_jobs()
+
+    assert {
+        job_id: export.read_job_status(job_id)["status"] for job_id in statuses
+    } == {
+        "a" * 32: "failed",
+        "b" * 32: "failed",
+        "c" * 32: "running",
+        "d" * 32: "running",
+        "e" * 32: "complete",
+    }
+    export.start_jobs(None, 0, 1)
+
+
+def test_export_jobs_disabled():
+    """Test exports are unavailable without a jobs directory."""
+    response = export.create_export_job(Mock(), None, GenesetExportReq())
+    assert response == {"error": True, "message": message.EXPORTS_UNAVAILABLE}
+
+
+@patch("geneweaver.api.services.export.find_spec", Mock(return_value=None))
+def test_parquet_unavailable():
+    """Test Parquet exports are refused without pyarrow."""
+    assert export.parquet_available() is False
+    response = export.get_geneset_export(
+        None, 1234, mock_user, file_format=GenesetFileFormat.PARQUET
+    )
+    assert response == {"error": True, "message": message.EXPORT_FORMAT_UNAVAILABLE}
+
+
+@patch("geneweaver.api.services.export.find_spec", Mock(return_value=None))
+@patch("geneweaver.api.services.export.geneset_service")
+def test_parquet_job_unavailable(mock_geneset_service, jobs):
+    """Test Parquet bulk exports are refused without pyarrow."""
+    response = export.create_export_job(
+        Mock(), None, GenesetExportReq(format=ExportFormat.PARQUET)
+    )
+    assert response == {"error": True, "message": message.EXPORT_FORMAT_UNAVAILABLE}
+    jobs.submit.assert_not_called()
+
+
+def test_write_parquet(tmp_path):
+    """Test each geneset is a row group, with dictionary-encoded symbols."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "export.parquet")
+    documents = [
+        {
+            "geneset": {"id": 1},
+            "geneset_values": [
+                {"symbol": "A", "value": 0.1, "in_threshold": True},
+                {"symbol": "B", "value": 0.2, "in_threshold": False},
+            ],
+        },
+        {"geneset": {"id": 2}, "geneset_values": []},
+        {
+            "geneset": {"id": 3},
+            "geneset_values": [{"symbol": "A", "value": 0.3, "in_threshold": True}],
+        },
+    ]
+
+    assert export.write_parquet(path, documents) == 3
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("geneset_id").to_pylist() == [1, 1, 3]
+    assert table.column("symbol").type.value_type == "string"
+    assert table.column("value").to_pylist() == [0.1, 0.2, 0.3]
+
+
+def test_geneset_parquet():
+    """Test a single geneset export is converted to Parquet."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = export.geneset_parquet(
+        {
+            "geneset": {"id": 1234},
+            "geneset_values": [
+                {"ode_ref_id": "A", "gsv_value": 0.5, "gsv_in_threshold": True}
+            ],
+        }
+    )
+
+    table = pq.read_table(pa.BufferReader(data))
+    assert table.to_pylist() == [
+        {"geneset_id": 1234, "symbol": "A", "value": 0.5, "in_threshold": True}
+    ]
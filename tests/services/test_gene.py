@@ -1,9 +1,11 @@
 """Tests for gene Service."""
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
+from geneweaver.api.schemas.apimodels import CountMode, GeneMatch
 from geneweaver.api.services import genes
+from geneweaver.core.enum import GenesetTier, Species
 
 from tests.data import test_gene_homolog_data, test_gene_mapping_data, test_genes_data
 
@@ -275,3 +277,89 @@ def test_get_gene_preferred_error(mock_db_gene):
 
     with pytest.raises(expected_exception=Exception):
         genes.get_gene_preferred(None, gene_id=1000)
+
+
+def test_get_gene_ids():
+    """Test resolving gene references to gene ids, with and without a species."""
+    cursor = Mock()
+    cursor.fetchall.return_value = [{"ode_gene_id": 3}, {"ode_gene_id": 7}]
+
+    assert genes.get_gene_ids(cursor, ("Pten", "Gad1"), Species.MUS_MUSCULUS) == [3, 7]
+    assert cursor.execute.call_args[0][1] == {
+        "reference_ids": ["Pten", "Gad1"],
+        "species_id": 1,
+    }
+
+    genes.get_gene_ids(cursor, ["Pten"])
+    assert cursor.execute.call_args[0][1]["species_id"] == 0
+
+
+def test_get_gene_ids_error():
+    """Test errors are raised."""
+    cursor = Mock()
+    cursor.execute.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        genes.get_gene_ids(cursor, ["Pten"])
+
+
+def test_gene_genesets_query():
+    """Test building the genesets by genes query for each match mode."""
+    query, params = genes.gene_genesets_query(["Pten", "Gad1"], is_readable_by=0)
+    assert params == {"reference_ids": ["Pten", "Gad1"], "is_readable_by": 0}
+    assert "HAVING" not in repr(query)
+    assert "gsv_in_threshold" in repr(query)
+
+    query, params = genes.gene_genesets_query(
+        ["Pten", "Gad1", "Pten"],
+        species=Species.MUS_MUSCULUS,
+        match=GeneMatch.ALL,
+        in_threshold=False,
+        curation_tier={GenesetTier.TIER1},
+    )
+    assert params["gene_count"] == 2
+    assert params["species_id"] == 1
+    assert params["curation_tier"] == [1]
+    assert "is_readable_by" not in params
+    assert "HAVING" in repr(query)
+    assert "gsv_in_threshold" not in repr(query)
+
+
+def test_get_genesets_by_genes():
+    """Test getting the genesets containing genes, with a total."""
+    cursor = Mock()
+    cursor.fetchall.return_value = [{"geneset_id": 1, "matched_genes": 2}]
+    cursor.fetchone.return_value = {"count": 1}
+
+    response = genes.get_genesets_by_genes(
+        cursor, ["Pten", "Gad1"], limit=5, offset=10, count_mode=CountMode.EXACT
+    )
+
+    assert response == {"data": [{"geneset_id": 1, "matched_genes": 2}], "total": 1}
+    params = cursor.execute.call_args_list[0][0][1]
+    assert params["limit"] == 5
+    assert params["offset"] == 10
+    # anonymous users only see public genesets
+    assert params["is_readable_by"] == 0
+    assert sorted(params["curation_tier"]) == [1, 2, 3, 4]
+
+
+def test_get_genesets_by_genes_count_only():
+    """Test only counting the genesets containing genes."""
+    cursor = Mock()
+    cursor.fetchone.return_value = {"count": 3}
+
+    response = genes.get_genesets_by_genes(cursor, ["Pten"], count_only=True)
+
+    assert response == {"data": [], "total": 3}
+    assert cursor.execute.call_count == 1
+    cursor.fetchall.assert_not_called()
+
+
+def test_get_genesets_by_genes_error():
+    """Test errors are raised."""
+    cursor = Mock()
+    cursor.execute.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        genes.get_genesets_by_genes(cursor, ["Pten"])
@@ -1,12 +1,13 @@
 """Tests for geneset Service."""
 
 import datetime
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 from geneweaver.api.controller import message
 from geneweaver.api.core.exceptions import UnauthorizedException
-from geneweaver.api.schemas.auth import AppRoles, User
+from geneweaver.api.schemas.apimodels import CountMode, ValueOrder
+from geneweaver.api.schemas.auth import AppRoles, GenesetAccess, User
 from geneweaver.api.services import geneset
 from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.score import GenesetScoreType, ScoreType
@@ -101,6 +102,27 @@ def test_get_geneset_w_gene_id_type_response(
     )
 
 
+@patch("geneweaver.api.services.geneset.species_service.reference")
+@patch("geneweaver.api.services.geneset.db_gene")
+@patch("geneweaver.api.services.geneset.db_geneset_value")
+def test_gsv_gene_database_from_reference(
+    mock_db_genset_value, mock_db_gene, mock_reference
+):
+    """Test the gene database species is read from the reference snapshot."""
+    mock_reference.gene_database.return_value = {"sp_id": 0}
+    mock_db_genset_value.by_geneset_id.return_value = geneset_w_gene_id_type_resp.get(
+        "geneset_values"
+    )
+
+    response = geneset.get_gsv_w_gene_homology_update(
+        None, {"id": 1234, "species_id": 1}, GeneIdentifier(2)
+    )
+
+    assert response == geneset_w_gene_id_type_resp["geneset_values"]
+    mock_reference.gene_database.assert_called_once_with(GeneIdentifier(2))
+    mock_db_gene.gene_database_by_id.assert_not_called()
+
+
 @patch("geneweaver.api.services.geneset.db_gene")
 @patch("geneweaver.api.services.geneset.db_geneset")
 @patch("geneweaver.api.services.geneset.db_geneset_value")
@@ -192,6 +214,58 @@ def test_get_geneset_metadata_w_pub_info(mock_db_geneset):
     assert response.get("object") == geneset_metadata_w_pub_info
 
 
+@patch("geneweaver.api.services.geneset.visibility_service.is_inaccessible")
+def test_get_geneset_publication(mock_is_inaccessible):
+    """Test the publication of a geneset is read with its readability."""
+    mock_is_inaccessible.return_value = False
+    cursor = Mock()
+    cursor.fetchone.return_value = {"geneset_id": 1234, "id": 123, "pubmed_id": "1"}
+
+    with patch.object(geneset.publication_service, "publications") as mock_cache:
+        response = geneset.get_geneset_publication(cursor, 1234, mock_user)
+
+    assert response == {"object": {"id": 123, "pubmed_id": "1"}}
+    cursor.execute.assert_called_once_with(
+        geneset.GENESET_PUBLICATION_QUERY, {"geneset_id": 1234, "user_id": 1}
+    )
+    assert mock_cache.set.call_count == 2
+
+
+@patch("geneweaver.api.services.geneset.visibility_service.is_inaccessible")
+def test_get_geneset_publication_not_found(mock_is_inaccessible):
+    """Test unreadable genesets and genesets without a publication."""
+    mock_is_inaccessible.return_value = False
+    cursor = Mock()
+
+    cursor.fetchone.return_value = None
+    response = geneset.get_geneset_publication(cursor, 1234, mock_user)
+    assert response["message"] == message.INACCESSIBLE_OR_FORBIDDEN
+
+    cursor.fetchone.return_value = {"geneset_id": 1234, "id": None}
+    response = geneset.get_geneset_publication(cursor, 1234, mock_user)
+    assert response["message"] == message.RECORD_NOT_FOUND_ERROR
+
+    mock_is_inaccessible.return_value = True
+    cursor.reset_mock()
+    response = geneset.get_geneset_publication(cursor, 1234, mock_user)
+    assert response["message"] == message.INACCESSIBLE_OR_FORBIDDEN
+    cursor.execute.assert_not_called()
+
+
+@patch("geneweaver.api.services.geneset.visibility_service.is_inaccessible")
+def test_get_geneset_publication_deleted(mock_is_inaccessible):
+    """Test the publication of a deleted geneset is not found."""
+    mock_is_inaccessible.return_value = False
+    cursor = Mock()
+    # Deleted genesets are filtered out by the query.
+    cursor.fetchone.return_value = None
+
+    response = geneset.get_geneset_publication(cursor, 1234, mock_user)
+
+    assert response["message"] == message.INACCESSIBLE_OR_FORBIDDEN
+    assert "geneset.gs_status = 'normal'" in repr(geneset.GENESET_PUBLICATION_QUERY)
+
+
 @patch("geneweaver.api.services.geneset.db_geneset")
 def test_geneset_metadata_db_call_error(mock_db_geneset):
     """Test error in get DB call."""
@@ -341,6 +415,112 @@ def test_geneset_gene_value_response(mock_db_geneset, mock_db_geneset_value):
     assert response == geneset_genes_values_resp
 
 
+@pytest.mark.parametrize(
+    ("order_by", "top_n", "score_type", "expected"),
+    [
+        (None, None, 1, None),
+        (ValueOrder.VALUE, None, 3, False),
+        (ValueOrder.VALUE_DESC, 5, 1, True),
+        (None, 5, 1, False),
+        (None, 5, 2, False),
+        (None, 5, 4, True),
+        (None, 5, None, True),
+    ],
+)
+def test_values_descending(order_by, top_n, score_type, expected):
+    """Test the default value order is the most significant first."""
+    assert geneset.values_descending(order_by, top_n, score_type) is expected
+
+
+def test_geneset_values_query():
+    """Test value filters, ordering and limit are pushed into the query."""
+    query, params = geneset.geneset_values_query(
+        1234, in_threshold=True, min_value=0.1, max_value=0.9, top_n=5, descending=True
+    )
+    assert params == {
+        "geneset_id": 1234,
+        "top_n": 5,
+        "min_value": 0.1,
+        "max_value": 0.9,
+    }
+    assert "gsv_in_threshold" in repr(query)
+    assert "DESC" in repr(query)
+
+    query, params = geneset.geneset_values_query(1234, max_value=0.9)
+    assert params == {"geneset_id": 1234, "top_n": None, "max_value": 0.9}
+    assert "ORDER BY" not in repr(query)
+
+
+def test_filter_geneset_values():
+    """Test filtering geneset values in memory."""
+    values = [{"gsv_value": v} for v in (0.5, 0.1, 0.9, 0.3)]
+
+    filtered = geneset.filter_geneset_values(
+        values, min_value=0.2, top_n=2, descending=False
+    )
+    assert filtered == [{"gsv_value": 0.3}, {"gsv_value": 0.5}]
+
+    filtered = geneset.filter_geneset_values(values, max_value=0.5)
+    assert filtered == [{"gsv_value": 0.5}, {"gsv_value": 0.1}, {"gsv_value": 0.3}]
+
+
+@patch("geneweaver.api.services.geneset.db_geneset_value")
+@patch("geneweaver.api.services.geneset.db_geneset")
+def test_geneset_gene_value_filtered(mock_db_geneset, mock_db_geneset_value):
+    """Test value filters are executed in SQL instead of fetching every value."""
+    mock_db_geneset.get.return_value = [geneset_by_id_resp.get("geneset")]
+    cursor = Mock()
+    cursor.fetchall.return_value = geneset_by_id_resp.get("geneset_values")
+
+    response = geneset.get_geneset_gene_values(
+        cursor, user=mock_user, geneset_id=1234, min_value=0.5, top_n=10
+    )
+
+    assert response == geneset_genes_values_resp
+    mock_db_geneset_value.by_geneset_id.assert_not_called()
+    params = cursor.execute.call_args[0][1]
+    assert params["min_value"] == 0.5
+    assert params["top_n"] == 10
+
+
+@patch("geneweaver.api.services.geneset.value_store")
+@patch("geneweaver.api.services.geneset.db_geneset_value")
+@patch("geneweaver.api.services.geneset.db_geneset")
+def test_geneset_gene_value_from_store(
+    mock_db_geneset, mock_db_geneset_value, mock_value_store
+):
+    """Test public geneset values are served from the value store."""
+    mock_value_store.enabled = True
+    stored = mock_value_store.get_or_load.return_value
+    stored.gene_values.return_value = [{"symbol": "A", "value": 0.5}]
+    mock_db_geneset.get.return_value = [
+        {**geneset_by_id_resp.get("geneset"), "curation_id": 3}
+    ]
+    cursor = Mock()
+
+    response = geneset.get_geneset_gene_values(
+        cursor, user=mock_user, geneset_id=1234, in_threshold=True, top_n=1
+    )
+
+    assert response == {"data": [{"symbol": "A", "value": 0.5}]}
+    assert stored.select.call_args[0][0] is True
+    assert stored.select.call_args[1]["top_n"] == 1
+    assert mock_value_store.get_or_load.call_args[0][:2] == (
+        1234,
+        geneset_by_id_resp.get("geneset")["updated"],
+    )
+    cursor.execute.assert_not_called()
+
+    # private genesets are read from the database
+    mock_db_geneset.get.return_value = [
+        {**geneset_by_id_resp.get("geneset"), "curation_id": 5}
+    ]
+    mock_db_geneset_value.by_geneset_id.return_value = []
+    response = geneset.get_geneset_gene_values(cursor, user=mock_user, geneset_id=1)
+    assert response == {"data": None}
+    assert mock_value_store.get_or_load.call_count == 1
+
+
 @pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
 @pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
 @patch("geneweaver.api.services.geneset.db_geneset")
@@ -411,50 +591,91 @@ def test_get_geneset_gene_values_invalid_user(
     assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
+@patch("geneweaver.api.services.geneset.export_service")
+@patch("geneweaver.api.services.geneset.value_store")
+@patch("geneweaver.api.services.geneset.count_service")
+@patch("geneweaver.api.services.geneset.compare_service")
 @patch("geneweaver.api.services.geneset.db_threshold")
-def test_geneset_thershold_update(mock_db_threshold, mock_db_geneset):
-    """Test geneset gene value data response."""
-    mock_db_threshold.set_geneset_threshold.return_value = None
-    mock_db_geneset.user_is_owner.return_value = True
+def test_geneset_thershold_update(
+    mock_db_threshold,
+    mock_compare_service,
+    mock_count_service,
+    mock_value_store,
+    mock_export_service,
+):
+    """Test geneset threshold update, values and dependent caches."""
+    mock_db_threshold.user_can_set_threshold.return_value = True
     geneset_threshold = GenesetScoreType(**geneset_threshold_update_req)
+    cursor = Mock()
+    cursor.rowcount = 3
 
     response = geneset.update_geneset_threshold(
-        cursor=None, user=mock_user, geneset_id=1234, geneset_score=geneset_threshold
+        cursor=cursor, user=mock_user, geneset_id=1234, geneset_score=geneset_threshold
     )
     assert response == {}
+    # geneset threshold, then the flags of the values that change
+    assert cursor.execute.call_count == 2
+    assert cursor.execute.call_args[0][1]["geneset_id"] == 1234
+    mock_compare_service.invalidate.assert_called_once_with(1234)
+    mock_value_store.invalidate.assert_called_once_with(1234)
+    mock_export_service.invalidate.assert_called_once_with(1234)
+    mock_count_service.invalidate.assert_called_once_with("genesets", "gene_genesets")
+
+
+def test_set_geneset_value_threshold():
+    """Test value flags are updated in one statement, for one or two bounds."""
+    cursor = Mock()
+    cursor.rowcount = 5
+
+    changed = geneset.set_geneset_value_threshold(
+        cursor, 1234, GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05)
+    )
+    assert changed == 5
+    assert cursor.execute.call_args[0][1] == {
+        "geneset_id": 1234,
+        "threshold_high": 0.05,
+    }
+    assert "IS DISTINCT FROM" in repr(cursor.execute.call_args[0][0])
+
+    geneset.set_geneset_value_threshold(
+        cursor,
+        1234,
+        GenesetScoreType(
+            score_type=ScoreType.CORRELATION, threshold=0.9, threshold_low=0.1
+        ),
+    )
+    assert cursor.execute.call_args[0][1]["threshold_low"] == 0.1
+    assert "BETWEEN" in repr(cursor.execute.call_args[0][0])
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
 @patch("geneweaver.api.services.geneset.db_threshold")
-def test_geneset_thershold_update_errors(mock_db_threshold, mock_db_geneset):
-    """Test geneset gene value data response."""
-    mock_db_threshold.set_geneset_threshold.return_value = None
-    mock_db_geneset.user_is_owner.return_value = False
+def test_geneset_thershold_update_errors(mock_db_threshold):
+    """Test geneset threshold update errors."""
     geneset_threshold = GenesetScoreType(**geneset_threshold_update_req)
+    cursor = Mock()
 
     # user is not the geneset owner
-    mock_db_threshold.set_geneset_threshold.side_effect = ValueError()
+    mock_db_threshold.user_can_set_threshold.return_value = False
     response = geneset.update_geneset_threshold(
-        cursor=None, user=mock_user, geneset_id=1234, geneset_score=geneset_threshold
+        cursor=cursor, user=mock_user, geneset_id=1234, geneset_score=geneset_threshold
     )
     assert response.get("error") is True
     assert response.get("message") == message.ACCESS_FORBIDDEN
+    cursor.execute.assert_not_called()
 
     # user is not logged-in
-    mock_db_threshold.set_geneset_threshold.side_effect = ValueError()
     response = geneset.update_geneset_threshold(
-        cursor=None, user=None, geneset_id=1234, geneset_score=geneset_threshold
+        cursor=cursor, user=None, geneset_id=1234, geneset_score=geneset_threshold
     )
     assert response.get("error") is True
     assert response.get("message") == message.ACCESS_FORBIDDEN
 
     # db error
-    mock_db_geneset.user_is_owner.return_value = True
-    mock_db_threshold.set_geneset_threshold.side_effect = Exception("ERROR")
+    mock_db_threshold.user_can_set_threshold.return_value = True
+    cursor.execute.side_effect = Exception("ERROR")
     with pytest.raises(expected_exception=Exception):
         geneset.update_geneset_threshold(
-            cursor=None,
+            cursor=cursor,
             user=mock_user,
             geneset_id=1234,
             geneset_score=geneset_threshold,
@@ -507,13 +728,15 @@ def test_geneset_gene_value_w_gene_id_type_none_resp2(mock_db_geneset):
     assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
+@patch("geneweaver.api.services.geneset.access_service")
 @patch("geneweaver.api.services.geneset.db_ontology")
-def test_add_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
+def test_add_geneset_ontology_term(mock_db_ontology, mock_access_service):
     """Test add geneset ontology terms response."""
     mock_reponse = {"data": {"gs_id": 1234, "ont_id": 1}}
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     mock_db_ontology.add_ontology_term_to_geneset.return_value = mock_reponse.get(
         "data"
     )
@@ -524,7 +747,9 @@ def test_add_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
     assert response == mock_reponse
 
     # user is not the geneset owner, but he is a curator
-    mock_db_geneset.user_is_owner.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=False
+    )
     mock_user.role = AppRoles.curator
     response = geneset.add_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
@@ -532,9 +757,31 @@ def test_add_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
     assert response == mock_reponse
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
+@patch("geneweaver.api.services.geneset.access_service")
 @patch("geneweaver.api.services.geneset.db_ontology")
-def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
+def test_add_geneset_ontology_term_assigned_curator(
+    mock_db_ontology, mock_access_service
+):
+    """Test users assigned curation on the geneset can add ontology terms."""
+    mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
+    mock_db_ontology.add_ontology_term_to_geneset.return_value = {"gs_id": 1234}
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=False, curator=True
+    )
+    user = User()
+    user.id = 2
+
+    response = geneset.add_geneset_ontology_term(
+        cursor=None, user=user, geneset_id=1234, term_ref_id="D001921"
+    )
+
+    assert response == {"data": {"gs_id": 1234}}
+    mock_access_service.get_geneset_access.assert_called_once_with(None, 2, 1234)
+
+
+@patch("geneweaver.api.services.geneset.access_service")
+@patch("geneweaver.api.services.geneset.db_ontology")
+def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_access_service):
     """Test add geneset ontology term errors."""
     mock_reponse = {"data": {"gs_id": 1234, "ont_id": 1}}
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
@@ -543,15 +790,18 @@ def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
     )
 
     # geneset is not found or not readable by user
-    mock_db_geneset.is_readable.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=False
+    )
     response = geneset.delete_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
     )
     assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
     # user is not the geneset owner, and he is not a curator
-    mock_db_geneset.is_readable.return_value = True
-    mock_db_geneset.user_is_owner.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=False
+    )
     mock_user.role = None
     response = geneset.add_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
@@ -568,7 +818,9 @@ def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
 
     # Ontology term is not found
     mock_db_ontology.by_ontology_term.return_value = None
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     response = geneset.add_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
     )
@@ -576,7 +828,9 @@ def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
     assert response.get("message") == message.RECORD_NOT_FOUND_ERROR
 
     # db error
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
     mock_db_ontology.add_ontology_term_to_geneset.side_effect = Exception("ERROR")
     with pytest.raises(expected_exception=Exception):
@@ -585,13 +839,15 @@ def test_add_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
         )
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
+@patch("geneweaver.api.services.geneset.access_service")
 @patch("geneweaver.api.services.geneset.db_ontology")
-def test_delete_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
+def test_delete_geneset_ontology_term(mock_db_ontology, mock_access_service):
     """Test delete geneset ontology term response."""
     mock_reponse = {"data": {"gs_id": 1234, "ont_id": 1}}
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     mock_db_ontology.delete_ontology_term_from_geneset.return_value = mock_reponse.get(
         "data"
     )
@@ -602,7 +858,9 @@ def test_delete_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
     assert response == mock_reponse
 
     # user is not the geneset owner, but he is a curator
-    mock_db_geneset.user_is_owner.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=False
+    )
     mock_user.role = AppRoles.curator
     response = geneset.delete_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
@@ -610,9 +868,9 @@ def test_delete_geneset_ontology_term(mock_db_ontology, mock_db_geneset):
     assert response == mock_reponse
 
 
-@patch("geneweaver.api.services.geneset.db_geneset")
+@patch("geneweaver.api.services.geneset.access_service")
 @patch("geneweaver.api.services.geneset.db_ontology")
-def test_delete_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
+def test_delete_geneset_ontology_term_errors(mock_db_ontology, mock_access_service):
     """Test delete geneset ontology term errors."""
     mock_reponse = {"data": {"gs_id": 1234, "ont_id": 1}}
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
@@ -621,15 +879,18 @@ def test_delete_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
     )
 
     # geneset is not found or not readable by user
-    mock_db_geneset.is_readable.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=False
+    )
     response = geneset.delete_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
     )
     assert response == {"error": True, "message": message.INACCESSIBLE_OR_FORBIDDEN}
 
     # user is not the geneset owner, and he is not a curator
-    mock_db_geneset.is_readable.return_value = True
-    mock_db_geneset.user_is_owner.return_value = False
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=False
+    )
     mock_user.role = None
     response = geneset.delete_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
@@ -646,7 +907,9 @@ def test_delete_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
 
     # Ontology term is not found
     mock_db_ontology.by_ontology_term.return_value = None
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     response = geneset.delete_geneset_ontology_term(
         cursor=None, user=mock_user, geneset_id=1234, term_ref_id="D001921"
     )
@@ -654,7 +917,9 @@ def test_delete_geneset_ontology_term_errors(mock_db_ontology, mock_db_geneset):
     assert response.get("message") == message.RECORD_NOT_FOUND_ERROR
 
     # db error
-    mock_db_geneset.user_is_owner.return_value = True
+    mock_access_service.get_geneset_access.return_value = GenesetAccess(
+        geneset_id=1234, readable=True, owner=True
+    )
     mock_db_ontology.by_ontology_term.return_value = {"onto_id": 123123}
     mock_db_ontology.delete_ontology_term_from_geneset.side_effect = Exception("ERROR")
     with pytest.raises(expected_exception=Exception):
@@ -688,3 +953,21 @@ def test_get_geneset_by_score_type(mock_db_geneset, score_type):
     response = geneset.get_visible_genesets(None, mock_user, score_type=score_type)
 
     assert response.get("data") == geneset_list_resp
+
+
+@patch("geneweaver.api.services.geneset.count_service")
+@patch("geneweaver.api.services.geneset.db_geneset")
+def test_get_visible_genesets_with_count(mock_db_geneset, mock_count_service):
+    """Test get visible genesets also returns the total count."""
+    mock_db_geneset.get.return_value = geneset_list_resp
+    mock_count_service.count.return_value = 100
+
+    response = geneset.get_visible_genesets(
+        None, mock_user, species=Species.MUS_MUSCULUS, count_mode=CountMode.CACHED
+    )
+
+    assert response == {"data": geneset_list_resp, "total": 100}
+    assert mock_count_service.count.call_args.kwargs["mode"] == CountMode.CACHED
+
+    response = geneset.get_visible_genesets(None, mock_user)
+    assert "total" not in response
@@ -1,9 +1,13 @@
 """Tests for system monitor services."""
 
-from unittest.mock import patch
+import time
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+from geneweaver.api.core.cache import TTLCache
+from geneweaver.api.schemas.apimodels import HealthStatus
 from geneweaver.api.services import monitors
+from psycopg_pool import PoolTimeout
 
 from tests.data import test_monitors_data
 
@@ -26,3 +30,139 @@ def test_db_health_check_error(mock_db_heath):
 
     with pytest.raises(expected_exception=Exception):
         monitors.check_db_health(None)
+
+
+def test_get_metrics_with_pool():
+    """Test that pool stats are included in the metrics."""
+    pool = MagicMock()
+    pool.get_stats.return_value = {"pool_size": 4, "pool_available": 1}
+
+    response = monitors.get_metrics(pool)
+
+    assert "geneweaver_db_pool_size 4" in response
+    assert "geneweaver_db_connections_in_use 3" in response
+
+
+def test_get_metrics_with_caches():
+    """Test that the stats of the in-process caches are included in the metrics."""
+    cache = TTLCache(ttl=None)
+    cache.set("key", 1)
+    cache.get("key")
+
+    response = monitors.get_metrics(None, {"test": cache})
+
+    assert 'geneweaver_cache_hits_total{cache="test"} 1' in response
+    assert 'geneweaver_cache_size{cache="test"} 1' in response
+
+
+def test_get_metrics_without_pool():
+    """Test that metrics render without an open pool."""
+    response = monitors.get_metrics(None)
+
+    assert "geneweaver_db_pool_size" not in response
+    assert "# TYPE geneweaver_http_request_duration_seconds histogram" in response
+
+
+def mock_pool(latency: float = 0, **stats: int) -> Mock:
+    """Build a mock pool whose connection takes `latency` seconds to query."""
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.return_value.execute.side_effect = (
+        lambda _: time.sleep(latency)
+    )
+    pool.get_stats.return_value = {"pool_size": 4, "pool_available": 2, **stats}
+    return pool
+
+
+def test_check_db_latency_up():
+    """Test that a fast DB round-trip is reported UP."""
+    response = monitors.check_db_latency(mock_pool(), budget_ms=100, timeout=1)
+
+    assert response["status"] == HealthStatus.UP
+    assert response["latency_ms"] < 100
+
+
+def test_check_db_latency_degraded():
+    """Test that a DB round-trip over budget is reported DEGRADED."""
+    response = monitors.check_db_latency(mock_pool(0.01), budget_ms=1, timeout=1)
+
+    assert response["status"] == HealthStatus.DEGRADED
+
+
+def test_check_db_latency_down():
+    """Test that a pool timeout is reported DOWN."""
+    pool = mock_pool()
+    pool.connection.side_effect = PoolTimeout("timed out")
+
+    response = monitors.check_db_latency(pool, budget_ms=100, timeout=1)
+
+    assert response["status"] == HealthStatus.DOWN
+    assert monitors.check_db_latency(None, 100, 1)["status"] == HealthStatus.DOWN
+
+
+def test_check_pool():
+    """Test that an exhausted pool with waiting requests is DEGRADED."""
+    assert monitors.check_pool(mock_pool())["status"] == HealthStatus.UP
+
+    response = monitors.check_pool(mock_pool(pool_available=0, requests_waiting=3))
+
+    assert response["status"] == HealthStatus.DEGRADED
+    assert response["requests_waiting"] == 3
+
+
+def test_check_caches():
+    """Test that caches older than the max age are DEGRADED."""
+    fresh, stale = TTLCache(ttl=None), TTLCache(ttl=None)
+    fresh.set("key", 1)
+    stale.set("key", 1)
+    stale._data["key"] = (time.monotonic() - 120, 1)
+
+    response = monitors.check_caches(
+        {"fresh": fresh, "stale": stale, "empty": TTLCache()}, max_age=60
+    )
+
+    assert response["status"] == HealthStatus.DEGRADED
+    assert response["caches"]["fresh"]["status"] == HealthStatus.UP
+    assert response["caches"]["stale"]["status"] == HealthStatus.DEGRADED
+    assert response["caches"]["empty"]["age"] is None
+    assert response["caches"]["fresh"]["hit_rate"] == 0.0
+
+
+def test_check_caches_ignores_expired_entries():
+    """Test that expired entries do not keep a cache DEGRADED."""
+    cache = TTLCache(ttl=30)
+    cache.set("key", 1)
+    cache._data["key"] = (time.monotonic() - 120, 1)
+
+    response = monitors.check_caches({"cache": cache}, max_age=60)
+
+    assert response["status"] == HealthStatus.UP
+    assert response["caches"]["cache"]["age"] is None
+
+
+def test_check_jwks():
+    """Test that missing or old signing keys are DEGRADED."""
+    jwks = {"keys": [{"kid": "1"}]}
+    now = time.time()
+
+    assert monitors.check_jwks(jwks, now, 60)["status"] == HealthStatus.UP
+    assert monitors.check_jwks(jwks, now - 120, 60)["status"] == HealthStatus.DEGRADED
+    assert monitors.check_jwks({"keys": []}, now, 60)["status"] == HealthStatus.DEGRADED
+    assert monitors.check_jwks(None, None, 60)["status"] == HealthStatus.DEGRADED
+
+
+def test_check_readiness_reports_worst_status():
+    """Test that the overall status is the worst of all checks."""
+    response = monitors.check_readiness(
+        pool=mock_pool(),
+        caches={},
+        jwks={"keys": []},
+        jwks_fetched_at=time.time(),
+        db_latency_budget_ms=100,
+        pool_timeout=1,
+        cache_max_age=60,
+        jwks_max_age=60,
+    )
+
+    assert response["status"] == HealthStatus.DEGRADED
+    assert response["checks"]["database"]["status"] == HealthStatus.UP
+    assert response["checks"]["jwks"]["status"] == HealthStatus.DEGRADED
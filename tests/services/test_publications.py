@@ -1,5 +1,6 @@
 """Tests for publications Service."""
 
+from typing import Iterator
 from unittest.mock import patch
 
 import pytest
@@ -164,3 +165,59 @@ def test_get_publications_w_filter_errors(mock_db_publication):
             pubmed="123456",
             search_text="something",
         )
+
+
+@pytest.fixture()
+def _cache() -> Iterator[None]:
+    """Enable the publication cache for the duration of a test."""
+    pub_service.publications.configure(ttl=60)
+    yield
+    pub_service.publications.configure(ttl=0)
+
+
+@pytest.mark.usefixtures("_cache")
+@patch("geneweaver.api.services.publications.db_publication")
+def test_get_publication_cached_by_both_ids(mock_db_publication):
+    """Test a publication read by id is cached under its PubMed id too."""
+    mock_db_publication.by_id.return_value = publication_by_id_resp
+
+    assert pub_service.get_publication(None, 123) == publication_by_id_resp
+    assert pub_service.get_publication(None, 123) == publication_by_id_resp
+    assert (
+        pub_service.get_publication_by_pubmed_id(None, "12805289")
+        == publication_by_id_resp
+    )
+
+    mock_db_publication.by_id.assert_called_once()
+    mock_db_publication.by_pubmed_id.assert_not_called()
+    assert pub_service.publications.stats()["hits"] == 2
+
+
+@pytest.mark.usefixtures("_cache")
+@patch("geneweaver.api.services.publications.db_publication")
+def test_get_publication_missing_not_cached(mock_db_publication):
+    """Test publications that do not exist are looked up again."""
+    mock_db_publication.by_pubmed_id.return_value = None
+
+    assert pub_service.get_publication_by_pubmed_id(None, "1234") is None
+    assert pub_service.get_publication_by_pubmed_id(None, "1234") is None
+
+    assert mock_db_publication.by_pubmed_id.call_count == 2
+
+
+@pytest.mark.usefixtures("_cache")
+@patch("geneweaver.api.services.publications.pubmed")
+@patch("geneweaver.api.services.publications.db_publication")
+def test_add_pubmed_record_invalidates_cache(mock_db_publication, mock_pubmed):
+    """Test adding a PubMed record drops it from the cache."""
+    pub_service.cache_publication({"id": 99, "pubmed_id": "1234"})
+    version = pub_service.publications.version
+    mock_pubmed.get_publication.return_value = add_pubmed_info
+    mock_db_publication.by_pubmed_id.return_value = None
+    mock_db_publication.add.return_value = {"pub_id": 99}
+
+    pub_service.add_pubmed_record(cursor=None, user=mock_user, pubmed_id="1234")
+
+    assert pub_service.publications.get(("id", 99)) is None
+    assert pub_service.publications.get(("pubmed", "1234")) is None
+    assert pub_service.publications.version > version
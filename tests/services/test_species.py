@@ -1,8 +1,10 @@
-"""Tests for publications Service."""
+"""Tests for species Service."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+from geneweaver.api.controller import message
+from geneweaver.api.schemas.auth import AppRoles, User
 from geneweaver.api.services import species as species_service
 from geneweaver.core.enum import GeneIdentifier, Species
 
@@ -15,73 +17,258 @@ species_by_gene_id_type_flybase = [
 ]
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species(mock_db_species):
-    """Test get species no paramaters."""
-    mock_db_species.get.return_value = species_no_params.get("data")
+def _db_row(row: dict) -> dict:
+    """Species row as returned by the DB (gene database ids, not names)."""
+    ref_gdb_id = row["reference_gene_identifier"]
+    if ref_gdb_id is not None:
+        ref_gdb_id = int(GeneIdentifier(ref_gdb_id))
+    return {**row, "reference_gene_identifier": ref_gdb_id}
 
-    response = species_service.get_species(None)
 
-    assert response == species_no_params
+species_rows = [_db_row(row) for row in species_no_params.get("data")]
+gene_database_rows = [
+    {"gdb_id": 10, "gdb_name": "MGI", "sp_id": 1},
+    {"gdb_id": 14, "gdb_name": "FlyBase", "sp_id": 5},
+]
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species_by_taxonomy_id(mock_db_species):
-    """Test speccies by taxonomy id."""
-    mock_db_species.get.return_value = species_by_taxonomy_id_10090.get("data")
+@pytest.fixture()
+def reference():
+    """Build a reference snapshot of the test species."""
+    return species_service.build_reference(species_rows, gene_database_rows)
 
-    response = species_service.get_species(None, taxonomy_id=10090)
 
-    assert response == species_by_taxonomy_id_10090
+@pytest.fixture()
+def reference_cache():
+    """Replace the process reference cache with an empty one."""
+    cache = species_service.ReferenceCache(refresh_interval=60)
+    with patch.object(species_service, "reference", cache):
+        yield cache
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species_by_gene_id_type(mock_db_species):
-    """Test speccies by taxonomy id."""
-    mock_db_species.get.return_value = species_by_gene_id_type_flybase
+def test_build_reference(reference):
+    """Test the reference snapshot is sorted and read-only."""
+    assert [row["id"] for row in reference.species] == sorted(
+        row["id"] for row in species_rows
+    )
+    assert reference.gene_databases[14]["sp_id"] == 5
+    with pytest.raises(TypeError, match="does not support item assignment"):
+        reference.species[0]["name"] = "changed"
+
+
+def test_reference_etag_depends_on_contents(reference):
+    """Test the ETag is the same for the same rows, whatever their order."""
+    same = species_service.build_reference(species_rows[::-1], gene_database_rows)
+    changed = species_service.build_reference(species_rows[1:], gene_database_rows)
+
+    assert same.etag == reference.etag
+    assert changed.etag != reference.etag
+    assert reference.etag.startswith('W/"')
+
+
+def test_get_species(reference):
+    """Test get species no paramaters."""
+    response = species_service.get_species(reference)
+
+    assert response == {"data": sorted(species_rows, key=lambda row: row["id"])}
+
+
+def test_get_species_by_taxonomy_id(reference):
+    """Test species by taxonomy id."""
+    response = species_service.get_species(reference, taxonomy_id=10090)
 
+    assert response == {
+        "data": [_db_row(row) for row in species_by_taxonomy_id_10090.get("data")]
+    }
+
+
+def test_get_species_by_gene_id_type(reference):
+    """Test species by reference gene id type."""
     response = species_service.get_species(
-        None, reference_gene_id_type=GeneIdentifier("FlyBase")
+        reference, reference_gene_id_type=GeneIdentifier("FlyBase")
     )
 
-    assert response == {"data": species_by_gene_id_type_flybase}
+    assert response == {"data": [_db_row(species_by_gene_id_type_flybase[0])]}
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species_by_gene_id_type_and_taxonomy(mock_db_species):
-    """Test speccies by taxonomy id."""
-    mock_db_species.get.return_value = species_by_gene_id_type_flybase
-
+def test_get_species_by_gene_id_type_and_taxonomy(reference):
+    """Test species by reference gene id type and taxonomy id."""
     response = species_service.get_species(
-        None, reference_gene_id_type=GeneIdentifier("FlyBase"), taxonomy_id=7227
+        reference, reference_gene_id_type=GeneIdentifier("FlyBase"), taxonomy_id=10090
     )
 
-    assert response == {"data": species_by_gene_id_type_flybase}
+    assert response == {"data": []}
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species_with_error(mock_db_species):
-    """Test get species error in DB call."""
-    mock_db_species.get.side_effect = Exception("ERROR")
+def test_get_species_by_id(reference):
+    """Test species by species id."""
+    response = species_service.get_species_by_id(reference, Species(5))
+
+    assert response == _db_row(species_by_gene_id_type_flybase[0])
+
 
-    with pytest.raises(expected_exception=Exception):
-        species_service.get(None)
+def test_get_species_returns_copies(reference):
+    """Test responses can be modified without changing the snapshot."""
+    response = species_service.get_species_by_id(reference, Species(5))
+    response["name"] = "changed"
+
+    assert species_service.get_species_by_id(reference, Species(5))["name"] != (
+        "changed"
+    )
 
 
 @patch("geneweaver.api.services.species.db_species")
-def test_get_species_by_id(mock_db_species):
-    """Test speccies by species id."""
-    mock_db_species.get_by_id.return_value = species_by_gene_id_type_flybase[0]
+def test_load_reference(mock_db_species):
+    """Test loading the species and gene database tables."""
+    mock_db_species.get.return_value = species_rows
+    cursor = Mock()
+    cursor.fetchone.return_value = {"fingerprint": "abc"}
+    cursor.fetchall.return_value = gene_database_rows
 
-    response = species_service.get_species_by_id(None, Species(5))
+    reference = species_service.load_reference(cursor)
 
-    assert response == species_by_gene_id_type_flybase[0]
+    assert [c.args[0] for c in cursor.execute.call_args_list] == [
+        species_service.REFERENCE_FINGERPRINT_QUERY,
+        species_service.GENE_DATABASES_QUERY,
+    ]
+    assert len(reference.species) == len(species_rows)
+    assert set(reference.gene_databases) == {10, 14}
+    assert reference.fingerprint == "abc"
 
 
-@patch("geneweaver.api.services.species.db_species")
-def test_get_species_by_id_with_error(mock_db_species):
-    """Test species by id error in DB call."""
-    mock_db_species.get_by_id.side_effect = Exception("ERROR")
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_loads_once(mock_load, reference, reference_cache):
+    """Test the snapshot is only loaded from the pool when missing."""
+    mock_load.return_value = reference
+    pool = MagicMock()
+
+    assert reference_cache.get(pool) is reference
+    assert reference_cache.get(pool) is reference
+    assert mock_load.call_count == 1
+    assert reference_cache.gene_database(GeneIdentifier("FlyBase"))["sp_id"] == 5
+
+
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_reloads_when_stale(mock_load, reference, reference_cache):
+    """Test a snapshot older than the refresh interval is reloaded."""
+    reference_cache.data = reference._replace(loaded_at=reference.loaded_at - 120)
+    mock_load.return_value = reference
+
+    assert reference_cache.get(MagicMock()) is reference
+    assert mock_load.call_count == 1
+
+
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_keeps_serving_on_error(mock_load, reference, reference_cache):
+    """Test a stale snapshot is served when it fails to reload."""
+    reference_cache.data = reference._replace(loaded_at=reference.loaded_at - 120)
+    mock_load.side_effect = Exception("ERROR")
+
+    assert reference_cache.get(MagicMock()).etag == reference.etag
+    assert not reference_cache.stale()
+
+
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_error_without_snapshot(mock_load, reference_cache):
+    """Test loading errors are raised when there is no snapshot to serve."""
+    mock_load.side_effect = Exception("ERROR")
+
+    with pytest.raises(Exception, match="ERROR"):
+        reference_cache.get(MagicMock())
+
+
+@patch("geneweaver.api.services.species.fetch_fingerprint")
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_reloads_when_changed(
+    mock_load, mock_fingerprint, reference, reference_cache
+):
+    """Test the snapshot is reloaded once the tables' fingerprint changes."""
+    reference_cache.check_interval = 30
+    reference_cache.data = reference._replace(fingerprint="old")
+    reference_cache.checked_at -= 60
+    mock_fingerprint.return_value = "new"
+    mock_load.return_value = reference._replace(fingerprint="new")
+
+    assert reference_cache.get(MagicMock()).fingerprint == "new"
+    assert mock_load.call_count == 1
+    assert not reference_cache.check_due()
+
+
+@patch("geneweaver.api.services.species.fetch_fingerprint")
+@patch("geneweaver.api.services.species.load_reference")
+def test_reference_cache_checks_on_interval(
+    mock_load, mock_fingerprint, reference, reference_cache
+):
+    """Test the fingerprint is only checked once the check interval has passed."""
+    reference_cache.check_interval = 30
+    reference_cache.data = reference._replace(fingerprint="same")
+    mock_fingerprint.return_value = "same"
+
+    reference_cache.get(MagicMock())
+    assert mock_fingerprint.call_count == 0
+
+    reference_cache.checked_at -= 60
+    assert reference_cache.get(MagicMock()).fingerprint == "same"
+    assert mock_fingerprint.call_count == 1
+    assert mock_load.call_count == 0
+
+
+@patch("geneweaver.api.services.species.fetch_fingerprint")
+def test_reference_cache_check_error(mock_fingerprint, reference, reference_cache):
+    """Test the snapshot keeps being served when the check fails."""
+    reference_cache.check_interval = 30
+    reference_cache.data = reference
+    reference_cache.checked_at -= 60
+    mock_fingerprint.side_effect = Exception("ERROR")
+
+    assert reference_cache.get(MagicMock()) is reference
+    assert not reference_cache.check_due()
+
+
+def test_gene_database_not_loaded(reference_cache):
+    """Test gene databases are not found before the snapshot is loaded."""
+    assert reference_cache.gene_database(GeneIdentifier("FlyBase")) is None
+
+
+@patch("geneweaver.api.services.species.load_reference")
+def test_refresh_reference_admin(mock_load, reference, reference_cache):
+    """Test administrators can reload the snapshot."""
+    mock_load.return_value = reference
+    user = User(gw_id=1, role=AppRoles.admin)
+
+    response = species_service.refresh_reference(None, user)
+
+    assert response == {
+        "data": {
+            "etag": reference.etag,
+            "species": len(species_rows),
+            "gene_databases": len(gene_database_rows),
+        }
+    }
+    assert reference_cache.data is reference
+
+
+@patch("geneweaver.api.services.species.access_service.is_admin")
+@patch("geneweaver.api.services.species.load_reference")
+def test_refresh_reference_db_admin(mock_load, mock_is_admin, reference):
+    """Test users flagged as administrators in the DB can reload the snapshot."""
+    mock_load.return_value = reference
+    mock_is_admin.return_value = True
+
+    with patch.object(species_service, "reference", species_service.ReferenceCache()):
+        response = species_service.refresh_reference(None, User(gw_id=1))
+
+    assert response["data"]["etag"] == reference.etag
+    mock_is_admin.assert_called_once_with(None, 1)
+
+
+@patch("geneweaver.api.services.species.access_service.is_admin")
+@patch("geneweaver.api.services.species.load_reference")
+def test_refresh_reference_forbidden(mock_load, mock_is_admin):
+    """Test other users can not reload the snapshot."""
+    mock_is_admin.return_value = False
+
+    response = species_service.refresh_reference(None, User(gw_id=1))
 
-    with pytest.raises(expected_exception=Exception):
-        species_service.get_species_by_id(None, Species(5))
+    assert response == {"error": True, "message": message.ACCESS_FORBIDDEN}
+    mock_load.assert_not_called()
@@ -0,0 +1,125 @@
+"""Tests for the geneset visibility cache service."""
+
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+from geneweaver.api.services import visibility
+
+PRIVATE_IDS = [{"gs_id": 5}, {"gs_id": 7}, {"gs_id": 9}]
+USER_GROUP_IDS = [{"grp_id": 3}]
+USER_PRIVATE_IDS = [{"gs_id": 7}]
+
+
+@pytest.fixture()
+def _caches() -> Iterator[None]:
+    """Enable the visibility caches for the duration of a test."""
+    visibility.private_genesets.configure(ttl=60)
+    visibility.user_visibility.configure(ttl=60)
+    yield
+    visibility.private_genesets.configure(ttl=0)
+    visibility.user_visibility.configure(ttl=0)
+
+
+@pytest.fixture()
+def cursor():
+    """Provide a mock cursor answering the visibility queries."""
+    cursor = Mock()
+    results = [
+        (visibility.PRIVATE_GENESET_IDS_QUERY, PRIVATE_IDS),
+        (visibility.USER_GROUP_IDS_QUERY, USER_GROUP_IDS),
+        (visibility.READABLE_PRIVATE_GENESET_IDS_QUERY, USER_PRIVATE_IDS),
+    ]
+
+    def execute(query, params=None) -> None:
+        cursor.fetchall.return_value = next(r for q, r in results if q is query)
+
+    cursor.execute.side_effect = execute
+    return cursor
+
+
+def test_visibility_disabled(cursor):
+    """Test nothing is short-circuited or queried when caching is disabled."""
+    assert visibility.is_inaccessible(cursor, 1, 5) is False
+    assert visibility.filter_accessible(cursor, 1, [5, 6]) == [5, 6]
+    cursor.execute.assert_not_called()
+
+
+@pytest.mark.usefixtures("_caches")
+def test_is_inaccessible(cursor):
+    """Test only private genesets the user cannot read are inaccessible."""
+    # private, not shared with the user
+    assert visibility.is_inaccessible(cursor, 1, 5) is True
+    # private, readable by the user
+    assert visibility.is_inaccessible(cursor, 1, 7) is False
+    # not known to be private
+    assert visibility.is_inaccessible(cursor, 1, 6) is False
+    # anonymous users can not read any private genesets
+    assert visibility.is_inaccessible(cursor, 0, 7) is True
+
+    # three queries: private ids, user groups, user private ids
+    assert cursor.execute.call_count == 3
+
+
+@pytest.mark.usefixtures("_caches")
+def test_filter_accessible(cursor):
+    """Test prefiltering a list of genesets for a user."""
+    assert visibility.filter_accessible(cursor, 1, [9, 8, 7, 5]) == [8, 7]
+
+
+@pytest.mark.usefixtures("_caches")
+def test_user_visibility(cursor):
+    """Test the user visibility set holds group and geneset ids."""
+    vis = visibility.get_user_visibility(cursor, 1)
+
+    assert vis.group_ids == (3,)
+    assert list(vis.geneset_ids) == [7]
+
+
+@pytest.mark.usefixtures("_caches")
+def test_user_visibility_shares_by_group(cursor):
+    """Test readable genesets are matched on the user's groups, not per geneset."""
+    visibility.get_user_visibility(cursor, 1)
+
+    query, params = cursor.execute.call_args.args
+    assert query is visibility.READABLE_PRIVATE_GENESET_IDS_QUERY
+    assert params == {"user_id": 1, "group_ids": ["3"]}
+    assert "string_to_array(gs_groups, ',') &&" in repr(query)
+
+
+@pytest.mark.usefixtures("_caches")
+def test_anonymous_visibility_not_queried(cursor):
+    """Test anonymous users can not read private genesets, without a query."""
+    vis = visibility.get_user_visibility(cursor, 0)
+
+    assert vis.group_ids == ()
+    assert list(vis.geneset_ids) == []
+    cursor.execute.assert_not_called()
+
+
+@pytest.mark.usefixtures("_caches")
+def test_invalidate(cursor):
+    """Test invalidation by user, by group and globally."""
+    visibility.get_user_visibility(cursor, 1)
+    visibility.invalidate(user_id=1)
+    assert visibility.user_visibility.get(1) is None
+
+    visibility.get_user_visibility(cursor, 1)
+    visibility.invalidate(group_id=4)
+    assert visibility.user_visibility.get(1) is not None
+    visibility.invalidate(group_id=3)
+    assert visibility.user_visibility.get(1) is None
+
+    visibility.get_private_geneset_ids(cursor)
+    visibility.invalidate()
+    assert visibility.private_genesets.get(None) is None
+
+
+@pytest.mark.usefixtures("_caches")
+def test_visibility_db_error():
+    """Test error in visibility DB call."""
+    cursor = Mock()
+    cursor.execute.side_effect = Exception("ERROR")
+
+    with pytest.raises(expected_exception=Exception):
+        visibility.is_inaccessible(cursor, 1, 5)